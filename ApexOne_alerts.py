@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+ApexOne Alerts
+NG結果・古いウイルスパターンファイルのアラート通知（キュー・再通知の抑止・通知先ごとの送信）
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+class AlertDispatcher:
+    """アラートをキューで受け取り、実行ごとにまとめてバックグラウンドで通知先に送信
+    
+    送信はスレッドで行い通知先ごとにタイムアウトを設けるため、応答の遅い通知先があってもチェックを待たせない。
+    同じ状態が続く間は alert_cooldown_minutes が経過するまで再通知しない（正常と判定できた時点で抑止を解除）。
+    """
+    
+    def __init__(self, checker):
+        self.checker = checker
+        self.queue = asyncio.Queue(maxsize=checker.alert_queue_size)
+        self.pending = {}          # 実行ごとに溜めているアラート
+        self.deliveries = set()    # 送信中のバッチ
+        self.worker = asyncio.ensure_future(self.consume())
+    
+    def put(self, item):
+        """キューにアラートまたは実行終了の通知を追加（キューが一杯の場合は破棄）"""
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            print(f"⚠️ アラートキューが一杯のため破棄しました: {item.get('title', item['type'])}")
+    
+    async def consume(self):
+        """キューからアラートを取り出し、実行が終了したらまとめて送信を開始"""
+        while True:
+            item = await self.queue.get()
+            try:
+                if item['type'] == 'alert':
+                    self.pending.setdefault(item['run_id'], []).append(item)
+                else:
+                    task = asyncio.ensure_future(self.deliver_batch(self.pending.pop(item['run_id'], []),
+                                                                    item['resolved_keys']))
+                    self.deliveries.add(task)
+                    task.add_done_callback(self.deliveries.discard)
+            finally:
+                self.queue.task_done()
+    
+    def select_alerts(self, alerts, resolved_keys):
+        """再通知の抑止期間内のアラートを除外（チェックを実行して正常と判定できた状態のみ抑止を解除）
+        
+        取得に失敗した実行（Chromeの起動失敗・例外など）では状態が解消したとはみなさない。
+        """
+        with self.checker.update_state() as state:
+            previous = state.get('alerts', {})
+            state['alerts'] = {key: sent_at for key, sent_at in previous.items() if key not in resolved_keys}
+        
+        cooldown = timedelta(minutes=self.checker.alert_cooldown_minutes)
+        selected = []
+        for alert in alerts:
+            try:
+                suppressed = datetime.now() - datetime.fromisoformat(previous[alert['key']]) < cooldown
+            except Exception:
+                suppressed = False
+            if suppressed:
+                print(f"🔕 アラートを抑止しました（{previous[alert['key']]} に通知済み）: {alert['title']}")
+            else:
+                selected.append(alert)
+        return selected
+    
+    async def deliver_batch(self, alerts, resolved_keys=()):
+        """1回の実行のアラートを1通にまとめ、全通知先に並行して送信"""
+        try:
+            alerts = self.select_alerts(alerts, set(resolved_keys))
+            if not alerts:
+                return
+            
+            subject = f"[ApexOne] {len(alerts)}件のアラート（{alerts[0]['raised_at']}）"
+            body = "\n".join(f"- {alert['title']}: {alert['detail']}" for alert in alerts)
+            deliveries = await asyncio.gather(*[self.deliver(sink, subject, body, alerts)
+                                                for sink in self.checker.alert_sinks])
+            
+            # 1つ以上の通知先に送信できた場合のみ通知済みとする（全て失敗した場合は次回の実行で再送）
+            # 実行ロックの解放後に送信が完了するため、次の実行と同じロック付きの更新で記録する
+            if any(delivery['success'] for delivery in deliveries):
+                sent_at = datetime.now().isoformat(timespec='seconds')
+                with self.checker.update_state() as state:
+                    for alert in alerts:
+                        state.setdefault('alerts', {})[alert['key']] = sent_at
+            
+            detected_ms = round((time.perf_counter() - alerts[0]['raised_perf']) * 1000, 1)
+            print(f"📣 アラート {len(alerts)}件を送信しました（検出から送信完了まで {detected_ms}ms）")
+            for delivery in deliveries:
+                icon = "✅" if delivery['success'] else "❌"
+                error = f" - {delivery['error']}" if delivery['error'] else ""
+                print(f"   {icon} {delivery['sink']}: {delivery['latency_ms']}ms{error}")
+            self.checker.record_alert_deliveries(deliveries)
+            
+        except Exception as e:
+            print(f"⚠️ アラート送信エラー: {e}")
+    
+    async def deliver(self, sink, subject, body, alerts):
+        """1つの通知先に送信し、所要時間と成否を返す"""
+        senders = {
+            'webhook': self.checker.send_webhook_alert,
+            'smtp': self.checker.send_smtp_alert,
+            'file': self.checker.send_file_alert
+        }
+        loop = asyncio.get_event_loop()
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(
+                loop.run_in_executor(None, senders[sink['type']], sink, subject, body, alerts),
+                timeout=self.checker.alert_send_timeout
+            )
+        except asyncio.TimeoutError:
+            error = f"{self.checker.alert_send_timeout}秒以内に送信が完了しませんでした"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        
+        return {
+            'sink': sink.get('name', sink['type']),
+            'success': error is None,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+            'error': error
+        }
+    
+    async def close(self, timeout):
+        """溜めているアラートの送信完了を待機（timeout 秒で打ち切り）"""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            if self.deliveries:
+                await asyncio.wait(list(self.deliveries), timeout=timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ アラートの送信が完了しないまま終了します")
+        self.worker.cancel()
+
+class AlertMixin:
+    """アラートの登録・送信と通知先ごとの送信処理（ApexOneStatusCheckerの一部）"""
+    
+    def get_alert_dispatcher(self):
+        """アラートの送信キューを取得（未作成の場合は作成）"""
+        if self.alert_dispatcher is None:
+            self.alert_dispatcher = AlertDispatcher(self)
+        return self.alert_dispatcher
+    
+    def raise_alert(self, key, title, detail):
+        """アラートをキューに追加（実行の終了時にまとめて送信。通知先が未設定の場合は何もしない）"""
+        if not self.alert_sinks:
+            return
+        
+        self.get_alert_dispatcher().put({
+            'type': 'alert',
+            'run_id': self.run_started_at.isoformat(),
+            'key': key,
+            'title': title,
+            'detail': detail,
+            'raised_at': datetime.now().isoformat(timespec='seconds'),
+            'raised_perf': time.perf_counter()
+        })
+        print(f"🚩 アラートを登録しました: {title}")
+    
+    def resolve_alert(self, key):
+        """チェックを実行して正常と判定できた状態を記録（実行の終了時に再通知の抑止を解除）"""
+        self.resolved_alert_keys.add(key)
+    
+    def finish_run_alerts(self):
+        """今回の実行で溜めたアラートの送信を開始（送信はバックグラウンドで行い、完了を待たない）"""
+        if not self.alert_sinks:
+            return
+        
+        self.get_alert_dispatcher().put({
+            'type': 'end_of_run',
+            'run_id': self.run_started_at.isoformat(),
+            'resolved_keys': sorted(self.resolved_alert_keys)
+        })
+    
+    async def close_alerts(self):
+        """送信中のアラートの完了を待機（プロセス終了前に呼び出す）"""
+        if self.alert_dispatcher:
+            await self.alert_dispatcher.close(self.alert_send_timeout + 5)
+            self.alert_dispatcher = None
+    
+    def record_alert_deliveries(self, deliveries):
+        """通知先ごとの送信結果と所要時間をメトリクスに反映"""
+        self.last_alert_deliveries = deliveries
+        text = self.render_openmetrics()
+        with self.metrics_lock:
+            self.metrics_text = text
+        if self.metrics_textfile:
+            self.write_metrics_textfile(text)
+    
+    def send_webhook_alert(self, sink, subject, body, alerts):
+        """WebhookにアラートをJSONでPOST"""
+        import ssl
+        import urllib.request
+        
+        payload = {
+            'title': subject,
+            'text': body,
+            'alerts': [{key: alert[key] for key in ('key', 'title', 'detail', 'raised_at')} for alert in alerts]
+        }
+        request = urllib.request.Request(sink['url'], data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json; charset=utf-8'}, method='POST')
+        context = ssl.create_default_context()
+        if not sink.get('verify_tls', True):
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        with urllib.request.urlopen(request, timeout=self.alert_send_timeout, context=context) as response:
+            response.read()
+    
+    def send_smtp_alert(self, sink, subject, body, alerts):
+        """SMTPでアラートをメール送信"""
+        import smtplib
+        from email.message import EmailMessage
+        
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = sink['from']
+        message['To'] = ', '.join(sink['to'])
+        message.set_content(body)
+        
+        with smtplib.SMTP(sink['host'], sink.get('port', 25), timeout=self.alert_send_timeout) as smtp:
+            if sink.get('starttls'):
+                smtp.starttls()
+            if sink.get('username'):
+                smtp.login(sink['username'], sink['password'])
+            smtp.send_message(message)
+    
+    def send_file_alert(self, sink, subject, body, alerts):
+        """アラートをファイルに1行ずつ追記（動作確認用の通知先）"""
+        with open(sink['path'], 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'sent_at': datetime.now().isoformat(timespec='seconds'),
+                'subject': subject,
+                'alerts': [{key: alert[key] for key in ('key', 'title', 'detail', 'raised_at')} for alert in alerts]
+            }, ensure_ascii=False) + "\n")
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+ApexOne API Client
+Apex Central（Control Manager）の自動化APIクライアントと、APIでのステータス取得（ApexOneStatusCheckerに組み込む）
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import time
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+from datetime import datetime
+
+class ApexCentralApiError(Exception):
+    """自動化APIがエラーを返した場合の例外"""
+
+class ApexCentralApiClient:
+    """Apex Central（Control Manager）の自動化APIクライアント
+    
+    接続はプールしてキープアライブで再利用し、リクエストごとにアプリケーションIDとAPIキーでJWT（HS256）を署名する。
+    複数のスレッドから同時に呼び出せる。
+    """
+    
+    def __init__(self, base_url, application_id, api_key, timeout=30, verify_tls=True, pool_size=4):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.application_id = application_id
+        self.api_key = api_key
+        self.timeout = timeout
+        self.verify_tls = verify_tls
+        self.pool_size = pool_size
+        self.idle_connections = deque()
+        self.lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests_sent = 0
+    
+    def create_checksum(self, method, path, body):
+        """リクエストのチェックサム（メソッド・パス・ヘッダー・本文を連結したSHA-256のBase64）"""
+        text = f"{method.upper()}|{path.lower()}||{body}"
+        return base64.b64encode(hashlib.sha256(text.encode('utf-8')).digest()).decode('ascii')
+    
+    def create_token(self, method, path, body):
+        """リクエストごとのJWT（HS256、APIキーで署名）"""
+        import hmac
+        
+        def encode(data):
+            return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+        
+        header = {'alg': 'HS256', 'typ': 'JWT'}
+        payload = {
+            'appid': self.application_id,
+            'iat': int(time.time()),
+            'version': 'V1',
+            'checksum': self.create_checksum(method, path, body)
+        }
+        signing_input = ".".join(encode(json.dumps(part, separators=(',', ':')).encode('utf-8'))
+                                 for part in (header, payload))
+        signature = hmac.new(self.api_key.encode('utf-8'), signing_input.encode('ascii'), hashlib.sha256).digest()
+        return f"{signing_input}.{encode(signature)}"
+    
+    def open_connection(self):
+        """新しい接続を作成"""
+        import http.client
+        import ssl
+        
+        if self.scheme == 'https':
+            context = ssl.create_default_context()
+            if not self.verify_tls:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            connection = http.client.HTTPSConnection(self.netloc, timeout=self.timeout, context=context)
+        else:
+            connection = http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+        
+        with self.lock:
+            self.connections_opened += 1
+        return connection
+    
+    def acquire_connection(self):
+        """プールから接続を取得（空の場合は新しい接続を作成）。戻り値: (接続, 再利用したか)"""
+        with self.lock:
+            if self.idle_connections:
+                return self.idle_connections.pop(), True
+        return self.open_connection(), False
+    
+    def release_connection(self, connection):
+        """使い終わった接続をプールに戻す（上限を超える場合は閉じる）"""
+        with self.lock:
+            if len(self.idle_connections) < self.pool_size:
+                self.idle_connections.append(connection)
+                return
+        connection.close()
+    
+    def request(self, method, path, query=None, body=None):
+        """APIを呼び出して result_content を返す
+        
+        プールの接続がサーバー側で切断されていた場合は、新しい接続で1回だけ再送する。
+        """
+        from urllib.parse import urlencode
+        
+        if query:
+            path = f"{path}?{urlencode(query)}"
+        body_text = json.dumps(body, ensure_ascii=False) if body is not None else ""
+        headers = {
+            'Authorization': f"Bearer {self.create_token(method, path, body_text)}",
+            'Content-Type': 'application/json;charset=utf-8'
+        }
+        
+        while True:
+            connection, reused = self.acquire_connection()
+            try:
+                connection.request(method, path, body=body_text.encode('utf-8') if body_text else None, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except ConnectionError:
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            break
+        
+        with self.lock:
+            self.requests_sent += 1
+        if response.will_close:
+            connection.close()
+        else:
+            self.release_connection(connection)
+        
+        if response.status != 200:
+            raise ApexCentralApiError(f"HTTP {response.status} {response.reason}: {path}")
+        result = json.loads(data.decode('utf-8'))
+        if result.get('result_code') != 1:
+            raise ApexCentralApiError(f"{result.get('result_description') or '不明なエラー'}: {path}")
+        return result.get('result_content')
+    
+    def close(self):
+        """プールの接続をすべて閉じる"""
+        with self.lock:
+            connections = list(self.idle_connections)
+            self.idle_connections.clear()
+        for connection in connections:
+            connection.close()
+
+class ApiStatusMixin:
+    """自動化APIでの製品の接続ステータス・ウイルスパターンファイル情報の取得（ApexOneStatusCheckerの一部）
+    
+    画面操作と同じ形式のレコード・判定結果を返すため、判定処理などはApexOneStatusCheckerのメソッドを使用する。
+    """
+    
+    def get_api_client(self):
+        """自動化APIクライアントを取得（未作成の場合は認証情報を読み込んで作成）"""
+        if self.api_client is None:
+            credentials = self.get_api_credentials()
+            if not credentials:
+                return None
+            
+            base_url = self.api_base_url
+            if not base_url:
+                parts = urlsplit(self.control_manager_url)
+                base_url = f"{parts.scheme}://{parts.netloc}"
+            self.api_client = ApexCentralApiClient(base_url, credentials['application_id'], credentials['api_key'],
+                                                   timeout=self.api_timeout, verify_tls=self.api_verify_tls,
+                                                   pool_size=self.api_pool_size)
+        return self.api_client
+    
+    def close_api_client(self):
+        """自動化APIクライアントの接続を閉じて使用状況を表示"""
+        if self.api_client is None:
+            return
+        
+        client = self.api_client
+        self.api_client = None
+        client.close()
+        print(f"🔌 自動化API: リクエスト{client.requests_sent}件 / 接続{client.connections_opened}件（キープアライブで再利用）")
+    
+    def format_virus_pattern_datetime(self, value):
+        """コンポーネント一覧と同じ日時表記に変換（例: 2025/09/02 午前 07:38:52）"""
+        ampm = "午前" if value.hour < 12 else "午後"
+        hour = value.hour % 12 or 12
+        return f"{value.strftime('%Y/%m/%d')} {ampm} {hour:02d}:{value.strftime('%M:%S')}"
+    
+    async def call_api(self, name, method, path, query=None):
+        """自動化APIをスレッドで呼び出し（処理区間として計測）"""
+        client = self.get_api_client()
+        with self.span(name, kind="API", path=path):
+            return await asyncio.get_event_loop().run_in_executor(None, client.request, method, path, query)
+    
+    def parse_api_datetime(self, value):
+        """自動化APIの日時文字列を解析（api_datetime_format が未指定の場合はISO 8601）"""
+        if self.api_datetime_format:
+            return datetime.strptime(value, self.api_datetime_format)
+        return datetime.fromisoformat(value)
+    
+    async def run_status_check_via_api(self, check_connection_status=True, check_virus_pattern=True):
+        """自動化APIから製品の接続ステータスとウイルスパターンファイル情報を取得
+        
+        画面操作（run_status_check）と同じ形式のレコード・判定結果を返す。取得できない場合は "ERROR"。
+        エンドポイントとフィールド名の既定値は実機で未確認のため、画面操作と同じ内容になるとは限らない。
+        """
+        print("🔌 自動化APIから製品の接続ステータスとウイルスパターンファイル情報を取得します")
+        if self.api_placeholder_defaults:
+            print("⚠️ 自動化APIのエンドポイント・フィールド名は実機で未確認の既定値（モックコンソールの形式）です。"
+                  "実際の応答に合わせて設定し、api_placeholder_defaults を False にしてください")
+        try:
+            if not self.get_api_client():
+                return "ERROR"
+            
+            servers = await self.call_api("API: 製品サーバー一覧", "GET", self.api_product_servers_path) or []
+            fields = self.api_server_fields
+            records = [{key: server.get(field, '') for key, field in fields.items()}
+                       for server in servers if server.get(fields['product']) and server.get(fields['status'])]
+            if servers and not records:
+                print(f"⚠️ 製品サーバー一覧の応答に {fields['product']}・{fields['status']} の両方を含むレコードがありません"
+                      f"（応答のフィールド: {', '.join(sorted(servers[0]))}）。api_server_fields を確認してください")
+            print(f"📊 自動化APIから取得した製品数: {len(records)}件")
+            
+            result = None
+            if check_connection_status:
+                self.product_status_records = [{key: record[key] for key in ('product', 'server', 'status', 'last_connected')}
+                                               for record in records]
+                product_status_dict = {}
+                for product in self.target_products:
+                    record = self.find_product_status_record(product)
+                    if record:
+                        product_status_dict[product] = record['status']
+                        print(f"     ✅ 製品「{product}」のステータス: {record['status']}（自動化API）")
+                result = self.judge_product_statuses(product_status_dict)
+            
+            if check_virus_pattern:
+                # サーバーごとのコンポーネント一覧は同じ接続プールで並行して取得
+                entity_ids = {record['product']: record['entity_id'] for record in records}
+                targets = [server_name for server_name in self.api_pattern_servers if entity_ids.get(server_name)]
+                components = await asyncio.gather(*[
+                    self.call_api(f"API: コンポーネント一覧 {server_name}", "GET", self.api_components_path,
+                                  {'entity_id': entity_ids[server_name]})
+                    for server_name in targets
+                ])
+                fields = self.api_component_fields
+                for server_name, server_components in zip(targets, components):
+                    for component in server_components or []:
+                        if component.get(fields['component']) != self.api_virus_pattern_component:
+                            continue
+                        # 画面の行全体テキストと同じ形式（コンポーネント名・バージョン・最終更新日時）で保存
+                        updated_at = self.parse_api_datetime(component[fields['last_updated']])
+                        virus_info = (f"{component[fields['component']]}{component.get(fields['version'], '')}"
+                                      f"{self.format_virus_pattern_datetime(updated_at)}")
+                        if server_name == "PCVTMU53_OSCE":
+                            self.current_pcvtmu53_virus_info = virus_info
+                        elif server_name == "PCVTMU54_OSCE":
+                            self.current_pcvtmu54_virus_info = virus_info
+                        print(f"✅ {server_name}のウイルスパターンファイル情報: {virus_info}")
+                        break
+                    else:
+                        print(f"⚠️ {server_name}のウイルスパターンファイル情報が見つかりませんでした")
+            
+            print(f"\n🎉 自動化APIでのステータスチェックが完了しました！")
+            return result
+            
+        except Exception as e:
+            self.last_server_error = e
+            print(f"❌ 自動化APIでのステータスチェックエラー: {e}")
+            if 'CERTIFICATE_VERIFY_FAILED' in str(e):
+                print("💡 自己署名証明書のコンソールでは --api-insecure で証明書の検証を無効にできます")
+            return "ERROR"
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ApexOne Benchmarks
+ApexOneStatusCheckerのPython側の処理（ログ解析・日付検証・製品ステータス検索）のマイクロベンチマーク
+生成したフィクスチャで規模ごとの所要時間を計測し、保存済みのベースラインと比較する
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+LOG_LINE_SCALES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+PRODUCT_SCALES = {'4': 0, '5000': 4996}
+
+CHECKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ApexOne_status_checker.py")
+# サブコマンドごとの起動時間（インタプリタの起動・モジュールの読み込み・1000行のログの処理を含む）
+CLI_COMMANDS = {
+    'summary': ['summary'],
+    'history': ['history'],
+    'validate-pattern': ['validate-pattern'],
+}
+# ブラウザを使わないサブコマンドの起動時間の上限（ミリ秒、最小値で判定）。ベースラインの有無にかかわらず超えた場合は終了コード1
+CLI_STARTUP_BUDGET_MS = 80
+# checkサブコマンドが実行時に読み込むモジュール（ブラウザを起動せずに読み込み時間のみ計測）
+CHECK_IMPORTS = "import ApexOne_checker, playwright.async_api, cryptography.fernet"
+
+def format_pattern_datetime(value):
+    """ウイルスパターンファイルの日時表記（例: 2025/09/02 午前 07:38:52）"""
+    ampm = "午前" if value.hour < 12 else "午後"
+    hour = value.hour % 12 or 12
+    return f"{value.strftime('%Y/%m/%d')} {ampm} {hour:02d}:{value.strftime('%M:%S')}"
+
+def build_run_block(run_time):
+    """統合ログファイルの1回分の実行記録（実際の出力形式と同じ構成）"""
+    pattern_time = format_pattern_datetime(run_time - timedelta(hours=2))
+    timestamp = run_time.strftime("%Y-%m-%d %H:%M:%S")
+    log_date = run_time.strftime("%Y/%m/%d %H:%M:%S")
+    lines = [
+        "",
+        f"=== {timestamp} ===",
+        "ステータスチェック結果: OK",
+        "詳細: 全製品が有効",
+        "対象製品数: 4",
+        "有効製品数: 4",
+        "-" * 50,
+    ]
+    for server in ("PCVTMU53_OSCE", "PCVTMU54_OSCE"):
+        lines += [
+            "",
+            f"=== {server} ウイルスパターンファイル行 1 ===",
+            f"行全体テキスト: ウイルスパターンファイル20.481.80{pattern_time}",
+            f"取得日時: {run_time.strftime('%Y-%m-%d')}",
+            "日付検証結果: ✅ 0日前の情報（正常範囲内）",
+            "-" * 50,
+        ]
+    lines += [
+        f"[{timestamp}] ApexOne Log Checker 開始",
+        f"[{timestamp}] サーバーアクセス開始: https://pcvtmu53:4343/officescan/",
+        f"[{timestamp}] サーバー pcvtmu53: {log_date}\tPCVTMU53\tユーザ「tad.asahi-np.co.jp\\1040120」が次の役割を使用してログインしました: ゲストユーザ (ビルトイン)。",
+        f"[{timestamp}] サーバーアクセス開始: https://pcvtmu54:4343/officescan/",
+        f"[{timestamp}] サーバー pcvtmu54: {log_date}\tPCVTMU54\tユーザ「tad.asahi-np.co.jp\\1040120」が次の役割を使用してログインしました: ゲストユーザ (ビルトイン)。",
+        f"[{timestamp}] 処理完了: 成功 2/2 サーバー",
+    ]
+    return lines
+
+def generate_log_fixture(path, line_count):
+    """指定行数の統合ログファイルを生成（古い実行から順に追記された状態を再現）"""
+    run_time = datetime.now() - timedelta(hours=line_count)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < line_count:
+            block = build_run_block(run_time)[:line_count - written]
+            f.write("\n".join(block) + "\n")
+            written += len(block)
+            run_time += timedelta(hours=1)
+
+def generate_widget_fixture(extra_products, target_products):
+    """製品の接続ステータスウィジェットのテキストとレコード（対象製品は末尾に配置して最悪ケースを再現）"""
+    last_connected = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
+    products = [f"PCV{index:05d}_OSCE" for index in range(extra_products)] + list(target_products)
+    records = [
+        {'product': product, 'server': product.split('_')[0].lower(), 'status': "有効", 'last_connected': last_connected}
+        for product in products
+    ]
+    frame_text = "製品の接続ステータス製品サーバステータス最終接続日時" + "".join(
+        f"{record['product']}{record['server']}{record['status']}{record['last_connected']}" for record in records
+    )
+    return frame_text, records
+
+def measure(function, repeat, min_sample_seconds=0.05):
+    """関数を繰り返し実行し、1回あたりの所要時間（秒）の中央値と最小値を返す（標準出力は破棄）
+    
+    短時間で終わる関数は1サンプルが min_sample_seconds 以上になるようまとめて実行し、計測誤差を抑える。
+    """
+    with redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        function()
+        loops = max(1, int(min_sample_seconds / max(time.perf_counter() - started, 1e-9)))
+        
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(loops):
+                function()
+            durations.append((time.perf_counter() - started) / loops)
+    durations.sort()
+    return {'median_s': durations[len(durations) // 2], 'min_s': durations[0]}
+
+def run_cli(args, cwd):
+    """チェッカーを別プロセスで実行（起動時間の計測用）"""
+    subprocess.run([sys.executable] + args, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def run_cli_benchmarks(work_dir, repeat):
+    """サブコマンドごとの起動時間と、checkで読み込むモジュールの読み込み時間を計測"""
+    results = {}
+    generate_log_fixture(os.path.join(work_dir, "apexone_integrated.log"), LOG_LINE_SCALES['1k'])
+    for name, args in CLI_COMMANDS.items():
+        results[f'cli_startup[{name}]'] = measure(lambda: run_cli([CHECKER_SCRIPT] + args, work_dir), repeat)
+    
+    # Playwrightやcryptographyが未インストールの環境では計測しない
+    probe = subprocess.run([sys.executable, '-c', CHECK_IMPORTS], cwd=os.path.dirname(CHECKER_SCRIPT),
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if probe.returncode == 0:
+        results['cli_import[check]'] = measure(
+            lambda: run_cli(['-c', CHECK_IMPORTS], os.path.dirname(CHECKER_SCRIPT)), repeat)
+    else:
+        print("💡 Playwrightまたはcryptographyが未インストールのため cli_import[check] は計測しません")
+    return results
+
+def run_benchmarks(scales, repeat):
+    """全ベンチマークを実行して結果を返す"""
+    from ApexOne_checker import ApexOneStatusChecker
+    checker = ApexOneStatusChecker()
+    
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="apexone_bench_")
+    try:
+        # ウイルスパターンファイルの日付検証（正規表現による日時の解析）
+        now = datetime.now()
+        virus_infos = [
+            f"ウイルスパターンファイル20.{index % 1000:03d}.80{format_pattern_datetime(now - timedelta(hours=index))}"
+            for index in range(1000)
+        ]
+        results['validate_virus_pattern_date[x1000]'] = measure(
+            lambda: [checker.validate_virus_pattern_date(virus_info) for virus_info in virus_infos], repeat)
+        
+        # 製品の接続ステータス検索（表構造のレコードと周辺テキストの走査）
+        for scale, extra_products in PRODUCT_SCALES.items():
+            frame_text, records = generate_widget_fixture(extra_products, checker.target_products)
+            checker.product_status_records = records
+            results[f'find_product_status_record[products={scale}]'] = measure(
+                lambda: [checker.find_product_status_record(product) for product in checker.target_products], repeat)
+            results[f'find_product_status_by_context[products={scale}]'] = measure(
+                lambda: [checker.find_product_status_by_context(frame_text, product) for product in checker.target_products], repeat)
+        
+        # 統合ログファイルの解析（最新のウイルスパターンファイル情報の抽出とサマリー表示）
+        for scale in scales:
+            log_path = os.path.join(work_dir, f"integrated_{scale}.log")
+            generate_log_fixture(log_path, LOG_LINE_SCALES[scale])
+            checker.log_file = log_path
+            results[f'extract_latest_virus_pattern_info[lines={scale}]'] = measure(
+                checker.extract_latest_virus_pattern_info, repeat)
+            results[f'show_log_summary[lines={scale}]'] = measure(checker.show_log_summary, repeat)
+        
+        # CLIの起動時間（ブラウザを使わないサブコマンドが重いモジュールを読み込んでいないことの確認を兼ねる）
+        cli_dir = os.path.join(work_dir, "cli")
+        os.makedirs(cli_dir)
+        results.update(run_cli_benchmarks(cli_dir, repeat))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return results
+
+def load_baseline():
+    """保存済みのベースラインを読み込み"""
+    if not os.path.exists(BASELINE_FILE):
+        return None
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(results):
+    """計測結果をベースラインとして保存"""
+    baseline = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'system': platform.system(),
+        'machine': platform.machine(),
+        # マイクロ秒単位のベンチマークが丸めで潰れないよう、計測値はそのまま保存する
+        'results': results
+    }
+    with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"📝 ベースラインを保存しました: {BASELINE_FILE}")
+
+def print_results(results):
+    """計測結果を表示"""
+    print(f"\n📊 ベンチマーク結果")
+    print("=" * 80)
+    print(f"   {'中央値':>10}  {'最小':>10}  ベンチマーク")
+    for name, result in results.items():
+        print(f"   {result['median_s'] * 1000:9.3f}ms  {result['min_s'] * 1000:9.3f}ms  {name}")
+    print("=" * 80)
+
+def compare_with_baseline(results, baseline, threshold, min_delta):
+    """ベースラインと比較し、しきい値を超えて遅くなったベンチマークの一覧を返す
+
+    他の処理の影響を受けにくい最小値で比較する。増加率がしきい値を超え、かつ増加量が min_delta（秒）を超えた場合のみ性能低下とみなす。
+    ベースラインと異なるOS・CPUアーキテクチャで計測した場合は比率の表示のみ行い、性能低下の判定はしない。
+    """
+    regressions = []
+    current_platform = (platform.system(), platform.machine())
+    baseline_platform = (baseline.get('system'), baseline.get('machine'))
+    same_platform = baseline_platform == current_platform
+    print(f"\n📊 ベースラインとの比較（{baseline['created_at']}, Python {baseline['python']}, "
+          f"許容: +{threshold * 100:.0f}% かつ +{min_delta * 1000:.3f}ms）")
+    if not same_platform:
+        print(f"⚠️ ベースラインの計測環境（{baseline.get('platform', '不明')}）と今回の環境（{platform.platform()}）が異なるため、"
+              "性能低下の判定は行いません")
+        print("💡 この環境で比較する場合は `py ApexOne_benchmarks.py run --save-baseline` でベースラインを作り直してください")
+    print("=" * 80)
+    print(f"   {'ベースライン':>10}  {'今回':>10}  {'比率':>7}  ベンチマーク")
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if not base:
+            print(f"   {'-':>10}  {result['min_s'] * 1000:8.3f}ms  {'-':>7}  {name}（ベースラインなし）")
+            continue
+        
+        ratio = result['min_s'] / base['min_s'] if base['min_s'] > 0 else float('inf')
+        delta = result['min_s'] - base['min_s']
+        if ratio > 1 + threshold and delta > min_delta:
+            if same_platform:
+                regressions.append(name)
+                icon = "❌"
+            else:
+                icon = "⚠️"
+        elif ratio < 1 - threshold and -delta > min_delta:
+            icon = "🚀"
+        else:
+            icon = "✅"
+        print(f"   {base['min_s'] * 1000:8.3f}ms  {result['min_s'] * 1000:8.3f}ms  {ratio:6.2f}×  {icon} {name}")
+    print("=" * 80)
+    
+    if not same_platform:
+        print("⚠️ 計測環境が異なるため、性能低下の判定は省略しました")
+    elif regressions:
+        print(f"❌ 性能が低下したベンチマーク: {len(regressions)}件")
+    else:
+        print("✅ 性能の低下はありません")
+    return regressions
+
+def check_startup_budget(results, budget):
+    """ブラウザを使わないサブコマンドの起動時間が上限（秒）以内か確認し、上限を超えたベンチマークの一覧を返す"""
+    over_budget = [name for name, result in results.items()
+                   if name.startswith('cli_startup[') and result['min_s'] > budget]
+    if over_budget:
+        print(f"❌ 起動時間が上限（{budget * 1000:.0f}ms）を超えたサブコマンド: {', '.join(over_budget)}")
+        print("💡 ApexOne_status_checker.py・ApexOne_log_reader.py の読み込み時に重いモジュールを読み込んでいないか確認してください")
+    else:
+        print(f"✅ ブラウザを使わないサブコマンドの起動時間は上限（{budget * 1000:.0f}ms）以内です")
+    return over_budget
+
+def parse_arguments():
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description="ApexOne Benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = subparsers.add_parser('run', help="ベンチマークを実行して結果を表示する")
+    run_parser.add_argument('--save-baseline', action='store_true', help="結果をベースラインとして保存する")
+    
+    compare_parser = subparsers.add_parser('compare', help="ベンチマークを実行してベースラインと比較する")
+    compare_parser.add_argument('--threshold', type=float, default=0.3,
+                                help="性能低下とみなす最小値の増加率（既定: 0.3 = 30%%）")
+    compare_parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                                help="性能低下とみなす最小値の増加量（ミリ秒、既定: 1.0）。計測誤差程度の差は無視する")
+    
+    for sub_parser in (run_parser, compare_parser):
+        sub_parser.add_argument('--repeat', type=int, default=5, help="各ベンチマークの繰り返し回数")
+        sub_parser.add_argument('--quick', action='store_true', help="100万行のログファイルを対象外にする")
+        sub_parser.add_argument('--startup-budget-ms', type=float, default=CLI_STARTUP_BUDGET_MS,
+                                help=f"ブラウザを使わないサブコマンドの起動時間の上限（ミリ秒、既定: {CLI_STARTUP_BUDGET_MS}）")
+    return parser.parse_args()
+
+def main():
+    """メイン関数"""
+    args = parse_arguments()
+    scales = [scale for scale in LOG_LINE_SCALES if not (args.quick and scale == '1m')]
+    
+    print("⏱️ ベンチマークを実行中...")
+    results = run_benchmarks(scales, args.repeat)
+    print_results(results)
+    over_budget = check_startup_budget(results, args.startup_budget_ms / 1000)
+    
+    if args.command == 'run':
+        if args.save_baseline:
+            save_baseline(results)
+        return 1 if over_budget else 0
+    
+    baseline = load_baseline()
+    if not baseline:
+        print(f"❌ ベースラインがありません: {BASELINE_FILE}")
+        print("💡 先に `py ApexOne_benchmarks.py run --save-baseline` を実行してください")
+        return 1
+    regressions = compare_with_baseline(results, baseline, args.threshold, args.min_delta_ms / 1000)
+    return 1 if regressions or over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
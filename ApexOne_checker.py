@@ -0,0 +1,3791 @@
+# -*- coding: utf-8 -*-
+"""
+ApexOne Checker
+Chromeデバッグモード起動とApexOneステータスチェックの本体（ApexOneStatusChecker）
+コマンドラインからは ApexOne_status_checker.py のcheck・serveサブコマンドで使用する
+"""
+
+import sys
+
+# Playwright・cryptographyなど読み込みに時間のかかるモジュールは、使用する関数の中で読み込む
+import asyncio
+import subprocess
+import time
+import os
+import io
+import re
+import socket
+import csv
+import json
+import hashlib
+import random
+import contextvars
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from urllib.parse import urlsplit, urljoin, unquote
+from datetime import datetime, timedelta
+
+from ApexOne_alerts import AlertMixin
+from ApexOne_api_client import ApiStatusMixin
+from ApexOne_har import HarMixin
+from ApexOne_log_reader import LogReader
+from ApexOne_metrics import MetricsMixin
+from ApexOne_profiler import ProfilerMixin
+
+# 実行中の計測区間（span）のID（asyncioタスクごとに親子関係を追跡するためContextVarで保持）
+current_span_id = contextvars.ContextVar('current_span_id', default=None)
+
+# 並行実行中のフェーズ・差分記録モードのログ出力先（設定されている間はファイルに書かずに (ファイル名, テキスト) をバッファーへ溜める）
+log_event_buffer = contextvars.ContextVar('log_event_buffer', default=None)
+
+# サーバーごとの直近のエラー（並行実行するフェーズ間で混ざらないようタスクごとに保持）
+last_server_error_var = contextvars.ContextVar('last_server_error', default=None)
+
+class FrameRegistry:
+    """ページ内のフレームをPlaywrightのイベント（attach・navigate・detach）で追跡し、名前で待ち受ける
+    
+    フレームは name 属性と、URLのファイル名（例: iframe_index.aspx）の両方で登録する。
+    page.frames の走査や固定待機の代わりに、読み込み完了の時点でFutureを完了させる。
+    """
+    def __init__(self, page, load_state="domcontentloaded"):
+        self.page = page
+        self.load_state = load_state
+        self.attached = {}      # フレーム → 名前（読み込み前のフレームも含む、エラー表示用）
+        self.loaded = {}        # 名前 → 読み込み済みのフレーム
+        self.waiters = {}       # 名前 → 次の読み込み完了を待つ (Future, 条件) のリスト
+        self.navigation_waiters = {}   # 名前 → 次の遷移開始（framenavigated）を待つFutureのリスト
+        self.tasks = set()      # 読み込み完了を待っている登録処理（完了時に破棄）
+        
+        for frame in page.frames:
+            self.on_attached(frame)
+            self.on_navigated(frame)
+        page.on("frameattached", self.on_attached)
+        page.on("framenavigated", self.on_navigated)
+        page.on("framedetached", self.on_detached)
+    
+    def frame_keys(self, frame):
+        """フレームを登録する名前（name属性とURLのファイル名）"""
+        keys = []
+        if frame.name:
+            keys.append(frame.name)
+        url = urlsplit(frame.url)
+        file_name = url.path.rsplit('/', 1)[-1]
+        if url.scheme in ('http', 'https') and file_name and file_name not in keys:
+            keys.append(file_name)
+        return keys
+    
+    def on_attached(self, frame):
+        self.attached[frame] = frame.name
+    
+    def on_navigated(self, frame):
+        # 前の文書での登録を外し、新しい文書の読み込み完了を待ってから登録し直す
+        self.unregister(frame)
+        for key in self.frame_keys(frame):
+            for future in self.navigation_waiters.pop(key, []):
+                if not future.done():
+                    future.set_result(frame)
+        task = asyncio.ensure_future(self.register_when_loaded(frame))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+    
+    def on_detached(self, frame):
+        self.attached.pop(frame, None)
+        self.unregister(frame)
+    
+    def unregister(self, frame):
+        for key in [key for key, loaded_frame in self.loaded.items() if loaded_frame is frame]:
+            del self.loaded[key]
+    
+    async def register_when_loaded(self, frame):
+        try:
+            await frame.wait_for_load_state(self.load_state)
+        except Exception:
+            return
+        if frame.is_detached():
+            return
+        
+        for key in self.frame_keys(frame):
+            self.loaded[key] = frame
+            remaining = []
+            for future, predicate in self.waiters.pop(key, []):
+                if future.done():
+                    continue
+                if predicate is None or predicate(frame):
+                    future.set_result(frame)
+                else:
+                    # 別の文書の読み込み（直前の操作の遅れた読み込みなど）は待ち続ける
+                    remaining.append((future, predicate))
+            if remaining:
+                self.waiters[key] = remaining
+    
+    def expect(self, name, predicate=None):
+        """次に name のフレームが読み込まれた時点で完了するFutureを作成（クリックなどの操作の前に呼び出す）
+        
+        predicate を指定した場合は、predicate(frame) が真となる読み込みまで待つ。
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(name, []).append((future, predicate))
+        return future
+    
+    def expect_navigation(self, name):
+        """次に name のフレームの遷移が始まった時点で完了するFutureを作成（読み込み完了は待たない）"""
+        future = asyncio.get_running_loop().create_future()
+        self.navigation_waiters.setdefault(name, []).append(future)
+        return future
+    
+    def cancel(self, name, future):
+        """expect・expect_navigation で作成したFutureの待ち受けを取り消す（操作に失敗した場合など）"""
+        self.waiters[name] = [waiter for waiter in self.waiters.get(name, []) if waiter[0] is not future]
+        self.navigation_waiters[name] = [waiter for waiter in self.navigation_waiters.get(name, []) if waiter is not future]
+    
+    async def wait(self, future, name, timeout):
+        """expect で作成したFutureの完了を待機（期限内に読み込まれない場合は TimeoutError）"""
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.cancel(name, future)
+            loaded = ', '.join(sorted(self.loaded)) or "なし"
+            pending = ', '.join(sorted({frame_name for frame, frame_name in self.attached.items()
+                                        if frame_name and frame_name not in self.loaded})) or "なし"
+            raise TimeoutError(f"フレーム「{name}」が{timeout:.0f}秒以内に読み込まれませんでした"
+                               f"（読み込み済み: {loaded} / 読み込み中: {pending}）") from None
+    
+    async def wait_for(self, name, timeout):
+        """name のフレームを取得（読み込み済みであればすぐに返し、未読み込みであれば読み込み完了まで待機）"""
+        frame = self.loaded.get(name)
+        if frame and not frame.is_detached():
+            return frame
+        return await self.wait(self.expect(name), name, timeout)
+
+class ApexOneStatusChecker(LogReader, AlertMixin, ApiStatusMixin, HarMixin, MetricsMixin, ProfilerMixin):
+    def __init__(self):
+        super().__init__()
+        self.debug_port = 9222
+        self.user_data_dir = r"C:\Users\1040120\chrome_debug_profile"
+        self.chrome_exe = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+        self.chrome_management_enabled = True      # Chromeデバッグモードの起動・終了を行う（False の場合は debug_port で起動済みのChromeに接続するのみ）
+        self.target_products = [
+            'PCVTMU54_OSCE', 'PCVTMU53_OSCE', 'PCVTMU54_TMSM', 'PCVTMU53_TMSM'
+        ]
+        self.status_keywords = ['有効', '無効', '接続なし', '接続中', 'エラー', '警告']
+        self.control_manager_url = "https://pcvtmc53/webapp/"
+        
+        # ログチェック機能用の設定
+        self.log_check_servers = [
+            "https://pcvtmu53:4343/officescan/",
+            "https://pcvtmu54:4343/officescan/"
+        ]
+        self.credentials_file = "secure_credentials.enc"
+        self.key_file = "encryption_key.key"
+        self.log_checker_file = "apexone_integrated.log"
+        
+        # ウイルスパターンファイル情報を保存する変数
+        self.current_pcvtmu53_virus_info = None
+        self.current_pcvtmu54_virus_info = None
+        
+        # 製品の接続ステータスウィジェットから取得した全製品のレコード
+        # （product, server, status, last_connected の辞書のリスト）
+        self.product_status_records = []
+        
+        # 実行間で引き継ぐ状態（イベントログのウォーターマークなど）の保存先
+        self.state_file = "apexone_state.json"
+        self.state_lock_wait_seconds = 10          # 状態ファイルの更新ロックを待つ上限時間（秒）
+        self.state_lock = threading.RLock()
+        self.state_lock_depth = 0
+        
+        # Apex Central 自動化API（既定では無効。--use-apiで有効化。取得できない場合は画面操作にフォールバック）
+        # エンドポイントと応答のフィールド名の既定値は同梱のモックコンソールに合わせたプレースホルダーで、実際のApex Centralでは未確認
+        self.api_enabled = False
+        self.api_placeholder_defaults = True       # 既定値を実機の応答に合わせて確認・変更したら False にする（未確認の間は実行時に警告）
+        self.api_fallback_enabled = True
+        self.api_base_url = None                   # Noneの場合は control_manager_url のスキーム・ホストを使用
+        self.api_credentials_file = "secure_api_credentials.enc"   # アプリケーションIDとAPIキー（暗号化キーは key_file を共用）
+        self.api_product_servers_path = "/WebApp/API/ServerResource/ProductServers"               # プレースホルダー（未確認）
+        self.api_components_path = "/WebApp/API/ServerResource/ProductServers/Components"         # プレースホルダー（未確認）
+        self.api_virus_pattern_component = "ウイルスパターンファイル"
+        # 応答のフィールド名（プレースホルダー: 同梱のモックコンソールの応答形式。実際のコンソールの応答に合わせて変更する）
+        self.api_server_fields = {
+            'product': 'display_name',             # 製品（サーバー）名
+            'server': 'host_name',                 # ホスト名
+            'status': 'connection_status',         # 接続ステータス
+            'last_connected': 'last_connected',    # 最終接続日時
+            'entity_id': 'entity_id'               # コンポーネント一覧の取得に使うID
+        }
+        self.api_component_fields = {
+            'component': 'component',              # コンポーネント名
+            'version': 'version',                  # バージョン
+            'last_updated': 'last_updated'         # 最終更新日時
+        }
+        self.api_datetime_format = None            # 最終更新日時の形式（strptime形式、Noneの場合はISO 8601）
+        self.api_pattern_servers = ['PCVTMU53_OSCE', 'PCVTMU54_OSCE']   # ウイルスパターンファイルを取得するサーバー
+        self.api_timeout = 30                      # 1リクエストあたりのタイムアウト（秒）
+        self.api_verify_tls = True                 # サーバー証明書を検証（自己署名証明書の場合は --api-insecure で無効化）
+        self.api_pool_size = 4                     # キープアライブで保持する接続数
+        self.api_client = None
+        
+        # 多重起動の防止（別プロセスが実行中の場合は完了を待って結果を共有する）
+        self.run_lock_file = "apexone_run.lock"
+        self.run_lock_mode = "wait"                # wait: 完了を待つ / exit: 待たずに前回の結果を表示して終了
+        self.run_lock_wait_seconds = 900           # 実行中のプロセスの完了を待つ上限時間（秒）
+        self.run_lock_poll_interval = 1.0          # ロックの再試行間隔（秒）
+        self.run_lock_reuse_minutes = 30           # この時間内に完了した実行の結果は再実行せずに再利用する
+        
+        # 差分記録モード（前回から結果が変わらない実行はハートビートの1行のみ記録する）
+        self.log_delta_enabled = False
+        self.log_delta_full_record_hours = 24      # 変化がなくてもこの時間ごとに全体を記録する
+        
+        # アラート通知（NG・データ不足・🚨判定のウイルスパターンファイルを実行ごとにまとめて通知。通知先が空の場合は無効）
+        # 通知先の例: {'type': 'webhook', 'url': ...}
+        #            {'type': 'smtp', 'host': ..., 'port': 25, 'from': ..., 'to': [...], 'starttls': False}
+        #            {'type': 'file', 'path': 'apexone_alerts.jsonl'}
+        self.alert_sinks = []
+        self.alert_cooldown_minutes = 360          # 同じ状態が続く間、再通知しない時間（分）
+        self.alert_send_timeout = 10               # 通知先ごとの送信タイムアウト（秒）
+        self.alert_queue_size = 100                # アラートキューの上限
+        self.alert_dispatcher = None
+        self.last_alert_deliveries = []
+        self.resolved_alert_keys = set()           # 今回の実行で正常と判定できた状態（再通知の抑止を解除する）
+        
+        # 実行間隔の自動調整（既定では無効。--adaptive-intervalで有効化）
+        # 異常を検出したら下限まで短縮し、正常な結果が続く間は上限まで指数的に延ばす
+        self.adaptive_interval_enabled = False
+        self.adaptive_base_minutes = 60            # 調整を始める間隔・異常の解消後に戻す間隔（分、--intervalの値）
+        self.adaptive_min_minutes = 5              # 異常を検出した場合の間隔（分、下限）
+        self.adaptive_max_minutes = 1440           # 正常な結果が続く場合の間隔の上限（分）
+        self.adaptive_backoff_factor = 2.0         # 正常な結果が続く間、実行ごとに間隔を延ばす倍率
+        self.adaptive_pattern_age_days = 3         # ウイルスパターンファイルの経過日数がこれを超えたら異常（「注意が必要」の判定）
+        self.interval_decision_file = "apexone_interval.jsonl"   # 実行間隔の決定を1行ずつ追記
+        self.next_interval_minutes = None
+        self.run_failures = []                     # 結果を取得できなかった原因（Chromeの起動失敗・例外など）
+        
+        # システムイベントログの増分取り込みモード
+        # （前回取り込んだ最新イベント以降の全イベントを履歴に記録する）
+        self.event_log_incremental = True
+        
+        # システムイベントログのページ送り設定
+        # ページ番号のクエリパラメータ名は実際のApex Oneのシステムイベントログでは未確認（同梱のモックコンソールも同じ想定で実装）
+        # ページ送りが機能しない場合は同じページが返ったことを検出して走査を打ち切り、ウォーターマークは進めない
+        self.event_log_page_param = "page"      # ページ番号を指定するクエリパラメータ名（未確認）
+        self.event_log_max_pages = 20           # 1回の実行で走査する最大ページ数
+        self.event_log_pages_in_flight = 2      # 同時に先読みするページ数
+        self.event_log_max_age_hours = 72       # ウォーターマークがない場合に遡る時間
+        self.last_event_crawl_stats = None
+        # ウォーターマークより新しいイベントを全て読み終えたとみなす走査の終了理由（それ以外ではウォーターマークを進めない）
+        self.event_log_complete_stop_reasons = ('ウォーターマーク到達', '時刻カットオフ', '最終ページ')
+        
+        # チェックごとの鮮度ポリシー（時間）
+        # 前回の取得から指定時間が経過していないチェックはスキップし、保存済みの結果を再利用する（0は毎回実行）
+        self.check_freshness_hours = {
+            'connection_status': 0,   # 製品の接続ステータス（ステップ5〜8）
+            'virus_pattern': 12,      # ウイルスパターンファイル（ステップ9: ディレクトリツリーの巡回）
+            'event_logs': 0           # OfficeScanシステムイベントログ
+        }
+        
+        # サーバーURLごとのサーキットブレーカーとリトライ設定
+        self.circuit_breaker_threshold = 3          # 連続失敗がこの回数に達したらブレーカーを開放
+        self.circuit_breaker_cooldown_minutes = 60  # 開放後、この時間が経過したら試行を1回だけ許可（半開状態）
+        self.retry_attempts = 2                     # 一時的なエラーに対する再試行回数
+        self.retry_base_delay = 2.0                 # 再試行の基準待機時間（秒、指数的に増加）
+        self.retry_max_delay = 10.0                 # 再試行の最大待機時間（秒）
+        self.last_server_error = None
+        self.circuit_open_servers = set()
+        
+        # ブラウザ起動前の到達性チェック（DNS解決・TCP接続・TLSハンドシェイク）
+        self.preflight_enabled = True
+        self.preflight_timeout = 0.8        # 1エンドポイントあたりの上限時間（秒）
+        self.preflight_results = {}
+        self.unreachable_servers = set()
+        
+        # 実行全体の期限（定期実行が次回の実行と重ならないようにする）
+        self.run_deadline_seconds = 600            # 1回の実行全体の上限時間（秒）
+        self.run_deadline_reserve_seconds = 20     # 結果の書き込みとブラウザ終了のために残しておく時間（秒）
+        self.status_check_time_share = 0.6         # ステータスチェックに割り当てる残り時間の割合（逐次実行時のみ）
+        self.log_check_server_timeout = 180        # 実行期限が設定されていない場合のサーバーごとの上限時間（秒）
+        self.concurrent_phases_enabled = True      # Control ManagerとOfficeScanのチェックを別コンテキストで並行実行する
+        self.run_deadline = None
+        self.timed_out_steps = []
+        self.browser_launched = False
+        
+        # 処理区間ごとの所要時間計測（タイムライン）
+        self.timeline_file = "apexone_timeline.jsonl"   # 実行ごとのタイムラインを1行ずつ追記
+        self.timeline_top_n = 10                        # サマリーに表示する遅いステップの件数
+        self.spans = []
+        self.run_started_at = datetime.now()
+        self.run_started_perf = time.perf_counter()
+        
+        # メトリクス出力（OpenMetrics形式）
+        self.metrics_textfile = None          # テキストファイルコレクター用の出力先（Noneの場合は出力しない）
+        self.metrics_port = None              # デーモンモードでメトリクスを公開するHTTPポート
+        self.step_duration_buckets = [0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+        self.step_duration_histograms = {}
+        self.metrics_text = ""
+        self.metrics_lock = threading.Lock()
+        self.metrics_server = None
+        
+        # 状態API（/status、メモリ上の最新結果をJSONで返す。コンソールへのアクセスは行わない）
+        self.status_snapshot = {}
+        self.status_source = "memory"          # memory: 実行中のプロセスの結果 / state_file: 状態ファイルの結果
+        self.status_state_mtime = None
+        self.status_refresh_lock = threading.Lock()
+        self.last_status_result = None
+        self.last_event_log_results = []
+        
+        # 通信ウォーターフォールの記録（既定では無効。--capture-networkで有効化）
+        self.network_capture_enabled = False
+        self.network_report_file = "apexone_network.jsonl"   # 実行ごとの通信集計を1行ずつ追記
+        self.network_top_n = 10                              # サマリーに表示する遅いリクエストの件数
+        self.network_requests = []
+        
+        # Python側の処理時間のプロファイル（既定では無効。--profileで有効化）
+        self.profile_enabled = False
+        self.profile_dir = "profiles"              # 実行ごとのpstatsと折りたたみスタック（フレームグラフ用）の出力先
+        self.profile_sample_interval = 0.005       # スタックのサンプリング間隔（秒）
+        self.profile_top_n = 15                    # サマリーに表示する関数の件数
+        
+        # メモリ使用量の計測（既定では無効。--track-memoryで有効化）
+        self.memory_tracking_enabled = False
+        self.memory_top_n = 10                     # サマリーに表示するステップ・割り当て箇所の件数
+        self.chrome_pid = None                     # デバッグモードで起動したChromeのPID（不明な場合はデバッグポートから特定）
+        self.chrome_rss_samples = []
+        self.open_browser_objects = {}             # 開いているコンテキスト・ページ（閉じ忘れの検出用）
+        self.unclosed_browser_objects = []         # 作成したステップの終了時に開いたままだったコンテキスト・ページ
+        
+        # フレームの待ち受け（フレームのイベントで読み込み完了を検出する）
+        self.frame_wait_timeout = 30               # フレームの読み込みを待つ上限時間（秒）
+        self.frame_navigation_timeout = 3          # クリック後にフレームの遷移が始まるまで待つ上限時間（秒、始まらなければ表示中の文書を使う）
+        self.frame_registries = {}                 # ページ → FrameRegistry
+        
+        # HARの記録と再生（本番のコンソールの応答を記録し、オフラインで再現して性能を比較する）
+        self.har_mode = None                       # None / 'record' / 'replay'
+        self.har_dir = "har"                       # サーバーごとのHARファイルの保存先
+        self.har_latency_scale = 1.0               # 再生時の応答遅延の倍率（0で遅延なし）
+        self.har_unmatched_requests = []
+        self.auto_commit_enabled = True            # 実行後にログファイルを自動コミット・プッシュする
+        
+    def log_result(self, result, details="", cached_at=None):
+        """実行結果を統合ログファイルに記録（cached_at指定時は保存済み結果の再利用として記録）"""
+        try:
+            # 現在の日時を取得
+            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # 詳細情報を設定
+            if result == "OK":
+                details = "全製品が有効"
+            elif result == "NG":
+                details = "一部の製品が無効"
+            elif result == "INSUFFICIENT_DATA":
+                details = "データ不足"
+            else:
+                details = details or "不明"
+            
+            # 統合ログファイルに記録
+            with self.span("ログ書き込み", kind="ステータス"):
+                with io.StringIO() as f:
+                    f.write(f"\n=== {current_time} ===\n")
+                    f.write(f"ステータスチェック結果: {result}\n")
+                    f.write(f"詳細: {details}\n")
+                    if cached_at:
+                        f.write(f"取得元: キャッシュ（{cached_at} 取得）\n")
+                    f.write(f"対象製品数: {len(self.target_products)}\n")
+                    f.write(f"有効製品数: {details.count('有効') if '有効' in details else 0}\n")
+                    f.write("-" * 50 + "\n")
+                    self.append_log(self.log_file, f.getvalue())
+                    
+            print(f"📝 実行ログを記録しました: {self.log_file}")
+            
+        except Exception as e:
+            print(f"⚠️ ログ記録中にエラー: {e}")
+    
+    @property
+    def last_server_error(self):
+        """実行中のタスクで直近に発生したサーバーアクセスのエラー"""
+        return last_server_error_var.get()
+    
+    @last_server_error.setter
+    def last_server_error(self, error):
+        last_server_error_var.set(error)
+    
+    def log_event(self, message):
+        """ログイベントをファイルに記録（並行実行中のフェーズではバッファーに溜める）"""
+        try:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            log_entry = f"[{timestamp}] {message}\n"
+            
+            with self.span("ログ書き込み", kind="イベント"):
+                self.append_log(self.log_checker_file, log_entry)
+                    
+        except Exception as e:
+            print(f"⚠️ ログファイル書き込みエラー: {e}")
+    
+    def append_log(self, path, text):
+        """ログファイルに追記（バッファーが設定されている場合はバッファーに溜める）"""
+        buffer = log_event_buffer.get()
+        if buffer is not None:
+            buffer.append((path, text))
+            return
+        
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+    
+    def normalize_log_for_delta(self, entries):
+        """差分判定用にログの内容を正規化（記録日時・取得日時・経過日数・定型行など実行ごとに変わる部分を除く）
+        
+        イベントの発生日時は残し、行の重複も除かない（新しいログインイベントが1件でもあれば前回と異なる内容になる）。
+        """
+        routine_prefixes = ('取得日時:', '日付検証結果:', 'ApexOne Log Checker 開始', 'サーバーアクセス開始:')
+        lines = []
+        for _, text in entries:
+            for line in text.splitlines():
+                line = re.sub(r'^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] ', '', line.strip())
+                if not line or line.startswith(routine_prefixes) or set(line) == {'-'}:
+                    continue
+                if re.fullmatch(r'=== \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} ===', line):
+                    continue
+                lines.append(line)
+        return lines
+    
+    @contextmanager
+    def delta_log_scope(self):
+        """差分記録モードの範囲（範囲内のログ出力を溜め、前回から変化があれば全体を、なければハートビートを記録）"""
+        if not self.log_delta_enabled:
+            yield
+            return
+        
+        entries = []
+        token = log_event_buffer.set(entries)
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            log_event_buffer.reset(token)
+            self.write_delta_log(entries, completed)
+    
+    def write_delta_log(self, entries, completed=True):
+        """溜めたログを前回の記録と比較し、変化があれば全体を、なければハートビートを記録"""
+        with self.update_state() as state:
+            previous = state.get('log_delta', {})
+            fingerprint = hashlib.sha256("\n".join(self.normalize_log_for_delta(entries)).encode('utf-8')).hexdigest()
+            now = datetime.now()
+            
+            try:
+                full_record_due = now - datetime.fromisoformat(previous['full_record_at']) >= timedelta(hours=self.log_delta_full_record_hours)
+            except Exception:
+                full_record_due = True
+            
+            # 途中で例外が発生した実行は比較せず、取得できた内容をそのまま記録する
+            if not completed or full_record_due or previous.get('fingerprint') != fingerprint:
+                self.flush_log_events(entries)
+                state['log_delta'] = {
+                    'fingerprint': fingerprint,
+                    'full_record_at': now.isoformat(timespec='seconds'),
+                    'heartbeats': 0
+                }
+                print("📝 差分記録: 前回から変化があったため全体を記録しました")
+            else:
+                heartbeats = previous.get('heartbeats', 0) + 1
+                self.log_event(f"変化なし: ステータス {self.last_status_result or '不明'}"
+                               f"（前回の記録: {previous['full_record_at']}、連続{heartbeats}回）")
+                state['log_delta'] = dict(previous, heartbeats=heartbeats)
+                print(f"💓 差分記録: 前回から変化がないためハートビートのみ記録しました（連続{heartbeats}回）")
+    
+    def flush_log_events(self, entries):
+        """バッファーに溜めたログイベントをまとめてファイルに記録"""
+        if not entries:
+            return
+        
+        buffer = log_event_buffer.get()
+        if buffer is not None:
+            buffer.extend(entries)
+            return
+        
+        try:
+            with self.span("ログ書き込み", kind="イベント"):
+                for path, text in entries:
+                    with open(path, 'a', encoding='utf-8') as f:
+                        f.write(text)
+        except Exception as e:
+            print(f"⚠️ ログファイル書き込みエラー: {e}")
+    
+    async def run_buffered_phase(self, operation):
+        """ログ出力をバッファーに溜めながらフェーズを実行（戻り値: (結果, 溜めたログ)）
+        
+        別タスクとして実行すること。ContextVarはタスクごとに複製されるため、他のフェーズの出力には影響しない。
+        """
+        entries = []
+        log_event_buffer.set(entries)
+        return await operation(), entries
+    
+    def log_virus_pattern_info(self, pcvtmu53_info=None, pcvtmu54_info=None, cached_at=None):
+        """ウイルスパターンファイル情報をログに記録（改善版：実際に取得した最新情報を使用）"""
+        try:
+            virus_pattern_log = self.log_file
+            current_date = datetime.now().strftime("%Y-%m-%d")
+            
+            # 鮮度ポリシーでスキップした場合は保存済みの取得日時とキャッシュである旨を記録
+            if cached_at:
+                current_date = f"{cached_at[:10]}（キャッシュ）"
+            
+            with self.span("ログ書き込み", kind="ウイルスパターン"):
+                with io.StringIO() as f:
+                    # PCVTMU53_OSCEの情報を記録
+                    if pcvtmu53_info:
+                        date_validation_53 = self.validate_virus_pattern_date(pcvtmu53_info)
+                        f.write(f"\n=== PCVTMU53_OSCE ウイルスパターンファイル行 1 ===\n")
+                        f.write(f"行全体テキスト: {pcvtmu53_info}\n")
+                        f.write(f"取得日時: {current_date}\n")
+                        f.write(f"日付検証結果: {date_validation_53}\n")
+                        f.write("-" * 50 + "\n")
+                        
+                        print(f"📝 PCVTMU53_OSCEのウイルスパターンファイル情報をログに記録しました")
+                        print(f"   取得した情報: {pcvtmu53_info}")
+                        print(f"   📅 日付検証結果: {date_validation_53}")
+                        if date_validation_53.startswith("🚨"):
+                            self.raise_alert('virus_pattern:PCVTMU53_OSCE', "PCVTMU53_OSCE ウイルスパターンファイル",
+                                             f"{date_validation_53} / {pcvtmu53_info}")
+                        elif date_validation_53.startswith(("✅", "⚠️")):
+                            self.resolve_alert('virus_pattern:PCVTMU53_OSCE')
+                    else:
+                        # フォールバック：ログファイルから最新情報を取得
+                        latest_virus_info = self.extract_latest_virus_pattern_info()
+                        if latest_virus_info:
+                            date_validation = self.validate_virus_pattern_date(latest_virus_info)
+                            f.write(f"\n=== PCVTMU53_OSCE ウイルスパターンファイル行 1 ===\n")
+                            f.write(f"行全体テキスト: {latest_virus_info}\n")
+                            f.write(f"取得日時: {current_date}\n")
+                            f.write(f"日付検証結果: {date_validation}\n")
+                            f.write("-" * 50 + "\n")
+                            
+                            print(f"📝 PCVTMU53_OSCEのウイルスパターンファイル情報をログに記録しました（フォールバック）")
+                            print(f"   取得した情報: {latest_virus_info}")
+                            print(f"   📅 日付検証結果: {date_validation}")
+                        else:
+                            f.write(f"\n=== PCVTMU53_OSCE ウイルスパターンファイル行 1 ===\n")
+                            f.write("行全体テキスト: ウイルスパターンファイル情報を取得できませんでした\n")
+                            f.write(f"取得日時: {current_date}\n")
+                            f.write("日付検証結果: ❌ 情報取得失敗\n")
+                            f.write("-" * 50 + "\n")
+                            
+                            print(f"⚠️ PCVTMU53_OSCEのウイルスパターンファイル情報を取得できませんでした")
+                    
+                    # PCVTMU54_OSCEの情報を記録
+                    if pcvtmu54_info:
+                        date_validation_54 = self.validate_virus_pattern_date(pcvtmu54_info)
+                        f.write(f"\n=== PCVTMU54_OSCE ウイルスパターンファイル行 1 ===\n")
+                        f.write(f"行全体テキスト: {pcvtmu54_info}\n")
+                        f.write(f"取得日時: {current_date}\n")
+                        f.write(f"日付検証結果: {date_validation_54}\n")
+                        f.write("-" * 50 + "\n")
+                        
+                        print(f"📝 PCVTMU54_OSCEのウイルスパターンファイル情報をログに記録しました")
+                        print(f"   取得した情報: {pcvtmu54_info}")
+                        print(f"   📅 日付検証結果: {date_validation_54}")
+                        if date_validation_54.startswith("🚨"):
+                            self.raise_alert('virus_pattern:PCVTMU54_OSCE', "PCVTMU54_OSCE ウイルスパターンファイル",
+                                             f"{date_validation_54} / {pcvtmu54_info}")
+                        elif date_validation_54.startswith(("✅", "⚠️")):
+                            self.resolve_alert('virus_pattern:PCVTMU54_OSCE')
+                    else:
+                        # フォールバック：ログファイルから最新情報を取得
+                        latest_virus_info = self.extract_latest_virus_pattern_info()
+                        if latest_virus_info:
+                            date_validation = self.validate_virus_pattern_date(latest_virus_info)
+                            f.write(f"\n=== PCVTMU54_OSCE ウイルスパターンファイル行 1 ===\n")
+                            f.write(f"行全体テキスト: {latest_virus_info}\n")
+                            f.write(f"取得日時: {current_date}\n")
+                            f.write(f"日付検証結果: {date_validation}\n")
+                            f.write("-" * 50 + "\n")
+                            
+                            print(f"📝 PCVTMU54_OSCEのウイルスパターンファイル情報をログに記録しました（フォールバック）")
+                            print(f"   取得した情報: {latest_virus_info}")
+                            print(f"   📅 日付検証結果: {date_validation}")
+                        else:
+                            f.write(f"\n=== PCVTMU54_OSCE ウイルスパターンファイル行 1 ===\n")
+                            f.write("行全体テキスト: ウイルスパターンファイル情報を取得できませんでした\n")
+                            f.write(f"取得日時: {current_date}\n")
+                            f.write("日付検証結果: ❌ 情報取得失敗\n")
+                            f.write("-" * 50 + "\n")
+                            
+                            print(f"⚠️ PCVTMU54_OSCEのウイルスパターンファイル情報を取得できませんでした")
+                    
+                    self.append_log(virus_pattern_log, f.getvalue())
+                    
+                    # 警告レベルの判定（両方の情報がある場合）
+                    if pcvtmu53_info and pcvtmu54_info:
+                        date_validation_53 = self.validate_virus_pattern_date(pcvtmu53_info)
+                        date_validation_54 = self.validate_virus_pattern_date(pcvtmu54_info)
+                        
+                        if "❌" in date_validation_53 or "🚨" in date_validation_53 or "❌" in date_validation_54 or "🚨" in date_validation_54:
+                            print(f"   🚨 警告: ウイルスパターンファイルが古い可能性があります")
+                            print(f"   💡 手動でApexOne管理コンソールからパターンファイルの更新を確認してください")
+                        elif "⚠️" in date_validation_53 or "⚠️" in date_validation_54:
+                            print(f"   ⚠️ 注意: ウイルスパターンファイルの更新が遅れている可能性があります")
+                        else:
+                            print(f"   ✅ ウイルスパターンファイルは正常な状態です")
+                    
+        except Exception as e:
+            print(f"⚠️ ウイルスパターンファイル情報のログ記録エラー: {e}")
+    
+    def load_state(self):
+        """実行間で引き継ぐ状態ファイルを読み込み"""
+        try:
+            if not os.path.exists(self.state_file):
+                return {}
+            
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+                
+        except Exception as e:
+            print(f"⚠️ 状態ファイル読み込みエラー: {e}")
+            return {}
+    
+    def save_state(self, state):
+        """実行間で引き継ぐ状態ファイルを保存（書き込み途中の破損を防ぐため一時ファイル経由）"""
+        try:
+            temp_file = f"{self.state_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, self.state_file)
+            
+        except Exception as e:
+            print(f"⚠️ 状態ファイル保存エラー: {e}")
+    
+    @contextmanager
+    def update_state(self):
+        """状態ファイルを読み込み、ブロック内で変更した内容を保存
+        
+        並行実行中のフェーズや別プロセス（アラート送信中に次の実行が始まった場合など）が
+        古い内容で上書きしないよう、読み込みから保存までをスレッド間・プロセス間で排他する。
+        """
+        with self.state_lock:
+            handle = None
+            if self.state_lock_depth == 0:
+                handle = open(f"{self.state_file}.lock", 'a+', encoding='utf-8')
+                deadline = time.monotonic() + self.state_lock_wait_seconds
+                while not self.try_lock_file(handle):
+                    if time.monotonic() >= deadline:
+                        print("⚠️ 状態ファイルの更新ロックを取得できないため、ロックなしで更新します")
+                        handle.close()
+                        handle = None
+                        break
+                    time.sleep(0.05)
+            
+            self.state_lock_depth += 1
+            try:
+                state = self.load_state()
+                yield state
+                self.save_state(state)
+            finally:
+                self.state_lock_depth -= 1
+                if handle:
+                    self.release_run_lock(handle)
+    
+    def is_check_due(self, check_name, state=None):
+        """鮮度ポリシーに基づき、チェックを今回実行する必要があるか判定"""
+        freshness_hours = self.check_freshness_hours.get(check_name, 0)
+        if freshness_hours <= 0:
+            return True
+        
+        state = state if state is not None else self.load_state()
+        reading = state.get('check_readings', {}).get(check_name)
+        if not reading:
+            return True
+        
+        try:
+            checked_at = datetime.fromisoformat(reading['checked_at'])
+        except Exception:
+            return True
+        
+        return datetime.now() - checked_at >= timedelta(hours=freshness_hours)
+    
+    def get_cached_reading(self, check_name):
+        """保存済みのチェック結果を取得"""
+        return self.load_state().get('check_readings', {}).get(check_name)
+    
+    def record_check_reading(self, check_name, data):
+        """チェック結果を取得日時とともに状態ファイルに保存"""
+        with self.update_state() as state:
+            state.setdefault('check_readings', {})[check_name] = {
+                'checked_at': datetime.now().isoformat(timespec='seconds'),
+                'data': data
+            }
+    
+    @contextmanager
+    def span(self, name, **attributes):
+        """処理区間の所要時間を計測してタイムラインに記録"""
+        record = {
+            'id': len(self.spans) + 1,
+            'parent': current_span_id.get(),
+            'name': name,
+            'start_ms': round((time.perf_counter() - self.run_started_perf) * 1000, 1),
+            'duration_ms': None,
+            'attributes': attributes
+        }
+        self.spans.append(record)
+        token = current_span_id.set(record['id'])
+        memory_tracking = self.memory_tracking_enabled and tracemalloc.is_tracing()
+        python_memory_before = tracemalloc.get_traced_memory()[0] if memory_tracking else 0
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            current_span_id.reset(token)
+            if memory_tracking:
+                self.record_span_memory(record, python_memory_before)
+    
+    async def click_and_wait_for_frame(self, page, element, name, predicate=None):
+        """要素をクリックし、クリックで遷移するフレームの読み込み完了を待機
+        
+        frame_navigation_timeout 秒以内に遷移が始まらない場合（表示中の画面と同じでフレームが再読み込みされない場合など）は
+        待たずに表示中のフレームを返す。読み込みを確認できない場合は警告を表示して None を返す（クリック自体の失敗は呼び出し元に送出）。
+        """
+        registry = self.get_frame_registry(page)
+        loaded = registry.expect(name, predicate)
+        navigated = registry.expect_navigation(name)
+        try:
+            await element.click()
+        except Exception:
+            registry.cancel(name, loaded)
+            registry.cancel(name, navigated)
+            raise
+        
+        try:
+            await asyncio.wait_for(navigated, timeout=self.frame_navigation_timeout)
+        except asyncio.TimeoutError:
+            registry.cancel(name, loaded)
+            registry.cancel(name, navigated)
+            print(f"    💡 {name}フレームは再読み込みされませんでした（表示中の画面を使用します）")
+            return registry.loaded.get(name)
+        
+        try:
+            return await self.wait_for_frame(page, name, future=loaded)
+        except TimeoutError as e:
+            print(f"    ⚠️ {e}")
+            return None
+    
+    def write_run_timeline(self):
+        """実行全体のタイムラインをファイルに追記し、遅いステップのサマリーを表示"""
+        total_ms = round((time.perf_counter() - self.run_started_perf) * 1000, 1)
+        finished_spans = [span for span in self.spans if span['duration_ms'] is not None]
+        
+        try:
+            timeline = {
+                'run_started_at': self.run_started_at.isoformat(timespec='seconds'),
+                'total_ms': total_ms,
+                'timed_out_steps': self.timed_out_steps,
+                'spans': finished_spans
+            }
+            with open(self.timeline_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(timeline, ensure_ascii=False) + "\n")
+            print(f"📝 タイムラインを記録しました: {self.timeline_file}")
+        except Exception as e:
+            print(f"⚠️ タイムライン記録エラー: {e}")
+        
+        print(f"\n⏱️ 実行時間サマリー（合計 {total_ms / 1000:.1f}秒）")
+        print("=" * 60)
+        
+        # 子区間を持たない区間（実際に時間を消費している処理）を遅い順に表示
+        parent_ids = {span['parent'] for span in finished_spans}
+        leaf_spans = [span for span in finished_spans if span['id'] not in parent_ids]
+        print(f"🐢 遅いステップ上位{self.timeline_top_n}件:")
+        for span in sorted(leaf_spans, key=lambda span: span['duration_ms'], reverse=True)[:self.timeline_top_n]:
+            detail = ", ".join(f"{key}={value}" for key, value in span['attributes'].items())
+            detail_text = f" ({detail})" if detail else ""
+            print(f"   {span['duration_ms'] / 1000:7.2f}秒  {span['name']}{detail_text}")
+        
+        # 同名の区間の合計（フレーム待機やログ書き込みなど繰り返し発生する処理の把握用）
+        totals = {}
+        for span in leaf_spans:
+            totals.setdefault(span['name'], [0.0, 0])
+            totals[span['name']][0] += span['duration_ms']
+            totals[span['name']][1] += 1
+        print(f"📊 処理別の合計時間:")
+        for name, (duration_ms, count) in sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:self.timeline_top_n]:
+            print(f"   {duration_ms / 1000:7.2f}秒  {name}（{count}回）")
+        print("=" * 60)
+    
+    def normalize_request_url(self, url):
+        """リクエストURLを集計用のパターンに変換（クエリは値を除いたキー名のみ残す）"""
+        parts = urlsplit(url)
+        path = re.sub(r'/\d+(?=/|$)', '/{n}', parts.path)
+        query_keys = sorted({item.split('=', 1)[0] for item in parts.query.split('&') if item})
+        query_text = f"?{'&'.join(query_keys)}" if query_keys else ""
+        return f"{parts.netloc}{path}{query_text}"
+    
+    def attach_network_recorder(self, context, server):
+        """コンテキストの全リクエストの所要時間と転送量を記録するハンドラーを登録"""
+        if not self.network_capture_enabled:
+            return
+        
+        async def on_request_finished(request):
+            await self.record_network_request(server, request)
+        
+        async def on_request_failed(request):
+            await self.record_network_request(server, request, failed=True)
+        
+        context.on("requestfinished", on_request_finished)
+        context.on("requestfailed", on_request_failed)
+    
+    async def record_network_request(self, server, request, failed=False):
+        """完了したリクエスト1件のタイミングとサイズを記録"""
+        try:
+            # timingの各値はリクエスト開始からのミリ秒（取得できない項目は-1）
+            timing = request.timing
+            response_start = timing.get('responseStart', -1)
+            response_end = timing.get('responseEnd', -1)
+            
+            size = 0
+            if not failed:
+                try:
+                    sizes = await request.sizes()
+                    size = sizes.get('responseBodySize', 0) + sizes.get('responseHeadersSize', 0)
+                except Exception:
+                    # コンテキストを閉じた後などサイズが取得できない場合は0として扱う
+                    pass
+            
+            self.network_requests.append({
+                'server': server,
+                'pattern': self.normalize_request_url(request.url),
+                'url': request.url,
+                'method': request.method,
+                'resource_type': request.resource_type,
+                'ttfb_ms': round(response_start, 1) if response_start >= 0 else None,
+                'duration_ms': round(response_end, 1) if response_end >= 0 else None,
+                'bytes': max(size, 0),
+                'failed': failed
+            })
+        except Exception as e:
+            print(f"⚠️ 通信記録エラー: {e}")
+    
+    def summarize_network_requests(self):
+        """記録したリクエストをサーバー・URLパターンごとに集計"""
+        summary = {}
+        for record in self.network_requests:
+            key = (record['server'], record['pattern'])
+            entry = summary.setdefault(key, {
+                'server': record['server'],
+                'pattern': record['pattern'],
+                'resource_type': record['resource_type'],
+                'count': 0,
+                'failed': 0,
+                'bytes': 0,
+                'ttfb_ms_total': 0.0,
+                'duration_ms_total': 0.0,
+                'duration_ms_max': 0.0
+            })
+            entry['count'] += 1
+            entry['bytes'] += record['bytes']
+            if record['failed']:
+                entry['failed'] += 1
+            if record['ttfb_ms'] is not None:
+                entry['ttfb_ms_total'] += record['ttfb_ms']
+            if record['duration_ms'] is not None:
+                entry['duration_ms_total'] += record['duration_ms']
+                entry['duration_ms_max'] = max(entry['duration_ms_max'], record['duration_ms'])
+        
+        for entry in summary.values():
+            for key in ('ttfb_ms_total', 'duration_ms_total', 'duration_ms_max'):
+                entry[key] = round(entry[key], 1)
+        
+        return sorted(summary.values(), key=lambda entry: entry['duration_ms_total'], reverse=True)
+    
+    def write_network_report(self):
+        """実行全体の通信集計をファイルに追記し、遅いリクエストのサマリーを表示"""
+        if not self.network_capture_enabled:
+            return
+        
+        patterns = self.summarize_network_requests()
+        slowest = sorted(
+            [record for record in self.network_requests if record['duration_ms'] is not None],
+            key=lambda record: record['duration_ms'], reverse=True
+        )[:self.network_top_n]
+        
+        try:
+            report = {
+                'run_started_at': self.run_started_at.isoformat(timespec='seconds'),
+                'request_count': len(self.network_requests),
+                'total_bytes': sum(record['bytes'] for record in self.network_requests),
+                'patterns': patterns,
+                'slowest': slowest
+            }
+            with open(self.network_report_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report, ensure_ascii=False) + "\n")
+            print(f"📝 通信ウォーターフォールを記録しました: {self.network_report_file}")
+        except Exception as e:
+            print(f"⚠️ 通信ウォーターフォール記録エラー: {e}")
+        
+        total_bytes = sum(record['bytes'] for record in self.network_requests)
+        print(f"\n🌐 通信サマリー（{len(self.network_requests)}件, {total_bytes / 1024:.1f}KB）")
+        print("=" * 60)
+        print(f"🐢 遅いリクエスト上位{self.network_top_n}件:")
+        for record in slowest:
+            ttfb_text = f"{record['ttfb_ms'] / 1000:.2f}秒" if record['ttfb_ms'] is not None else "-"
+            print(f"   {record['duration_ms'] / 1000:7.2f}秒  TTFB {ttfb_text}  {record['resource_type']}  {record['pattern']}")
+        
+        # リソース種別ごとの合計（画像やフォントなど遮断を検討できる通信の把握用）
+        by_type = {}
+        for record in self.network_requests:
+            by_type.setdefault(record['resource_type'], [0, 0, 0.0])
+            by_type[record['resource_type']][0] += 1
+            by_type[record['resource_type']][1] += record['bytes']
+            by_type[record['resource_type']][2] += record['duration_ms'] or 0.0
+        print("📊 リソース種別ごとの合計:")
+        for resource_type, (count, size, duration_ms) in sorted(by_type.items(), key=lambda item: item[1][2], reverse=True):
+            print(f"   {duration_ms / 1000:7.2f}秒  {size / 1024:8.1f}KB  {resource_type}（{count}件）")
+        print("=" * 60)
+    
+    def record_span_memory(self, record, python_memory_before):
+        """区間終了時のメモリ使用量を記録（ステップの境界ではChromeのRSSも採取）"""
+        python_memory = tracemalloc.get_traced_memory()[0]
+        memory = {
+            'python_kb': round(python_memory / 1024, 1),
+            'python_delta_kb': round((python_memory - python_memory_before) / 1024, 1),
+            'open_contexts': sum(1 for item in self.open_browser_objects.values() if item['kind'] == 'context'),
+            'open_pages': sum(1 for item in self.open_browser_objects.values() if item['kind'] == 'page')
+        }
+        if record['parent'] is None or record['name'].startswith("ステップ"):
+            memory['chrome_rss_mb'] = self.sample_chrome_rss()
+            memory['unclosed_objects'] = self.check_unclosed_browser_objects(record)
+        record['memory'] = memory
+    
+    def check_unclosed_browser_objects(self, record):
+        """ステップ内（子の区間を含む）で開いたコンテキスト・ページのうち、ステップの終了時に開いたままのものを警告
+        
+        処理の終了時には browser_object_scope が閉じるため、閉じ忘れはステップの境界で検出する。
+        複数のステップにまたがって使うページは、ステップの外の区間（例: 「〜用ページ作成」）で開くこと。
+        """
+        span_ids = {record['id']}
+        for span in self.spans:
+            if span['parent'] in span_ids:
+                span_ids.add(span['id'])
+        
+        unclosed = [item for item in self.open_browser_objects.values()
+                    if item['opened_span'] in span_ids and not item.get('reported')]
+        for item in unclosed:
+            # 外側のステップの終了時に同じものを重ねて警告しない
+            item['reported'] = True
+            self.unclosed_browser_objects.append({
+                'kind': item['kind'],
+                'owner': item['owner'],
+                'opened_in': item['opened_in'],
+                'step': record['name']
+            })
+            print(f"⚠️ 閉じられていない{item['kind']}: {item['owner']}（{item['opened_in'] or '不明な区間'}で作成、「{record['name']}」の終了時に開いたまま）")
+        return len(unclosed)
+    
+    def find_debug_chrome_process(self):
+        """デバッグモードのChrome（ブラウザプロセス）を特定"""
+        import psutil
+        
+        if self.chrome_pid and psutil.pid_exists(self.chrome_pid):
+            return psutil.Process(self.chrome_pid)
+        
+        # 既存のChromeに接続した場合はデバッグポートで待ち受けているプロセスから特定
+        for connection in psutil.net_connections(kind='tcp'):
+            if connection.laddr and connection.laddr.port == self.debug_port and connection.status == psutil.CONN_LISTEN and connection.pid:
+                self.chrome_pid = connection.pid
+                return psutil.Process(connection.pid)
+        return None
+    
+    def sample_chrome_rss(self):
+        """Chromeのプロセスツリー全体の常駐メモリ（MB）を採取（psutilが未インストールの場合は採取しない）"""
+        try:
+            import psutil
+        except ImportError:
+            return None
+        
+        try:
+            root = self.find_debug_chrome_process()
+            if not root:
+                return None
+            
+            total = 0
+            for process in [root] + root.children(recursive=True):
+                try:
+                    total += process.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            rss_mb = round(total / 1024 / 1024, 1)
+            self.chrome_rss_samples.append(rss_mb)
+            return rss_mb
+        except Exception:
+            return None
+    
+    def track_browser_context(self, context, owner):
+        """コンテキストとその中で開かれるページを閉じ忘れ検出の対象として登録"""
+        def track(browser_object, kind):
+            key = id(browser_object)
+            opened_span = current_span_id.get()
+            opened_in = next((span['name'] for span in self.spans if span['id'] == opened_span), None)
+            self.open_browser_objects[key] = {
+                'kind': kind,
+                'owner': owner,
+                'object': browser_object,
+                'opened_span': opened_span,
+                'opened_in': opened_in,
+                'opened_at': time.perf_counter()
+            }
+            browser_object.on("close", lambda *_: self.open_browser_objects.pop(key, None))
+        
+        track(context, 'context')
+        context.on("page", lambda page: track(page, 'page'))
+    
+    async def release_browser_objects(self, owner):
+        """指定した処理で開いたページ・コンテキストのうち開いたままのものを閉じる"""
+        remaining = [item for item in self.open_browser_objects.values() if item['owner'] == owner]
+        # ページを先に閉じてからコンテキストを閉じる
+        for item in sorted(remaining, key=lambda item: item['kind'] != 'page'):
+            try:
+                await item['object'].close()
+            except Exception:
+                pass
+            self.open_browser_objects.pop(id(item['object']), None)
+    
+    @asynccontextmanager
+    async def browser_object_scope(self, owner):
+        """処理の終了時に開いたページ・コンテキストを必ず閉じる（常駐ブラウザのメモリ増加を防止）"""
+        try:
+            yield
+        finally:
+            await self.release_browser_objects(owner)
+    
+    async def new_browser_context(self, browser, server):
+        """サーバーへのアクセス用のコンテキストを作成（HARの記録・再生、通信記録、閉じ忘れ検出を設定）"""
+        options = {'ignore_https_errors': True}
+        if self.har_mode == 'record':
+            os.makedirs(self.har_dir, exist_ok=True)
+            options['record_har_path'] = self.get_har_path(server)
+            print(f"📼 HARを記録します: {options['record_har_path']}")
+        
+        # SSL証明書の検証を無効にしたコンテキストを作成
+        context = await browser.new_context(**options)
+        self.track_browser_context(context, server)
+        self.attach_network_recorder(context, server)
+        if self.har_mode == 'replay':
+            await self.install_har_replay(context, server)
+        return context
+    
+    def write_memory_report(self, start_snapshot, chrome_rss_at_start):
+        """実行全体のメモリ使用量（ステップごとの増減・ピーク）と閉じ忘れを表示"""
+        python_current, python_peak = tracemalloc.get_traced_memory()
+        end_snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        chrome_rss_at_end = self.sample_chrome_rss()
+        
+        print(f"\n🧠 メモリ使用量サマリー")
+        print("=" * 60)
+        print(f"🐍 Python: 終了時 {python_current / 1024 / 1024:.1f}MB  ピーク {python_peak / 1024 / 1024:.1f}MB")
+        if self.chrome_rss_samples:
+            print(f"🌐 Chrome: 開始時 {chrome_rss_at_start or '-'}MB  終了時 {chrome_rss_at_end or '-'}MB  ピーク {max(self.chrome_rss_samples)}MB")
+        else:
+            print("💡 Chromeのメモリは計測できませんでした（psutilが未インストールか、デバッグモードのChromeが見つかりません）")
+        
+        # Pythonのメモリ増加が大きいステップ
+        step_spans = [span for span in self.spans if 'memory' in span and 'chrome_rss_mb' in span['memory']]
+        print(f"📈 Pythonのメモリ増加が大きいステップ上位{self.memory_top_n}件:")
+        for span in sorted(step_spans, key=lambda span: span['memory']['python_delta_kb'], reverse=True)[:self.memory_top_n]:
+            chrome_text = f"  Chrome {span['memory']['chrome_rss_mb']}MB" if span['memory']['chrome_rss_mb'] is not None else ""
+            print(f"   {span['memory']['python_delta_kb']:+10.1f}KB{chrome_text}  {span['name']}")
+        
+        # 実行開始時からの割り当て増加が大きい箇所
+        print(f"📍 割り当てが増加した箇所上位{self.memory_top_n}件:")
+        for stat in end_snapshot.compare_to(start_snapshot, 'lineno')[:self.memory_top_n]:
+            frame = stat.traceback[0]
+            print(f"   {stat.size_diff / 1024:+10.1f}KB  {os.path.basename(frame.filename)}:{frame.lineno}")
+        
+        # 作成したステップの終了時に開いたままだったページ・コンテキスト
+        if self.unclosed_browser_objects:
+            print(f"⚠️ 閉じられていないコンテキスト・ページ: {len(self.unclosed_browser_objects)}件")
+            for item in self.unclosed_browser_objects:
+                print(f"   {item['kind']}: {item['owner']}（{item['opened_in'] or '不明な区間'}で作成、「{item['step']}」の終了時に開いたまま）")
+        print("=" * 60)
+    
+    def remaining_time(self, reserve=0.0):
+        """実行期限までの残り時間（秒）を返す（期限が設定されていない場合は None）"""
+        if self.run_deadline is None:
+            return None
+        return max(0.0, self.run_deadline - time.monotonic() - reserve)
+    
+    async def run_step_with_deadline(self, step_name, operation, share=1.0):
+        """実行期限の残り時間のうち share の割合を上限としてステップを実行
+        
+        上限を超えた場合は実行中の処理（Playwrightの呼び出しを含む）をキャンセルし、"TIMEOUT" を返す。
+        """
+        remaining = self.remaining_time(reserve=self.run_deadline_reserve_seconds)
+        timeout = None if remaining is None else remaining * share
+        
+        if timeout is not None:
+            if timeout <= 0:
+                print(f"⏰ {step_name}: 実行期限の残り時間がないためスキップします")
+                self.timed_out_steps.append(step_name)
+                self.log_event(f"実行期限超過のためスキップ: {step_name}")
+                return "TIMEOUT"
+            print(f"⏱️ {step_name}: 割り当て時間 {timeout:.0f}秒")
+        
+        try:
+            with self.span(step_name):
+                return await asyncio.wait_for(operation(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⏰ {step_name}: 実行期限に達したため中断しました")
+            self.timed_out_steps.append(step_name)
+            self.log_event(f"実行期限超過のため中断: {step_name}")
+            return "TIMEOUT"
+    
+    def get_circuit_breaker(self, state, server_url):
+        """状態ファイル内のサーバーURLごとのサーキットブレーカー情報を取得"""
+        return state.setdefault('circuit_breakers', {}).setdefault(server_url, {
+            'state': 'closed',
+            'failures': 0,
+            'opened_at': None
+        })
+    
+    def circuit_breaker_allows(self, server_url):
+        """サーキットブレーカーが試行を許可するか判定（戻り値: (許可, 半開状態の試行か)）"""
+        with self.update_state() as state:
+            breaker = self.get_circuit_breaker(state, server_url)
+            
+            if breaker['state'] == 'closed':
+                return True, False
+            
+            try:
+                opened_at = datetime.fromisoformat(breaker['opened_at'])
+            except Exception:
+                opened_at = datetime.min
+            
+            if datetime.now() - opened_at >= timedelta(minutes=self.circuit_breaker_cooldown_minutes):
+                breaker['state'] = 'half_open'
+                print(f"🔌 サーキットブレーカー半開: {server_url} への試行を1回だけ許可します")
+                return True, True
+            
+            return False, False
+    
+    def record_circuit_breaker_result(self, server_url, success):
+        """試行結果をサーキットブレーカーに反映"""
+        with self.update_state() as state:
+            breaker = self.get_circuit_breaker(state, server_url)
+            
+            if success:
+                if breaker['state'] != 'closed':
+                    print(f"🔌 サーキットブレーカー復旧: {server_url}")
+                    self.log_event(f"サーキットブレーカー復旧: {server_url}")
+                breaker.update({'state': 'closed', 'failures': 0, 'opened_at': None})
+            else:
+                breaker['failures'] += 1
+                if breaker['state'] == 'half_open' or breaker['failures'] >= self.circuit_breaker_threshold:
+                    breaker['state'] = 'open'
+                    breaker['opened_at'] = datetime.now().isoformat(timespec='seconds')
+                    print(f"🔌 サーキットブレーカー開放: {server_url}（連続失敗 {breaker['failures']}回）")
+                    self.log_event(f"サーキットブレーカー開放: {server_url}（連続失敗 {breaker['failures']}回）")
+    
+    def is_transient_error(self, error):
+        """再試行で回復する可能性のある一時的なエラーか判定"""
+        if error is None:
+            return False
+        
+        if isinstance(error, asyncio.TimeoutError) or type(error).__name__ == 'TimeoutError':
+            return True
+        
+        transient_markers = [
+            'net::ERR_CONNECTION_RESET',
+            'net::ERR_CONNECTION_REFUSED',
+            'net::ERR_CONNECTION_CLOSED',
+            'net::ERR_CONNECTION_TIMED_OUT',
+            'net::ERR_TIMED_OUT',
+            'net::ERR_EMPTY_RESPONSE',
+            'net::ERR_NETWORK_CHANGED',
+            'Timeout'
+        ]
+        message = str(error)
+        return any(marker in message for marker in transient_markers)
+    
+    async def run_with_circuit_breaker(self, server_url, operation, is_success=bool):
+        """サーキットブレーカーとジッター付き再試行のもとでサーバーへの処理を実行
+        
+        operation は引数なしで呼び出すコルーチン関数。ブレーカー開放中は実行せずに None を返し、
+        server_url を circuit_open_servers に追加する。
+        """
+        allowed, half_open = self.circuit_breaker_allows(server_url)
+        if not allowed:
+            print(f"⏭️ サーキットブレーカー開放中のためスキップ: {server_url}")
+            self.log_event(f"サーキットブレーカー開放中のためスキップ: {server_url}")
+            self.circuit_open_servers.add(server_url)
+            return None
+        
+        # 半開状態では再試行せず、1回の試行で復旧を判定
+        max_attempts = 1 if half_open else 1 + self.retry_attempts
+        result = None
+        success = False
+        
+        for attempt in range(1, max_attempts + 1):
+            self.last_server_error = None
+            result = await operation()
+            success = is_success(result)
+            
+            if success or attempt == max_attempts or not self.is_transient_error(self.last_server_error):
+                break
+            
+            # 指数バックオフにジッターを加えて再試行（同時再試行の集中を避ける）
+            delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempt - 1)))
+            delay *= random.uniform(0.5, 1.0)
+            print(f"🔁 一時的なエラーのため {delay:.1f}秒後に再試行します（{attempt}/{max_attempts - 1}）: {server_url}")
+            await asyncio.sleep(delay)
+        
+        self.record_circuit_breaker_result(server_url, success)
+        return result
+    
+    def parse_event_timestamp(self, event_text):
+        """システムイベント行の先頭から日時を取得（例: 2025/09/24 9:01:32）"""
+        match = re.match(r'\s*(\d{4})/(\d{1,2})/(\d{1,2})\s+(\d{1,2}):(\d{2}):(\d{2})', event_text)
+        if not match:
+            return None
+        
+        try:
+            return datetime(*(int(value) for value in match.groups()))
+        except ValueError:
+            return None
+    
+    def hash_event(self, event_text):
+        """システムイベント行の内容ハッシュを計算"""
+        normalized = ' '.join(event_text.split())
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
+    def generate_encryption_key(self):
+        """暗号化キーを生成"""
+        from cryptography.fernet import Fernet
+        
+        if not os.path.exists(self.key_file):
+            key = Fernet.generate_key()
+            with open(self.key_file, 'wb') as key_file:
+                key_file.write(key)
+            print(f"🔑 新しい暗号化キーを生成しました: {self.key_file}")
+        else:
+            with open(self.key_file, 'rb') as key_file:
+                key = key_file.read()
+        return key
+    
+    def encrypt_credentials(self, username, password, domain):
+        """認証情報を暗号化して保存"""
+        from cryptography.fernet import Fernet
+        
+        try:
+            key = self.generate_encryption_key()
+            fernet = Fernet(key)
+            
+            credentials = {
+                'username': username,
+                'password': password,
+                'domain': domain,
+                'created_at': datetime.now().isoformat()
+            }
+            
+            encrypted_data = fernet.encrypt(json.dumps(credentials).encode())
+            
+            with open(self.credentials_file, 'wb') as f:
+                f.write(encrypted_data)
+            
+            print("🔐 認証情報を暗号化して保存しました")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 認証情報の暗号化に失敗: {e}")
+            return False
+    
+    def decrypt_credentials(self):
+        """保存された認証情報を復号化"""
+        from cryptography.fernet import Fernet
+        
+        try:
+            if not os.path.exists(self.credentials_file):
+                return None
+            
+            with open(self.key_file, 'rb') as key_file:
+                key = key_file.read()
+            
+            fernet = Fernet(key)
+            
+            with open(self.credentials_file, 'rb') as f:
+                encrypted_data = f.read()
+            
+            decrypted_data = fernet.decrypt(encrypted_data)
+            credentials = json.loads(decrypted_data.decode())
+            
+            print("🔓 保存された認証情報を復号化しました")
+            return credentials
+            
+        except Exception as e:
+            print(f"❌ 認証情報の復号化に失敗: {e}")
+            return None
+    
+    def get_manual_credentials(self):
+        """手動で認証情報を入力"""
+        print("\n🔐 初回アクセスのため、認証情報を入力してください")
+        print("=" * 50)
+        
+        username = input("ユーザー名: ").strip()
+        password = input("パスワード: ").strip()
+        domain = input("ドメイン (tad.asahi-np.co.jp): ").strip()
+        
+        # ドメインが空の場合はデフォルト値を設定
+        if not domain:
+            domain = "tad.asahi-np.co.jp"
+        
+        if not username or not password:
+            print("❌ ユーザー名とパスワードは必須です")
+            return None
+        
+        # 認証情報を暗号化して保存
+        if self.encrypt_credentials(username, password, domain):
+            return {'username': username, 'password': password, 'domain': domain}
+        else:
+            return None
+    
+    def encrypt_api_credentials(self, application_id, api_key):
+        """自動化APIのアプリケーションIDとAPIキーを暗号化して保存"""
+        from cryptography.fernet import Fernet
+        
+        try:
+            fernet = Fernet(self.generate_encryption_key())
+            credentials = {
+                'application_id': application_id,
+                'api_key': api_key,
+                'created_at': datetime.now().isoformat()
+            }
+            
+            with open(self.api_credentials_file, 'wb') as f:
+                f.write(fernet.encrypt(json.dumps(credentials).encode()))
+            
+            print("🔐 自動化APIの認証情報を暗号化して保存しました")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 自動化APIの認証情報の暗号化に失敗: {e}")
+            return False
+    
+    def get_api_credentials(self):
+        """自動化APIの認証情報を取得（保存されていない場合は入力して暗号化保存）"""
+        from cryptography.fernet import Fernet
+        
+        if os.path.exists(self.api_credentials_file):
+            try:
+                with open(self.key_file, 'rb') as key_file:
+                    fernet = Fernet(key_file.read())
+                with open(self.api_credentials_file, 'rb') as f:
+                    return json.loads(fernet.decrypt(f.read()).decode())
+            except Exception as e:
+                print(f"❌ 自動化APIの認証情報の復号化に失敗: {e}")
+                return None
+        
+        # スケジューラーなど入力できない環境では入力待ちで止まらないよう、すぐに失敗させる
+        if not sys.stdin or not sys.stdin.isatty():
+            print(f"❌ 自動化APIの認証情報（{self.api_credentials_file}）がありません")
+            print("💡 端末から一度 `py ApexOne_status_checker.py check --use-api` を実行して、アプリケーションIDとAPIキーを保存してください")
+            return None
+        
+        print("\n🔐 自動化APIのアプリケーションIDとAPIキーを入力してください")
+        print("   （Apex Centralの 管理 > 設定 > 自動化APIアクセス設定 で登録したもの）")
+        application_id = input("アプリケーションID: ").strip()
+        api_key = input("APIキー: ").strip()
+        if not application_id or not api_key:
+            print("❌ アプリケーションIDとAPIキーは必須です")
+            return None
+        
+        if self.encrypt_api_credentials(application_id, api_key):
+            return {'application_id': application_id, 'api_key': api_key}
+        return None
+    
+    def auto_commit_logs(self):
+        """ログファイルを自動的にコミット・プッシュ"""
+        print(f"\n📝 ログファイルの自動コミット・プッシュを開始...")
+        
+        try:
+            # ログファイルの存在確認
+            log_files = [self.log_file]
+            existing_logs = []
+            
+            for log_file in log_files:
+                if os.path.exists(log_file):
+                    existing_logs.append(log_file)
+                    print(f"✅ ログファイル発見: {log_file}")
+                else:
+                    print(f"ℹ️ ログファイルが存在しません: {log_file}")
+            
+            if not existing_logs:
+                print("ℹ️ コミット対象のログファイルがありません")
+                return
+            
+            # Gitの状態確認
+            try:
+                git_status = subprocess.run(['git', 'status', '--porcelain'], 
+                                          capture_output=True, text=True, check=True)
+                
+                if not git_status.stdout.strip():
+                    print("ℹ️ コミット対象の変更がありません")
+                    return
+                
+                print("🔍 Gitの変更状況:")
+                for line in git_status.stdout.strip().split('\n'):
+                    if line.strip():
+                        print(f"   {line}")
+                
+            except subprocess.CalledProcessError as e:
+                print(f"⚠️ Git状態確認エラー: {e}")
+                return
+            except FileNotFoundError:
+                print("⚠️ Gitがインストールされていません")
+                return
+            
+            # ログファイルをステージング
+            print(f"\n🚀 ログファイルをステージング中...")
+            for log_file in existing_logs:
+                try:
+                    add_result = subprocess.run(['git', 'add', log_file], 
+                                              capture_output=True, text=True, check=True)
+                    print(f"✅ {log_file} をステージングしました")
+                except subprocess.CalledProcessError as e:
+                    print(f"❌ {log_file} のステージングに失敗: {e}")
+                    continue
+            
+            # コミット
+            print(f"📝 ログファイルをコミット中...")
+            try:
+                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                commit_message = f"docs: ログファイル更新 - {current_time}"
+                
+                commit_result = subprocess.run(['git', 'commit', '-m', commit_message], 
+                                             capture_output=True, text=True, check=True)
+                print(f"✅ コミット完了: {commit_message}")
+                print(f"   コミットハッシュ: {commit_result.stdout.strip()}")
+                
+            except subprocess.CalledProcessError as e:
+                print(f"❌ コミットに失敗: {e}")
+                if e.stderr:
+                    print(f"   エラー詳細: {e.stderr.strip()}")
+                return
+            
+            # プッシュ
+            print(f"🚀 リモートリポジトリにプッシュ中...")
+            try:
+                remaining = self.remaining_time()
+                push_timeout = max(10, remaining) if remaining is not None else None
+                push_result = subprocess.run(['git', 'push'], 
+                                           capture_output=True, text=True, check=True,
+                                           timeout=push_timeout)
+                print(f"✅ プッシュ完了")
+                
+            except subprocess.TimeoutExpired:
+                print(f"⏰ プッシュが実行期限内に完了しませんでした")
+                print(f"💡 手動でプッシュする場合は以下のコマンドを実行してください:")
+                print(f"   git push")
+                return
+            except subprocess.CalledProcessError as e:
+                print(f"❌ プッシュに失敗: {e}")
+                if e.stderr:
+                    print(f"   エラー詳細: {e.stderr.strip()}")
+                
+                # プッシュ失敗時は手動プッシュの案内
+                print(f"💡 手動でプッシュする場合は以下のコマンドを実行してください:")
+                print(f"   git push")
+                return
+            
+            print(f"🎉 ログファイルの自動コミット・プッシュが完了しました！")
+            
+        except Exception as e:
+            print(f"⚠️ ログファイル自動コミット・プッシュ中にエラー: {e}")
+            print(f"💡 手動でコミット・プッシュすることをお勧めします")
+    
+    def check_chrome_processes(self):
+        """既存のChromeプロセスをチェック（標準ライブラリ版）"""
+        print("🔍 既存のChromeプロセスをチェック中...")
+        
+        try:
+            # tasklistコマンドでChromeプロセスを確認
+            result = subprocess.run(['tasklist', '/fi', 'imagename eq chrome.exe'], 
+                                  capture_output=True, text=True, shell=True)
+            
+            if 'chrome.exe' in result.stdout:
+                print("✅ 既存のChromeプロセスを発見")
+                return True
+            else:
+                print("ℹ️ 既存のChromeプロセスは見つかりませんでした")
+                return False
+        except Exception as e:
+            print(f"⚠️ プロセスチェック中にエラー: {e}")
+            return False
+    
+    def check_debug_port(self):
+        """デバッグポートが利用可能かチェック"""
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            result = sock.connect_ex(('localhost', self.debug_port))
+            sock.close()
+            return result == 0
+        except Exception:
+            return False
+    
+    def terminate_debug_chrome(self):
+        """デバッグモードで起動したChromeプロセスを終了"""
+        print("\n🔄 デバッグモードで起動したChromeプロセスを終了中...")
+        
+        try:
+            # tasklistコマンドでChromeプロセスを確認
+            result = subprocess.run(['tasklist', '/FI', 'IMAGENAME eq chrome.exe'], 
+                                  capture_output=True, text=True, shell=True)
+            
+            if 'chrome.exe' in result.stdout:
+                print("🔍 実行中のChromeプロセスを確認中...")
+                
+                # デバッグポートを使用しているChromeプロセスを特定
+                debug_chrome_pids = []
+                
+                # netstatコマンドでポート9222を使用しているプロセスを確認
+                try:
+                    netstat_result = subprocess.run(['netstat', '-ano'], 
+                                                  capture_output=True, text=True, shell=True)
+                    
+                    for line in netstat_result.stdout.split('\n'):
+                        if ':9222' in line and 'LISTENING' in line:
+                            # PIDを抽出
+                            parts = line.strip().split()
+                            if len(parts) >= 5:
+                                pid = parts[-1]
+                                debug_chrome_pids.append(pid)
+                                print(f"    🎯 ポート9222を使用中のプロセスPID: {pid}")
+                
+                except Exception as e:
+                    print(f"    ⚠️ netstat実行エラー: {e}")
+                
+                # デバッグポートを使用しているChromeプロセスを終了
+                if debug_chrome_pids:
+                    print(f"🚀 デバッグモードChromeプロセス {len(debug_chrome_pids)}個を終了中...")
+                    
+                    for pid in debug_chrome_pids:
+                        try:
+                            # taskkillコマンドでプロセスを終了
+                            kill_result = subprocess.run(['taskkill', '/PID', pid, '/F'], 
+                                                       capture_output=True, text=True, shell=True)
+                            
+                            if kill_result.returncode == 0:
+                                print(f"    ✅ PID {pid} のプロセスを終了しました")
+                            else:
+                                print(f"    ❌ PID {pid} のプロセス終了に失敗: {kill_result.stderr}")
+                        
+                        except Exception as e:
+                            print(f"    ❌ PID {pid} のプロセス終了中にエラー: {e}")
+                    
+                    # 少し待機してからポートの状態を確認
+                    time.sleep(2)
+                    
+                    if not self.check_debug_port():
+                        print("✅ デバッグポート9222が解放されました")
+                    else:
+                        print("⚠️ デバッグポート9222がまだ使用中です")
+                else:
+                    print("ℹ️ デバッグポート9222を使用しているChromeプロセスは見つかりませんでした")
+            else:
+                print("ℹ️ 実行中のChromeプロセスは見つかりませんでした")
+                
+        except Exception as e:
+            print(f"⚠️ デバッグChromeプロセス終了中にエラー: {e}")
+        
+        print("🏁 Chromeプロセス終了処理完了")
+    
+    def launch_chrome_debug(self, max_wait=30):
+        """Chromeデバッグモードを起動（起動完了まで最大 max_wait 秒待機）"""
+        print("🚀 Chromeデバッグモード起動スクリプト")
+        print(f"🔧 デバッグポート: {self.debug_port}")
+        print(f"📁 ユーザーデータディレクトリ: {self.user_data_dir}")
+        
+        # Chrome実行ファイルの存在確認
+        if not os.path.exists(self.chrome_exe):
+            print(f"❌ Chrome実行ファイルが見つかりません: {self.chrome_exe}")
+            return False
+        
+        print(f"✅ Chrome実行ファイル発見: {self.chrome_exe}")
+        
+        # 既存のChromeプロセスチェック
+        existing_chrome = self.check_chrome_processes()
+        
+        # デバッグポートが利用可能かチェック
+        if self.check_debug_port():
+            print("✅ デバッグポート9222が利用可能です")
+            if existing_chrome:
+                print("ℹ️ 既存のChromeプロセスがデバッグモードで動作中です")
+            else:
+                print("ℹ️ デバッグモードのChromeが動作中です")
+            return True
+        
+        if existing_chrome:
+            print("ℹ️ 既存のChromeプロセスが発見されましたが、デバッグモードではありません")
+            print("💡 既存のChromeは停止せず、新しくデバッグモードで起動します")
+        
+        # Chromeをデバッグモードで起動
+        print("🚀 Chromeをデバッグモードで起動中...")
+        chrome_cmd = [
+            self.chrome_exe,
+            f"--remote-debugging-port={self.debug_port}",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-default-apps",
+            "--disable-popup-blocking",
+            "--disable-web-security",
+            "--disable-features=VizDisplayCompositor",
+            "--ignore-certificate-errors",
+            "--ignore-ssl-errors",
+            "--ignore-certificate-errors-spki-list",
+            "--new-window",
+            "about:blank"
+        ]
+        
+        print(f"📝 実行コマンド: {' '.join(chrome_cmd)}")
+        
+        try:
+            process = subprocess.Popen(chrome_cmd, 
+                                     stdout=subprocess.DEVNULL, 
+                                     stderr=subprocess.DEVNULL)
+            self.chrome_pid = process.pid
+            print(f"✅ Chromeプロセス起動成功 (PID: {process.pid})")
+        except Exception as e:
+            print(f"❌ Chrome起動エラー: {e}")
+            return False
+        
+        # Chrome起動完了まで待機
+        print("⏳ Chrome起動完了まで待機中...")
+        for i in range(max_wait):
+            if self.check_debug_port():
+                print("✅ ポート9222が利用可能になりました")
+                print("🎯 Playwrightから接続可能です")
+                print("\n🎉 Chromeデバッグモード起動完了！")
+                return True
+            time.sleep(1)
+            if i % 5 == 0:
+                print(f"⏳ 待機中... ({i+1}/{max_wait}秒)")
+        
+        print("❌ Chrome起動タイムアウト")
+        return False
+    
+    async def check_chrome_debug_port(self):
+        """Chromeデバッグポートが利用可能かチェック（非同期版）"""
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            result = sock.connect_ex(('localhost', self.debug_port))
+            sock.close()
+            return result == 0
+        except Exception:
+            return False
+    
+    async def extract_product_status_table(self, widget_frame):
+        """製品の接続ステータスウィジェットを表形式のレコードとして一括抽出"""
+        try:
+            records = await widget_frame.evaluate('''
+                (statusKeywords) => {
+                    const clean = (text) => (text || "").replace(/\\s+/g, " ").trim();
+                    
+                    // 「製品の接続ステータス」見出しを含む最小の要素を探す
+                    let heading = null;
+                    for (const el of document.querySelectorAll("body *")) {
+                        if ((el.textContent || "").includes("製品の接続ステータス")) {
+                            heading = el;
+                        }
+                    }
+                    if (!heading) {
+                        return [];
+                    }
+                    
+                    // 見出しから上位へたどり、ウィジェット内の表を探す
+                    let table = null;
+                    for (let node = heading; node && !table; node = node.parentElement) {
+                        table = node.tagName === "TABLE" && node.querySelector("tr td") ? node : node.querySelector("table");
+                    }
+                    if (!table) {
+                        return [];
+                    }
+                    
+                    // ヘッダー行から列の位置を判定
+                    const columns = {product: -1, server: -1, status: -1, last_connected: -1};
+                    const headerRow = table.querySelector("tr");
+                    let headerLabels = [];
+                    if (headerRow) {
+                        headerLabels = Array.from(headerRow.querySelectorAll("th, td")).map(cell => clean(cell.textContent));
+                        headerLabels.forEach((text, index) => {
+                            if (text.includes("最終") || text.includes("日時")) {
+                                columns.last_connected = index;
+                            } else if (text.includes("ステータス") || text.includes("状態")) {
+                                columns.status = index;
+                            } else if (text.includes("サーバ")) {
+                                columns.server = index;
+                            } else if (text.includes("製品")) {
+                                columns.product = index;
+                            }
+                        });
+                    }
+                    
+                    const headerDetected = Object.values(columns).some(index => index >= 0);
+                    
+                    const records = [];
+                    for (const row of table.querySelectorAll("tr")) {
+                        if (row.querySelector("th") || row.querySelector("tr")) {
+                            continue;
+                        }
+                        const cells = Array.from(row.querySelectorAll("td")).map(cell => clean(cell.textContent));
+                        if (cells.length === 0) {
+                            continue;
+                        }
+                        // tdで書かれたヘッダー行（繰り返し表示されるものを含む）はデータとして扱わない
+                        if (headerDetected && (row === headerRow ||
+                            cells.every((text, index) => text === headerLabels[index]))) {
+                            continue;
+                        }
+                        
+                        // ヘッダーから判定できない列はセルの内容で補完
+                        let statusIndex = columns.status;
+                        if (statusIndex < 0 || statusIndex >= cells.length) {
+                            statusIndex = cells.findIndex(text => statusKeywords.includes(text));
+                        }
+                        const productIndex = columns.product >= 0 ? columns.product : 0;
+                        const product = cells[productIndex] || "";
+                        const status = statusIndex >= 0 ? (cells[statusIndex] || "") : "";
+                        if (!product || !status) {
+                            continue;
+                        }
+                        
+                        records.push({
+                            product: product,
+                            server: columns.server >= 0 ? (cells[columns.server] || "") : "",
+                            status: status,
+                            last_connected: columns.last_connected >= 0 ? (cells[columns.last_connected] || "") : ""
+                        });
+                    }
+                    return records;
+                }
+            ''', self.status_keywords)
+            
+            return [record for record in records or [] if record.get('product') and record.get('status')]
+            
+        except Exception as e:
+            print(f"⚠️ 製品の接続ステータス表の抽出エラー: {e}")
+            return []
+    
+    def find_product_status_record(self, product):
+        """抽出済みの製品ステータスレコードから指定製品のレコードを取得"""
+        for record in self.product_status_records:
+            if record['product'] == product:
+                return record
+        
+        # 製品名に付加情報が含まれる場合は部分一致で検索
+        for record in self.product_status_records:
+            if product in record['product']:
+                return record
+        
+        return None
+    
+    def find_product_status_by_context(self, frame_text, product):
+        """製品名の前後50文字からステータスキーワードを検索（フォールバック用）"""
+        # 製品名の出現位置を全て取得
+        product_positions = []
+        start = 0
+        while True:
+            pos = frame_text.find(product, start)
+            if pos == -1:
+                break
+            product_positions.append(pos)
+            start = pos + 1
+        
+        print(f"   製品名「{product}」の出現回数: {len(product_positions)}回")
+        
+        # 各出現位置の周辺でステータスを探す
+        for i, pos in enumerate(product_positions):
+            print(f"   📍 出現位置{i+1}: 文字位置{pos}")
+            
+            # 製品名の前後50文字を取得
+            context_start = max(0, pos - 50)
+            context_end = min(len(frame_text), pos + len(product) + 50)
+            context = frame_text[context_start:context_end]
+            
+            print(f"     周辺テキスト: '{context}'")
+            
+            # ステータスキーワードを探す（最初に見つかったステータスを採用）
+            for keyword in self.status_keywords:
+                if keyword in context:
+                    print(f"     🎯 ステータス発見: '{keyword}'")
+                    return keyword
+        
+        return None
+    
+    async def collect_product_status(self, page, iframe_index, widget_frame):
+        """ダッシュボード → 概要 → 製品の接続ステータスを確認して判定結果を返す（ステップ5〜8）"""
+        # ステップ5: ダッシュボードボタンをクリック
+        print("📋 ステップ5: ダッシュボードボタンを探す中...")
+        dashboard_found = False
+        
+        dashboard_search_terms = [
+            'text=ダッシュボード',
+            'span:has-text("ダッシュボード")'
+        ]
+        
+        with self.span("ステップ5: ダッシュボード表示"):
+            for search_term in dashboard_search_terms:
+                try:
+                    dashboard_elements = iframe_index.locator(search_term)
+                    dashboard_count = await dashboard_elements.count()
+                    if dashboard_count > 0:
+                        print(f"    🎯 ダッシュボード要素発見: {search_term} -> {dashboard_count}個")
+                        
+                        dashboard_element = dashboard_elements.first
+                        print(f"    🚀 ダッシュボードをクリック中...")
+                        # ダッシュボードはウィジェットフレーム（mainTMCM）に読み込まれる
+                        await self.click_and_wait_for_frame(page, dashboard_element, 'mainTMCM')
+                        print(f"    ✅ ダッシュボードをクリックしました")
+                        
+                        dashboard_found = True
+                        break
+                        
+                except Exception as e:
+                    pass
+            
+        if not dashboard_found:
+            print("❌ ダッシュボードボタンが見つかりませんでした")
+            return
+        
+        # ステップ6: 概要ボタンをクリック
+        print("📋 ステップ6: 概要ボタンを探す中...")
+        overview_found = False
+        
+        overview_search_terms = [
+            'text=概要',
+            'span:has-text("概要")',
+            'a:has-text("概要")',
+            'button:has-text("概要")',
+            '[title*="概要"]',
+            '[alt*="概要"]'
+        ]
+        
+        with self.span("ステップ6: 概要表示"):
+            for search_term in overview_search_terms:
+                try:
+                    overview_elements = widget_frame.locator(search_term)
+                    overview_count = await overview_elements.count()
+                    if overview_count > 0:
+                        print(f"    🎯 概要要素発見: {search_term} -> {overview_count}個")
+                        
+                        overview_element = overview_elements.first
+                        print(f"    🚀 概要をクリック中...")
+                        await self.click_and_wait_for_frame(page, overview_element, 'mainTMCM')
+                        print(f"    ✅ 概要をクリックしました")
+                        
+                        overview_found = True
+                        break
+                        
+                except Exception as e:
+                    pass
+            
+            if not overview_found:
+                print("❌ 概要ボタンが見つかりませんでした")
+                print("💡 代替方法: フレーム全体から概要関連の要素を検索中...")
+                
+                # 代替方法：フレーム全体のテキストから概要要素を検索
+                try:
+                    frame_text = await widget_frame.evaluate('() => document.body.textContent')
+                    if '概要' in frame_text:
+                        print("✅ フレーム内に「概要」テキストを発見")
+                        
+                        # 概要を含む要素を探す
+                        overview_elements = widget_frame.locator('*:has-text("概要")')
+                        overview_count = await overview_elements.count()
+                        if overview_count > 0:
+                            print(f"    🎯 概要要素を代替方法で発見: {overview_count}個")
+                            
+                            # 最初の概要要素をクリック
+                            overview_element = overview_elements.first
+                            print(f"    🚀 概要をクリック中...")
+                            await self.click_and_wait_for_frame(page, overview_element, 'mainTMCM')
+                            print(f"    ✅ 概要をクリックしました")
+                            
+                            overview_found = True
+                        else:
+                            print("❌ 概要要素のクリックに失敗しました")
+                    else:
+                        print("❌ フレーム内に「概要」テキストが見つかりませんでした")
+                except Exception as e:
+                    print(f"    ❌ 代替方法での概要検索エラー: {e}")
+                
+                if not overview_found:
+                    print("❌ 概要ボタンの検索に完全に失敗しました")
+                    return
+            print()
+            
+        # ステップ7: 製品の接続ステータスを確認
+        print("📋 ステップ7: 製品の接続ステータスを確認中...")
+        
+        with self.span("ステップ7: 製品ステータス抽出"):
+            product_status_dict = {}  # 製品名をキーとしてステータスを保存
+            
+            try:
+                status_section_elements = widget_frame.locator('text=製品の接続ステータス')
+                # 概要タブのウィジェットが描画されるまで待機（表示されない場合は下の判定で見つからない扱い）
+                try:
+                    await status_section_elements.first.wait_for(state='visible', timeout=self.frame_wait_timeout * 1000)
+                except Exception as e:
+                    print(f"    ⚠️ 「製品の接続ステータス」ウィジェットの表示を確認できませんでした: {e}")
+                if await status_section_elements.count() > 0:
+                    print("✅ 「製品の接続ステータス」セクションを発見")
+                    
+                    # ウィジェットを表形式で一括抽出（1回のページ内評価で全製品を取得）
+                    print("🔍 ウィジェットの表構造から製品ステータスを一括抽出中...")
+                    self.product_status_records = await self.extract_product_status_table(widget_frame)
+                    print(f"📊 ウィジェットから取得した製品数: {len(self.product_status_records)}件")
+                    for record in self.product_status_records:
+                        print(f"   - {record['product']} / {record['server']} / {record['status']} / {record['last_connected']}")
+                    
+                    for product in self.target_products:
+                        record = self.find_product_status_record(product)
+                        if record:
+                            product_status_dict[product] = record['status']
+                            print(f"     ✅ 製品「{product}」のステータス: {record['status']}（表構造）")
+                    
+                    # 表構造から取得できなかった製品のみ、周辺テキスト検索でフォールバック
+                    missing_products = [product for product in self.target_products if product not in product_status_dict]
+                    if missing_products:
+                        print("🔍 フォールバック: ウィジェットフレーム全体からテキストを取得中...")
+                        frame_text = await widget_frame.evaluate('() => document.body.textContent')
+                        
+                        if frame_text:
+                            print(f"📄 フレームテキスト長: {len(frame_text)}文字")
+                            
+                            for product in missing_products:
+                                print(f"\n🔍 製品「{product}」のステータスを検索中...")
+                                found_status = self.find_product_status_by_context(frame_text, product)
+                                if found_status:
+                                    product_status_dict[product] = found_status
+                                    print(f"     ✅ 製品「{product}」のステータス: {found_status}")
+                                else:
+                                    print(f"     ❌ 製品「{product}」のステータスが見つかりませんでした")
+                        else:
+                            print("❌ フレームテキストを取得できませんでした")
+                    
+                    print(f"\n📊 取得結果:")
+                    for i, product in enumerate(self.target_products, 1):
+                        status = product_status_dict.get(product, "不明")
+                        status_icon = "✅" if status == "有効" else "❌"
+                        print(f"   {i}. {product}: {status_icon} {status}")
+                    
+                else:
+                    print("❌ 「製品の接続ステータス」セクションが見つかりません")
+                    
+            except Exception as e:
+                print(f"❌ 製品の接続ステータス検索エラー: {e}")
+            
+        return self.judge_product_statuses(product_status_dict)
+    
+    def judge_product_statuses(self, product_status_dict):
+        """対象製品のステータスから判定結果を決定（ステップ8、画面操作・自動化APIで共通）"""
+        print(f"\n📋 ステップ8: ステータス値の判定中...")
+        
+        # 4つの製品すべてが見つかったかチェック
+        found_products = len(product_status_dict)
+        print(f"📊 取得された製品ステータス: {found_products}個/{len(self.target_products)}個")
+        
+        if found_products >= 4:
+            print(f"✅ 4つ以上のステータス値を取得: {found_products}個")
+            
+            # すべて「有効」かチェック
+            all_valid = all(status == '有効' for status in product_status_dict.values())
+            
+            if all_valid:
+                result = "OK"
+                print("🎉 すべてのステータスが「有効」です → 結果: OK")
+            else:
+                result = "NG"
+                print("⚠️ 一部のステータスが「有効」以外です → 結果: NG")
+                
+                # 詳細なステータス情報を表示
+                print("📋 詳細ステータス:")
+                for product, status in product_status_dict.items():
+                    status_icon = "✅" if status == '有効' else "❌"
+                    print(f"   製品: {product} -> {status_icon} {status}")
+        else:
+            result = "INSUFFICIENT_DATA"
+            print(f"⚠️ 十分なデータが取得できませんでした → 結果: INSUFFICIENT_DATA")
+        
+        print(f"\n🎯 最終判定結果: {result}")
+        
+        return result
+    
+    async def collect_virus_pattern_info(self, page, iframe_index):
+        """ディレクトリ → 製品 → ローカルフォルダ → 各サーバーのウイルスパターンファイル情報を取得（ステップ9）"""
+        # ステップ9: 新しいチェック処理（ディレクトリ→製品→ローカルフォルダ→PCVTMU53_OSCE→ステータス）
+        print(f"\n📋 ステップ9: 新しいチェック処理を開始中...")
+        print("🎯 ディレクトリ → 製品 → ローカルフォルダ → PCVTMU53_OSCE → ステータス")
+        
+        try:
+            # ディレクトリボタンをクリック
+            print("📋 9-1: ディレクトリボタンを探す中...")
+            directory_found = False
+            
+            directory_search_terms = [
+                'text=ディレクトリ',
+                'span:has-text("ディレクトリ")'
+            ]
+            
+            with self.span("9-1: ディレクトリ表示"):
+                for search_term in directory_search_terms:
+                    try:
+                        directory_elements = iframe_index.locator(search_term)
+                        directory_count = await directory_elements.count()
+                        if directory_count > 0:
+                            print(f"    🎯 ディレクトリ要素発見: {search_term} -> {directory_count}個")
+                            
+                            directory_element = directory_elements.first
+                            print(f"    🚀 ディレクトリをクリック中...")
+                            # ディレクトリの管理画面はウィジェットフレーム（mainTMCM）に読み込まれる
+                            await self.click_and_wait_for_frame(page, directory_element, 'mainTMCM')
+                            print(f"    ✅ ディレクトリをクリックしました")
+                            
+                            directory_found = True
+                            break
+                            
+                    except Exception as e:
+                        pass
+                
+            if not directory_found:
+                print("❌ ディレクトリボタンが見つかりませんでした")
+            else:
+                # 製品メニューをクリック
+                print("📋 9-2: 製品メニューを探す中...")
+                product_menu_found = False
+                
+                product_menu_search_terms = [
+                    'text=製品',
+                    'span:has-text("製品")'
+                ]
+                
+                with self.span("9-2: 製品メニュー表示"):
+                    for search_term in product_menu_search_terms:
+                        try:
+                            product_menu_elements = iframe_index.locator(search_term)
+                            product_menu_count = await product_menu_elements.count()
+                            if product_menu_count > 0:
+                                print(f"    🎯 製品メニュー要素発見: {search_term} -> {product_menu_count}個")
+                                
+                                product_menu_element = product_menu_elements.first
+                                print(f"    🚀 製品メニューをクリック中...")
+                                await product_menu_element.click()
+                                print(f"    ✅ 製品メニューをクリックしました")
+                                
+                                product_menu_found = True
+                                break
+                                
+                        except Exception as e:
+                            pass
+                    
+                if not product_menu_found:
+                    print("❌ 製品メニューが見つかりませんでした")
+                else:
+                    # 製品メニューのクリックで表示されるleftNameフレームの読み込みを待機
+                    print("📋 9-3: leftNameフレームの読み込みを待機中...")
+                    with self.span("9-3: leftNameフレーム検出"):
+                        try:
+                            leftname_frame = await self.wait_for_frame(page, 'leftName')
+                        except TimeoutError as e:
+                            print(f"    ❌ {e}")
+                            leftname_frame = None
+                        
+                    if not leftname_frame:
+                        print("❌ leftNameフレームが見つかりませんでした")
+                    else:
+                        # PCVTMU53_OSCEとPCVTMU54_OSCEの両方からウイルスパターン情報を取得
+                        pcvtmu_servers = ["PCVTMU53_OSCE", "PCVTMU54_OSCE"]
+                        
+                        # ローカルフォルダをクリック
+                        print("📋 9-4: ローカルフォルダを探す中...")
+                        with self.span("9-4: ローカルフォルダ表示"):
+                            local_folder_found = False
+                            
+                            try:
+                                local_folder_elements = leftname_frame.locator("text=ローカルフォルダ")
+                                local_folder_count = await local_folder_elements.count()
+                                if local_folder_count > 0:
+                                    print(f"    🎯 ローカルフォルダ要素発見: {local_folder_count}個")
+                                    
+                                    local_folder_element = local_folder_elements.first
+                                    print(f"    🚀 ローカルフォルダをクリック中...")
+                                    await local_folder_element.click()
+                                    print(f"    ✅ ローカルフォルダをクリックしました")
+                                    local_folder_found = True
+                                    
+                                    # フォルダが展開され、サーバーが表示されるまで待機
+                                    server_pattern = re.compile('|'.join(re.escape(server_name) for server_name in pcvtmu_servers))
+                                    try:
+                                        await leftname_frame.get_by_text(server_pattern).first.wait_for(
+                                            state='visible', timeout=self.frame_wait_timeout * 1000)
+                                    except Exception as e:
+                                        print(f"    ⚠️ ローカルフォルダ内のサーバーの表示を確認できませんでした: {e}")
+                                    
+                            except Exception as e:
+                                print(f"    ❌ ローカルフォルダクリックエラー: {e}")
+                            
+                        if not local_folder_found:
+                            print("❌ ローカルフォルダが見つからないか、クリックできませんでした")
+                        else:
+                            for server_name in pcvtmu_servers:
+                                print(f"📋 9-5: {server_name}を探す中...")
+                                with self.span("9-5: サーバー選択", server=server_name):
+                                    pcvtmu_found = False
+                                    registry = self.get_frame_registry(page)
+                                    iframe_name_loaded = None
+                                    
+                                    try:
+                                        pcvtmu_elements = leftname_frame.locator(f"text={server_name}")
+                                        pcvtmu_count = await pcvtmu_elements.count()
+                                        if pcvtmu_count > 0:
+                                            print(f"    🎯 {server_name}要素発見: {pcvtmu_count}個")
+                                            
+                                            pcvtmu_element = pcvtmu_elements.first
+                                            # クリックしたサーバーの画面が読み込まれた時点で完了する待ち受けを先に登録
+                                            # （前のサーバーの遅れた読み込みで先に進まないよう、URLで照合する）
+                                            server_url_matches = self.server_frame_matcher(
+                                                leftname_frame.url, await pcvtmu_element.get_attribute('href'), server_name)
+                                            iframe_name_loaded = registry.expect('IframeName', server_url_matches)
+                                            print(f"    🚀 {server_name}をクリック中...")
+                                            await pcvtmu_element.click()
+                                            print(f"    ✅ {server_name}をクリックしました")
+                                            
+                                            pcvtmu_found = True
+                                            
+                                    except Exception as e:
+                                        print(f"    ❌ {server_name}クリックエラー: {e}")
+                                        if iframe_name_loaded is not None:
+                                            registry.cancel('IframeName', iframe_name_loaded)
+                                    
+                                if not pcvtmu_found:
+                                    print(f"❌ {server_name}が見つからないか、クリックできませんでした")
+                                    continue
+                                else:
+                                    # サーバーのステータス画面の読み込みを待機
+                                    print("📋 9-6: IframeNameフレームの読み込みを待機中...")
+                                with self.span("9-6: IframeNameフレーム検出", server=server_name):
+                                    try:
+                                        iframe_name_frame = await self.wait_for_frame(page, 'IframeName', future=iframe_name_loaded)
+                                    except TimeoutError as e:
+                                        print(f"    ❌ {e}")
+                                        iframe_name_frame = None
+                                    
+                                if not iframe_name_frame:
+                                    print("❌ IframeNameフレームが見つかりませんでした")
+                                else:
+                                    # ウイルスパターンファイル行を抽出（詳細情報取得版）
+                                    print(f"📋 9-7: {server_name}のウイルスパターンファイル行を抽出中...")
+                                    
+                                    # ログファイル名を事前に定義
+                                    virus_pattern_log = self.log_file
+                                    
+                                    # 取得したウイルスパターンファイル情報を保存
+                                    with self.span("9-7: ウイルスパターンファイル行抽出", server=server_name):
+                                        current_virus_info = None
+                                        
+                                        try:
+                                             # ウイルスパターンファイル要素を検索
+                                             virus_pattern_elements = iframe_name_frame.locator("text=ウイルスパターンファイル")
+                                             if await virus_pattern_elements.count() > 0:
+                                                 print(f"✅ ウイルスパターンファイル要素を発見: {await virus_pattern_elements.count()}個")
+                                                 
+                                                 # 各要素の詳細情報を取得
+                                                 virus_pattern_lines = []
+                                                 for i in range(await virus_pattern_elements.count()):
+                                                     try:
+                                                         element = virus_pattern_elements.nth(i)
+                                                         
+                                                         # 要素のテキスト内容を取得
+                                                         text_content = await element.text_content()
+                                                         print(f"   要素{i+1}: '{text_content}'")
+                                                         
+                                                         # より詳細な情報を取得するための改善された方法
+                                                         try:
+                                                             # 要素の親要素から行全体の情報を取得
+                                                             detailed_info = await element.evaluate('''
+                                                                 el => {
+                                                                     let info = {
+                                                                         element_text: el.textContent || "",
+                                                                         parent_text: "",
+                                                                         grandparent_text: "",
+                                                                         row_text: "",
+                                                                         table_info: ""
+                                                                     };
+                                                                     
+                                                                     // 親要素（行）の情報を取得
+                                                                     if (el.parentElement) {
+                                                                         info.parent_text = el.parentElement.textContent?.trim() || "";
+                                                                         
+                                                                         // さらに上位の要素（テーブル行）の情報を取得
+                                                                         if (el.parentElement.parentElement) {
+                                                                             info.grandparent_text = el.parentElement.parentElement.textContent?.trim() || "";
+                                                                         }
+                                                                         
+                                                                         // テーブル行全体の情報を取得
+                                                                         let row = el.closest('tr') || el.parentElement.closest('tr');
+                                                                         if (row) {
+                                                                             info.row_text = row.textContent?.trim() || "";
+                                                                         }
+                                                                         
+                                                                         // テーブル全体の情報を取得
+                                                                         let table = el.closest('table');
+                                                                         if (table) {
+                                                                             info.table_info = table.textContent?.trim() || "";
+                                                                         }
+                                                                     }
+                                                                     
+                                                                     return info;
+                                                                 }
+                                                             ''')
+                                                             
+                                                             print(f"     詳細情報取得完了")
+                                                             print(f"     親要素テキスト: '{detailed_info.get('parent_text', '')}'")
+                                                             print(f"     上位要素テキスト: '{detailed_info.get('grandparent_text', '')}'")
+                                                             print(f"     行全体テキスト: '{detailed_info.get('row_text', '')}'")
+                                                             
+                                                             # 行全体の情報を保存
+                                                             line_info = {
+                                                                 'element_text': detailed_info.get('element_text', ''),
+                                                                 'parent_text': detailed_info.get('parent_text', ''),
+                                                                 'grandparent_text': detailed_info.get('grandparent_text', ''),
+                                                                 'row_text': detailed_info.get('row_text', ''),
+                                                                 'table_info': detailed_info.get('table_info', ''),
+                                                                 'element_index': i
+                                                             }
+                                                             virus_pattern_lines.append(line_info)
+                                                             
+                                                             # 最新のウイルスパターンファイル情報を保存
+                                                             if i == 0:  # 最初の要素（最新）を保存
+                                                                 current_virus_info = detailed_info.get('row_text', '') or detailed_info.get('grandparent_text', '')
+                                                                 
+                                                                 # サーバー別に情報を保存
+                                                                 if server_name == "PCVTMU53_OSCE":
+                                                                     self.current_pcvtmu53_virus_info = current_virus_info
+                                                                 elif server_name == "PCVTMU54_OSCE":
+                                                                     self.current_pcvtmu54_virus_info = current_virus_info
+                                                             
+                                                             # ウイルスパターンファイル情報を取得（ログファイルには記録しない）
+                                                             print(f"     ✅ 詳細情報を取得完了")
+                                                             
+                                                         except Exception as e:
+                                                             print(f"     詳細情報取得エラー: {e}")
+                                                             
+                                                             # フォールバック：基本的な親要素情報のみ取得
+                                                             try:
+                                                                 parent_text = await element.evaluate('el => el.parentElement ? el.parentElement.textContent?.trim() || "" : ""')
+                                                                 print(f"     フォールバック: 親要素テキスト: '{parent_text}'")
+                                                                 
+                                                                 # フォールバック情報を取得（ログファイルには記録しない）
+                                                                 print(f"     ✅ フォールバック情報を取得完了")
+                                                                 
+                                                             except Exception as e2:
+                                                                 print(f"     フォールバック情報取得エラー: {e2}")
+                                                                 
+                                                     except Exception as e:
+                                                         print(f"   要素{i+1}: 情報取得エラー - {e}")
+                                                 
+                                                 # 抽出結果のサマリー
+                                                 print(f"\n📊 {server_name}のウイルスパターンファイル行抽出結果")
+                                                 print(f"✅ 合計 {len(virus_pattern_lines)} 行を抽出しました")
+                                                 
+                                                 # 詳細表示
+                                                 for i, line_info in enumerate(virus_pattern_lines, 1):
+                                                     print(f"   行{i}: 要素='{line_info['element_text']}'")
+                                                     if line_info.get('row_text'):
+                                                         print(f"     行全体: '{line_info['row_text']}'")
+                                                     elif line_info.get('parent_text'):
+                                                         print(f"     親要素: '{line_info['parent_text']}'")
+                                                 
+                                                 print(f"✅ {server_name}のウイルスパターンファイル画面の詳細情報取得完了")
+                                                 
+                                             else:
+                                                 print(f"❌ {server_name}のウイルスパターンファイル要素が見つかりませんでした")
+                                                 
+                                                 # 代替方法：フレーム全体のテキストから検索
+                                                 print(f"🔍 代替方法: {server_name}のフレーム全体のテキストから検索中...")
+                                                 iframe_text = await iframe_name_frame.evaluate('() => document.body.textContent')
+                                                 
+                                                 if iframe_text:
+                                                     print(f"📄 IframeNameフレームテキスト長: {len(iframe_text)}文字")
+                                                     
+                                                     # ウイルスパターンファイル行を検索
+                                                     text_lines = []
+                                                     lines = iframe_text.split('\n')
+                                                     
+                                                     for line in lines:
+                                                         if 'ウイルスパターンファイル' in line:
+                                                             text_lines.append(line.strip())
+                                                     
+                                                     if text_lines:
+                                                         print(f"✅ 代替方法で{server_name}のウイルスパターンファイル行を発見: {len(text_lines)}行")
+                                                         
+                                                         print(f"📝 {server_name}の代替方法による抽出結果を取得")
+                                                         
+                                                         # 詳細表示
+                                                         for i, line in enumerate(text_lines, 1):
+                                                             print(f"   行{i}: {line}")
+                                                     else:
+                                                         print(f"❌ 代替方法でも{server_name}のウイルスパターンファイル行が見つかりませんでした")
+                                                 else:
+                                                     print(f"❌ {server_name}のIframeNameフレームのテキストを取得できませんでした")
+                                                 
+                                        except Exception as e:
+                                            print(f"❌ {server_name}のウイルスパターンファイル行抽出エラー: {e}")
+            
+        except Exception as e:
+            print(f"❌ 新しいチェック処理エラー: {e}")
+    
+    async def probe_endpoint(self, url):
+        """エンドポイントへのDNS解決・TCP接続・TLSハンドシェイクを行い所要時間を計測"""
+        import ssl
+        
+        parts = urlsplit(url)
+        use_tls = parts.scheme == 'https'
+        host = parts.hostname
+        port = parts.port or (443 if use_tls else 80)
+        result = {
+            'url': url,
+            'host': host,
+            'port': port,
+            'reachable': False,
+            'resolve_ms': None,
+            'connect_ms': None,
+            'tls_ms': None,
+            'error': None
+        }
+        
+        loop = asyncio.get_running_loop()
+        transport = None
+        
+        async def probe():
+            nonlocal transport
+            started = time.perf_counter()
+            addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            result['resolve_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            
+            family, socket_type, proto, _, address = addresses[0]
+            started = time.perf_counter()
+            transport, protocol = await loop.create_connection(asyncio.Protocol, host=address[0], port=address[1])
+            result['connect_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            
+            if use_tls:
+                # 管理コンソールは自己署名証明書のため、証明書検証は行わずハンドシェイクのみ確認
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+                started = time.perf_counter()
+                transport = await loop.start_tls(transport, protocol, context, server_hostname=host)
+                result['tls_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        
+        try:
+            await asyncio.wait_for(probe(), timeout=self.preflight_timeout)
+            result['reachable'] = True
+        except asyncio.TimeoutError:
+            result['error'] = f"タイムアウト（{self.preflight_timeout}秒）"
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            if transport is not None:
+                transport.close()
+        
+        return result
+    
+    async def run_preflight_checks(self, urls):
+        """全エンドポイントの到達性を並列に確認し、到達不能なサーバーを記録"""
+        print("🛫 事前到達性チェックを実行中...")
+        with self.span("事前到達性チェック", endpoints=len(urls)):
+            results = await asyncio.gather(*(self.probe_endpoint(url) for url in urls))
+        
+        self.preflight_results = {result['url']: result for result in results}
+        self.unreachable_servers = {result['url'] for result in results if not result['reachable']}
+        
+        for result in results:
+            if result['reachable']:
+                tls_text = f", TLS {result['tls_ms']}ms" if result['tls_ms'] is not None else ""
+                print(f"   ✅ {result['host']}:{result['port']} - DNS {result['resolve_ms']}ms, "
+                      f"TCP {result['connect_ms']}ms{tls_text}")
+            else:
+                print(f"   ❌ {result['host']}:{result['port']} - 到達不能: {result['error']}")
+                self.log_event(f"事前到達性チェック失敗: {result['url']} - {result['error']}")
+        
+        return self.preflight_results
+    
+    def get_frame_registry(self, page):
+        """ページのフレームレジストリを取得（ページ作成直後に呼び出すと全てのフレームのイベントを捕捉できる）"""
+        if page not in self.frame_registries:
+            self.frame_registries[page] = FrameRegistry(page)
+        return self.frame_registries[page]
+    
+    def server_frame_matcher(self, base_url, href, server_name):
+        """ディレクトリのサーバーをクリックした後、読み込まれたフレームがそのサーバーの画面かを判定する関数を作成
+        
+        リンク先URLが取得できればURLの一致で、取得できなければURLにサーバー名が含まれるかで判定する。
+        """
+        if href and not href.startswith(('#', 'javascript:')):
+            expected_url = urljoin(base_url, href)
+            return lambda frame: frame.url == expected_url
+        return lambda frame: server_name in unquote(frame.url)
+    
+    async def wait_for_frame(self, page, name, future=None):
+        """名前を指定してフレームの読み込みを待機（future指定時は操作前に expect で作成したFutureを待つ）"""
+        registry = self.get_frame_registry(page)
+        with self.span("フレーム待機", frame=name):
+            if future is not None:
+                frame = await registry.wait(future, name, self.frame_wait_timeout)
+            else:
+                frame = await registry.wait_for(name, self.frame_wait_timeout)
+        print(f"    🎯 {name}フレーム読み込み完了: {frame.url}")
+        return frame
+    
+    async def resolve_console_frames(self, page):
+        """Control Managerのメニューフレーム（iframe_index.aspx）とウィジェットフレーム（mainTMCM）を取得（ステップ4）
+        
+        読み込まれない場合は None を返す。戻り値: (iframe_index, widget_frame)
+        """
+        print("📋 ステップ4: フレームの読み込みを待機中...")
+        try:
+            with self.span("ステップ4: フレーム検出"):
+                iframe_index, widget_frame = await asyncio.gather(
+                    self.wait_for_frame(page, "iframe_index.aspx"),
+                    self.wait_for_frame(page, "mainTMCM")
+                )
+        except TimeoutError as e:
+            print(f"❌ 必要なフレームが見つかりません: {e}")
+            return None, None
+        print()
+        return iframe_index, widget_frame
+    
+    async def run_product_status_branch(self, page):
+        """製品の接続ステータスを確認して判定結果を返す（ステップ4〜8、失敗時は None）"""
+        iframe_index, widget_frame = await self.resolve_console_frames(page)
+        if not iframe_index:
+            return None
+        
+        with self.span("ステップ5〜8: 製品の接続ステータス"):
+            return await self.collect_product_status(page, iframe_index, widget_frame)
+    
+    async def run_virus_pattern_branch(self, page, open_new_page=False):
+        """各サーバーのウイルスパターンファイル情報を取得（ステップ4・9）
+        
+        open_new_page=True の場合は同じコンテキスト（ログイン済み）で新しいページを開いてから巡回する。
+        """
+        if open_new_page:
+            with self.span("ウイルスパターン用ページ作成"):
+                main_url = page.url
+                page = await page.context.new_page()
+                self.get_frame_registry(page)
+                await page.goto(main_url, wait_until="networkidle")
+        
+        iframe_index, _ = await self.resolve_console_frames(page)
+        if not iframe_index:
+            return None
+        
+        with self.span("ステップ9: ウイルスパターンファイル"):
+            await self.collect_virus_pattern_info(page, iframe_index)
+    
+    async def run_status_check(self, check_connection_status=True, check_virus_pattern=True):
+        """ステータスチェックを実行"""
+        from playwright.async_api import async_playwright
+        
+        print("🎯 ApexOne：指定された4つの製品の接続ステータスを確実に確認します")
+        print(f"🎯 対象製品: {', '.join(self.target_products)}")
+        print()
+        
+        # Chromeデバッグポートの確認
+        if not await self.check_chrome_debug_port():
+            print("❌ Chromeデバッグポート(9222)が利用できません")
+            print("💡 先にChromeデバッグモードを起動してください")
+            return
+        
+        print("✅ Chromeデバッグポート(9222)が利用可能です")
+        print()
+        
+        async with async_playwright() as p, self.browser_object_scope(self.control_manager_url):
+            try:
+                # Chromeデバッグモードに接続
+                print("🔍 PlaywrightでChromeデバッグモードに接続中...")
+                with self.span("CDP接続"):
+                    browser = await p.chromium.connect_over_cdp(f"http://localhost:{self.debug_port}")
+                    context = await self.new_browser_context(browser, self.control_manager_url)
+                    page = await context.new_page()
+                    self.get_frame_registry(page)
+                print("✅ Chromeデバッグモードに接続成功！")
+                print("✅ 新しいページを作成しました")
+                print()
+                
+                # ステップ1: ログインページにアクセス
+                print("📋 ステップ1: ログインページにアクセス中...")
+                with self.span("ステップ1: ログインページ表示", url=self.control_manager_url):
+                    await page.goto(self.control_manager_url, wait_until="networkidle")
+                print("✅ ログインページにアクセス成功")
+                print()
+                
+                # ステップ2: ドメインログインボタンをクリック
+                print("📋 ステップ2: ドメインログインボタンを探す中...")
+                try:
+                    login_button = page.locator("#loginDomainLink")
+                    if await login_button.count() > 0:
+                        print("✅ loginDomainLink要素を発見")
+                        with self.span("ステップ2: ドメインログイン"):
+                            await login_button.click()
+                            print("🚀 ドメインログインボタンをクリックしました")
+                            await page.wait_for_load_state("networkidle")
+                        print("✅ ログイン完了")
+                    else:
+                        print("❌ ドメインログインボタンが見つかりません")
+                        return
+                except Exception as e:
+                    print(f"❌ ログインエラー: {e}")
+                    return
+                print()
+                
+                # ステップ3: メインページにアクセス
+                print("📋 ステップ3: メインページにアクセス中...")
+                with self.span("ステップ3: メインページ読み込み待機"):
+                    await page.wait_for_load_state("networkidle")
+                print("✅ メインページにアクセス成功")
+                print()
+                
+                # ダッシュボードの確認（ステップ5〜8）とディレクトリの巡回（ステップ9）は
+                # 同じ認証済みコンテキストの別ページで並行して実行する
+                branches = []
+                if check_connection_status:
+                    branches.append(lambda: self.run_product_status_branch(page))
+                else:
+                    print("⏭️ ステップ5〜8: 製品の接続ステータス確認は鮮度ポリシーによりスキップします")
+                
+                if check_virus_pattern:
+                    # 両方を並行実行する場合、ディレクトリの巡回には同じコンテキストで新しいページを開く
+                    open_new_page = bool(branches) and self.concurrent_phases_enabled
+                    branches.append(lambda: self.run_virus_pattern_branch(page, open_new_page))
+                else:
+                    print("⏭️ ステップ9: ウイルスパターンファイル確認は鮮度ポリシーによりスキップします")
+                
+                if self.concurrent_phases_enabled:
+                    branch_results = await asyncio.gather(*(branch() for branch in branches), return_exceptions=True)
+                else:
+                    branch_results = [await branch() for branch in branches]
+                for branch_result in branch_results:
+                    if isinstance(branch_result, Exception):
+                        raise branch_result
+                
+                # 接続ステータスを確認した場合はその判定結果（フレーム未検出などで失敗した場合は None）
+                result = branch_results[0] if check_connection_status else None
+                if check_connection_status and result is None:
+                    return
+                
+                # ステータスチェック結果は後でログに記録（順序調整のため）
+                # self.log_result(result)
+                
+                # ウイルスパターンファイル情報も後でログに記録（順序調整のため）
+                # ウイルスパターンファイル情報の出力は run メソッドで実行
+                
+                print(f"\n🎉 ApexOneステータスチェックが完了しました！")
+                
+                # 新しいチェック処理で生成されたファイルの確認
+                virus_pattern_log = self.log_file
+                if os.path.exists(virus_pattern_log):
+                    print(f"📁 生成されたファイル:")
+                    print(f"   - 統合ログファイル: {virus_pattern_log}")
+                
+                # ウイルスパターンファイルHTMLファイルの確認（削除済み）
+                # スクリーンショット、HTML、フレームテキストの出力は無効化されています
+                
+                # 結果確認のため少し待機
+                print("\n⏳ 結果を確認するため、3秒間ブラウザを開いたままにします...")
+                with self.span("結果確認待機"):
+                    await asyncio.sleep(3)
+                    
+                # 結果を返す
+                return result
+                
+            except Exception as e:
+                self.last_server_error = e
+                print(f"❌ ApexOneステータスチェックエラー: {e}")
+                print("💡 Chromeデバッグモードが起動しているか確認してください")
+                return "ERROR"
+            finally:
+                # HARはコンテキストを閉じた時点で書き出されるため、ブラウザより先に閉じる
+                await self.release_browser_objects(self.control_manager_url)
+                await browser.close()
+                print("✅ ブラウザ接続を閉じました")
+    
+    async def fetch_control_manager_status(self, check_connection_status=True, check_virus_pattern=True):
+        """Control Managerのステータスを取得（自動化APIが有効な場合はAPIを使用し、失敗した場合は画面操作にフォールバック）"""
+        if self.api_enabled:
+            result = await self.run_status_check_via_api(check_connection_status, check_virus_pattern)
+            if result != "ERROR" or not self.api_fallback_enabled:
+                return result
+            
+            print("↩️ 自動化APIで取得できなかったため、画面操作で取得します")
+            if not self.start_debug_chrome():
+                return "ERROR"
+        
+        return await self.run_status_check(check_connection_status=check_connection_status,
+                                           check_virus_pattern=check_virus_pattern)
+    
+    async def check_system_logs_for_server(self, server_url):
+        """指定されたサーバーでシステムイベントログをチェック"""
+        from playwright.async_api import async_playwright
+        
+        try:
+            print(f"🎯 OfficeScan管理コンソールにアクセス: {server_url}")
+            self.log_event(f"サーバーアクセス開始: {server_url}")
+            
+            # 認証情報の取得（HAR再生時は記録済みの応答を返すため認証情報は使用しない）
+            if self.har_mode == 'replay':
+                credentials = {'username': 'har-replay', 'password': 'har-replay'}
+            else:
+                credentials = self.decrypt_credentials()
+            if not credentials:
+                credentials = self.get_manual_credentials()
+                if not credentials:
+                    self.log_event(f"認証情報取得失敗: {server_url}")
+                    return False
+            
+            async with async_playwright() as p, self.browser_object_scope(server_url):
+                # 既存のChromeに接続
+                with self.span("CDP接続", server=server_url):
+                    browser = await p.chromium.connect_over_cdp(f"http://localhost:{self.debug_port}")
+                    context = await self.new_browser_context(browser, server_url)
+                    page = await context.new_page()
+                
+                print("📋 ステップ1: OfficeScan管理コンソールにアクセス中...")
+                with self.span("ステップ1: ログインページ表示", server=server_url):
+                    await page.goto(server_url, wait_until='networkidle', timeout=30000)
+                    
+                # ログインフォームの確認
+                try:
+                    # ドメイン選択フィールドを探す
+                    domain_selectors = [
+                        'select#labelDomain',
+                        'select[name="domainlist"]',
+                        'select[name="domain"]',
+                        'select[id*="domain"]',
+                        'select[class*="domain"]'
+                    ]
+                    
+                    domain_select = None
+                    with self.span("ステップ2a: ドメイン選択欄の検索", server=server_url):
+                        for selector in domain_selectors:
+                            try:
+                                domain_select = await page.wait_for_selector(selector, timeout=5000)
+                                if domain_select:
+                                    print(f"✅ ドメイン選択フィールドを発見: {selector}")
+                                    break
+                            except Exception:
+                                continue
+                        
+                    if domain_select:
+                        print("📋 ステップ2a: ドメインを選択中...")
+                        try:
+                            await domain_select.select_option(value="tad.asahi-np.co.jp")
+                            print("✅ ドメイン選択完了: tad.asahi-np.co.jp")
+                        except Exception as select_error:
+                            print(f"⚠️ ドメイン選択エラー: {select_error}")
+                            # 代替方法: テキストで選択
+                            try:
+                                await domain_select.select_option(label="tad.asahi-np.co.jp")
+                                print("✅ ドメイン選択完了（代替方法）: tad.asahi-np.co.jp")
+                            except Exception as alt_error:
+                                print(f"❌ ドメイン選択失敗: {alt_error}")
+                    else:
+                        print("⚠️ ドメイン選択フィールドが見つかりません")
+                    
+                    # ユーザー名とパスワードフィールドを探す
+                    with self.span("ステップ2b: 入力欄の検索", server=server_url):
+                        username_input = await page.wait_for_selector('input#labelUsername, input[name="username"]', timeout=10000)
+                        password_input = await page.wait_for_selector('input#labelPassword, input[name="password"]', timeout=10000)
+                        
+                    print("📋 ステップ2b: ログイン情報を入力中...")
+                    await username_input.fill(credentials['username'])
+                    await password_input.fill(credentials['password'])
+                    
+                    # ログインボタンをクリック
+                    login_button_selectors = [
+                        'button#btn-signin',
+                        'button[rel="btn_signin"]',
+                        'button:has-text("ログオン")',
+                        'button:has-text("ログイン")',
+                        'input[type="submit"]',
+                        'button[type="submit"]',
+                        '.login-button'
+                    ]
+                    
+                    login_button = None
+                    with self.span("ステップ2c: ログインボタンの検索", server=server_url):
+                        for selector in login_button_selectors:
+                            try:
+                                login_button = await page.wait_for_selector(selector, timeout=5000)
+                                if login_button:
+                                    print(f"✅ ログインボタンを発見: {selector}")
+                                    break
+                            except Exception:
+                                continue
+                        
+                    if login_button:
+                        print("📋 ステップ2c: ログインボタンをクリック中...")
+                        with self.span("ステップ2d: ログイン", server=server_url):
+                            await login_button.click()
+                            print("✅ ログインボタンクリック完了")
+                            
+                            # ログイン処理の完了を待つ
+                            print("📋 ステップ2d: ログイン処理の完了を待機中...")
+                            await asyncio.sleep(2)
+                            
+                        # ページのURLを確認
+                        current_url = page.url
+                        print(f"📍 現在のURL: {current_url}")
+                        
+                    else:
+                        print("❌ ログインボタンが見つかりません")
+                        self.log_event(f"ログインボタン未発見: {server_url}")
+                        return False
+                    
+                    print("📋 ステップ3: ログイン処理中...")
+                    with self.span("ステップ3: ログイン後の読み込み待機", server=server_url):
+                        await page.wait_for_load_state('networkidle', timeout=30000)
+                        
+                    # ログイン成功の確認
+                    try:
+                        html_content = await page.content()
+                        if "ログオン" in html_content and "form_login" in html_content:
+                            print("⚠️ ログイン画面が残存しています。認証に失敗した可能性があります")
+                            self.log_event(f"ログイン失敗: {server_url}")
+                            return False
+                        else:
+                            print("✅ ログイン成功を確認しました")
+                            
+                    except Exception as e:
+                        print(f"⚠️ ログイン確認エラー: {e}")
+                        return False
+                    
+                except Exception as e:
+                    self.last_server_error = e
+                    print(f"⚠️ ログインフォームが見つからないか、既にログイン済み: {e}")
+                    return False
+                
+                # ログイン完了後、直接ログページにアクセス
+                print("📋 ステップ4: システムイベントログページに直接アクセス中...")
+                
+                # サーバーURLからベースURLを取得してシステムイベントログURLを構築
+                base_url = server_url.rstrip('/')
+                system_event_url = f"{base_url}/console/html/cgi/cgiShowLogs.exe?id=12015"
+                
+                try:
+                    # 新しいページでシステムイベントログページにアクセス（ページはステップ7まで使うため、ステップの外で開く）
+                    with self.span("イベントログ用ページ作成", server=server_url):
+                        log_page = await context.new_page()
+                    with self.span("ステップ4: システムイベントログページ表示", server=server_url):
+                        await log_page.goto(system_event_url, wait_until='networkidle', timeout=30000)
+                    print(f"✅ システムイベントログページにアクセス: {system_event_url}")
+                    
+                    # ログテーブルを探す
+                    print("📋 ステップ6b: ログテーブルを検索中...")
+                    log_table_selectors = [
+                        'table',
+                        '.log-table',
+                        '.event-table',
+                        'div[class*="table"]',
+                        'div[class*="grid"]',
+                        'table[class*="log"]',
+                        'table[class*="event"]',
+                        '.data-table',
+                        '.result-table',
+                        'table[class*="system"]',
+                        'div[class*="log"]',
+                        'div[class*="event"]',
+                        'div[class*="system"]'
+                    ]
+                    
+                    log_table = None
+                    with self.span("ステップ6b: ログテーブルの検索", server=server_url):
+                        for selector in log_table_selectors:
+                            try:
+                                log_table = await log_page.wait_for_selector(selector, timeout=5000)
+                                if log_table:
+                                    print(f"✅ ログテーブルを発見: {selector}")
+                                    break
+                            except Exception:
+                                continue
+                        
+                    if not log_table:
+                        print("❌ ログテーブルが見つかりません")
+                        self.log_event(f"ログテーブル未発見: {server_url}")
+                        return False
+                    
+                    # 増分取り込みモード: ウォーターマーク以降の新規イベントのみを取り込む
+                    if self.event_log_incremental:
+                        with self.span("ステップ7: 新規イベントの取り込み", server=server_url):
+                            return await self.ingest_new_system_events(context, log_page, system_event_url, server_url)
+                        
+                    # ログテーブル内で特定の文言を検索
+                    print("📋 ステップ7: ログテーブル内で特定の文言を検索中...")
+                    
+                    # テーブルの行を取得
+                    with self.span("ステップ7: ログ行の取得", server=server_url):
+                        rows = await log_table.query_selector_all('tr')
+                        
+                    if len(rows) > 1:  # ヘッダー行 + データ行
+                        target_text = "次の役割を使用してログインしました"
+                        
+                        print(f"🔍 検索対象文言: '{target_text}'")
+                        print(f"📊 検索対象行数: {len(rows)}行")
+                        
+                        # 各行のテキストを取得して検索（最初の行が最新）
+                        latest_found = None
+                        found_count = 0
+                        
+                        for i, row in enumerate(rows):
+                            try:
+                                row_text = await row.inner_text()
+                                if target_text in row_text:
+                                    found_count += 1
+                                    # 最初に見つかった行が最新なので、初回のみ設定
+                                    if latest_found is None:
+                                        latest_found = {
+                                            'index': i,
+                                            'text': row_text
+                                        }
+                                        print(f"✅ 最新の該当文言を発見: 行{i+1}")
+                                    # 2回目以降は件数のみカウント（最新は更新しない）
+                            except Exception as row_error:
+                                print(f"⚠️ 行{i+1}のテキスト取得エラー: {row_error}")
+                                continue
+                        
+                        if latest_found:
+                            print(f"\n" + "="*60)
+                            print(f"📊 最新のログイン役割ログ")
+                            print("="*60)
+                            print(f"発見件数: {found_count}件")
+                            print(f"最新ログ: 行{latest_found['index']+1}")
+                            print("="*60)
+                            print(latest_found['text'])
+                            print("="*60)
+                            
+                            # ログファイルに最新のログイン情報のみを記録
+                            server_name = server_url.split('//')[1].split(':')[0]
+                            # テーブルから最新のログイン情報を抽出
+                            table_text = latest_found['text'].strip()
+                            # ヘッダー行を除いて最初のデータ行を取得
+                            lines = table_text.split('\n')
+                            if len(lines) >= 2:  # ヘッダー行 + データ行がある場合
+                                # ヘッダー行を除いて最初のデータ行（最新）を取得
+                                latest_log_line = lines[1]  # インデックス1が最初のデータ行
+                                log_message = f"サーバー {server_name}: {latest_log_line}"
+                                self.log_event(log_message)
+                            
+                            return True
+                        else:
+                            print(f"❌ '{target_text}' を含むログが見つかりませんでした")
+                            self.log_event(f"対象ログ未発見: {server_url}")
+                            
+                            # 最新のログ行を表示（参考用）
+                            latest_row = rows[-1]
+                            latest_text = await latest_row.inner_text()
+                            print(f"\n📋 最新のログ（参考）:")
+                            print(latest_text[:200] + "..." if len(latest_text) > 200 else latest_text)
+                            
+                            return False
+                    else:
+                        print("❌ ログデータが見つかりません")
+                        self.log_event(f"ログデータなし: {server_url}")
+                        return False
+                        
+                except Exception as e:
+                    self.last_server_error = e
+                    print(f"❌ ログページアクセスエラー: {e}")
+                    self.log_event(f"ログページアクセスエラー: {server_url} - {e}")
+                    return False
+                
+        except Exception as e:
+            self.last_server_error = e
+            print(f"❌ システムログチェックエラー: {e}")
+            self.log_event(f"システムログチェックエラー: {server_url} - {e}")
+            return False
+    
+    def build_event_page_url(self, system_event_url, page_number):
+        """システムイベントログのページ番号付きURLを構築"""
+        separator = '&' if '?' in system_event_url else '?'
+        return f"{system_event_url}{separator}{self.event_log_page_param}={page_number}"
+    
+    async def extract_event_rows(self, page, cutoff_ms=None):
+        """ページ内のイベント行を最新順に取得（カットオフより古い行に到達したら打ち切り）"""
+        return await page.evaluate('''
+            (cutoffMs) => {
+                const result = {rows: [], truncated: false};
+                // 入れ子の表を含まない行（実際のイベント行）のみを対象にする
+                const eventRows = Array.from(document.querySelectorAll("tr")).filter(row => !row.querySelector("tr"));
+                for (const row of eventRows) {
+                    const cells = Array.from(row.querySelectorAll("td")).map(cell => (cell.innerText || "").trim());
+                    const match = (cells[0] || "").match(/^(\\d{4})\\/(\\d{1,2})\\/(\\d{1,2})\\s+(\\d{1,2}):(\\d{2}):(\\d{2})/);
+                    if (!match) {
+                        continue;
+                    }
+                    const [, y, mo, d, h, mi, s] = match.map(Number);
+                    if (cutoffMs !== null && new Date(y, mo - 1, d, h, mi, s).getTime() < cutoffMs) {
+                        result.truncated = true;
+                        break;
+                    }
+                    result.rows.push(cells);
+                }
+                return result;
+            }
+        ''', cutoff_ms)
+    
+    async def fetch_system_event_page(self, context, page_url, cutoff_ms=None):
+        """システムイベントログの1ページを新しいページで読み込んでイベント行を取得"""
+        with self.span("イベントログページ取得", url=page_url):
+            page = await context.new_page()
+            try:
+                await page.goto(page_url, wait_until='networkidle', timeout=30000)
+                return await self.extract_event_rows(page, cutoff_ms)
+            finally:
+                await page.close()
+    
+    async def crawl_system_events(self, context, system_event_url, first_page=None, watermark=None, cutoff_time=None):
+        """システムイベントログをページ送りしながら新しい順にイベントを逐次返す
+        
+        最大 event_log_pages_in_flight ページを先読みし、取得済みページの解析と
+        後続ページの読み込みを並行して行う。ウォーターマークまたは時刻カットオフに
+        到達した時点で先読み中のページを破棄して終了する。
+        """
+        start_time = time.perf_counter()
+        stats = {'pages': 0, 'events': 0, 'stop_reason': 'ページ上限'}
+        
+        watermark_time = datetime.fromisoformat(watermark['timestamp']) if watermark else None
+        lower_bounds = [bound for bound in (watermark_time, cutoff_time) if bound]
+        cutoff_ms = max(lower_bounds).timestamp() * 1000 if lower_bounds else None
+        
+        pending = deque()
+        next_page_number = 1
+        
+        def schedule_pages():
+            nonlocal next_page_number
+            while (len(pending) < self.event_log_pages_in_flight and
+                   next_page_number <= self.event_log_max_pages):
+                if next_page_number == 1 and first_page is not None:
+                    coro = self.extract_event_rows(first_page, cutoff_ms)
+                else:
+                    page_url = self.build_event_page_url(system_event_url, next_page_number)
+                    coro = self.fetch_system_event_page(context, page_url, cutoff_ms)
+                pending.append((next_page_number, asyncio.ensure_future(coro)))
+                next_page_number += 1
+        
+        try:
+            schedule_pages()
+            seen_hashes = set()
+            
+            while pending:
+                page_number, task = pending.popleft()
+                try:
+                    page_result = await task
+                except Exception as e:
+                    # 読み込めなかったページ以降は走査しない（未読のイベントが残るため、呼び出し元はウォーターマークを進めない）
+                    print(f"   ❌ ページ{page_number}の取得に失敗: {e}")
+                    stats['stop_reason'] = 'ページ取得失敗'
+                    return
+                stats['pages'] += 1
+                schedule_pages()
+                
+                rows = page_result.get('rows', [])
+                print(f"   📄 ページ{page_number}: {len(rows)}行")
+                if not rows:
+                    stats['stop_reason'] = '最終ページ' if not page_result.get('truncated') else '時刻カットオフ'
+                    return
+                
+                new_rows = 0
+                for cells in rows:
+                    event_text = '\t'.join(cells)
+                    event_time = self.parse_event_timestamp(event_text)
+                    if not event_time:
+                        continue
+                    
+                    # 走査中に新しいイベントが発生するとページの境界がずれ、前のページの行が再び現れるため重複を除く
+                    event_hash = self.hash_event(event_text)
+                    if event_hash in seen_hashes:
+                        continue
+                    seen_hashes.add(event_hash)
+                    new_rows += 1
+                    
+                    if watermark and (event_hash == watermark['hash'] or event_time < watermark_time):
+                        stats['stop_reason'] = 'ウォーターマーク到達'
+                        return
+                    if cutoff_time and event_time < cutoff_time:
+                        stats['stop_reason'] = '時刻カットオフ'
+                        return
+                    
+                    stats['events'] += 1
+                    yield {'time': event_time, 'hash': event_hash, 'text': event_text, 'page': page_number}
+                
+                # 既に読んだ行だけのページが返った場合は、ページ送りパラメータが無視されているとみなして終了
+                if new_rows == 0:
+                    stats['stop_reason'] = 'ページ送り未対応（同一ページ）'
+                    return
+                
+                if page_result.get('truncated'):
+                    stats['stop_reason'] = '時刻カットオフ'
+                    return
+                
+        finally:
+            # 先読み中のページを破棄
+            for _, task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+            
+            elapsed = time.perf_counter() - start_time
+            stats['elapsed_seconds'] = round(elapsed, 3)
+            stats['events_per_second'] = round(stats['events'] / elapsed, 1) if elapsed > 0 else 0.0
+            self.last_event_crawl_stats = stats
+            print(f"📊 イベントログ走査: {stats['pages']}ページ / {stats['events']}件 / "
+                  f"{stats['elapsed_seconds']}秒 ({stats['events_per_second']}件/秒) - 終了理由: {stats['stop_reason']}")
+    
+    async def ingest_new_system_events(self, context, log_page, system_event_url, server_url):
+        """前回のウォーターマーク以降に発生したシステムイベントを全て履歴に取り込む"""
+        print("📋 ステップ7: ウォーターマーク以降の新規イベントを取り込み中...")
+        
+        server_name = server_url.split('//')[1].split(':')[0]
+        target_text = "次の役割を使用してログインしました"
+        
+        # 走査中は並行実行中のフェーズも状態ファイルを更新するため、ここでは読み込みのみ行う
+        watermark = self.load_state().get('event_log_watermarks', {}).get(server_url)
+        cutoff_time = None
+        
+        if watermark:
+            try:
+                datetime.fromisoformat(watermark['timestamp'])
+                print(f"🔖 ウォーターマーク: {watermark['timestamp']} ({watermark['hash'][:12]})")
+            except Exception as e:
+                print(f"⚠️ ウォーターマークが不正なため無視します: {e}")
+                watermark = None
+        
+        if not watermark:
+            # 初回は遡る期間を制限して全履歴の走査を避ける
+            cutoff_time = datetime.now() - timedelta(hours=self.event_log_max_age_hours)
+            print(f"🔖 ウォーターマークなし: {cutoff_time.strftime('%Y-%m-%d %H:%M:%S')} 以降のイベントを取り込みます")
+        
+        new_events = []
+        async for event in self.crawl_system_events(context, system_event_url, first_page=log_page,
+                                                    watermark=watermark, cutoff_time=cutoff_time):
+            new_events.append(event)
+        
+        print(f"📊 新規イベント: {len(new_events)}件")
+        stop_reason = (self.last_event_crawl_stats or {}).get('stop_reason')
+        complete = stop_reason in self.event_log_complete_stop_reasons
+        
+        if not new_events and complete:
+            self.log_event(f"新規イベントなし: {server_url}")
+            return True
+        
+        # 最新のログインイベントは従来どおり「サーバー」行として記録
+        latest_login = next((event for event in new_events if target_text in event['text']), None)
+        
+        if not complete:
+            # ウォーターマークまで読めていないため、読んだイベントも記録せずに次回の実行で改めて取り込む
+            # （ここでウォーターマークを進めると、未読のイベントが失われる）
+            print(f"⚠️ ウォーターマークまで走査できなかったため、イベントの記録とウォーターマークの更新を見送ります（終了理由: {stop_reason}）")
+            if stop_reason == 'ページ上限':
+                print(f"💡 新規イベントが {self.event_log_max_pages} ページを超えています。event_log_max_pages を増やしてください")
+            elif stop_reason == 'ページ送り未対応（同一ページ）':
+                print(f"💡 ページ送りが機能していません。event_log_page_param（現在: {self.event_log_page_param}）を確認してください")
+            self.log_event(f"イベントログ走査未完了のためウォーターマーク据え置き: {server_url}（{stop_reason}、読み取り {len(new_events)}件）")
+            if latest_login:
+                print(f"✅ 最新のログイン役割ログ: {latest_login['text']}")
+                self.log_event(f"サーバー {server_name}: {latest_login['text']}")
+            return True
+        
+        # それ以外は「イベント」行として古い順に記録
+        for event in reversed(new_events):
+            if event is latest_login:
+                continue
+            self.log_event(f"イベント {server_name}: {event['text']}")
+        
+        if latest_login:
+            print(f"✅ 最新のログイン役割ログ: {latest_login['text']}")
+            self.log_event(f"サーバー {server_name}: {latest_login['text']}")
+        else:
+            print(f"ℹ️ 新規イベント内に '{target_text}' は含まれていませんでした")
+        
+        # ウォーターマークを最新イベントに更新（保存直前に読み込み直し、このサーバーの値のみ変更）
+        watermark = {
+            'timestamp': new_events[0]['time'].isoformat(),
+            'hash': new_events[0]['hash'],
+            'updated_at': datetime.now().isoformat()
+        }
+        with self.update_state() as state:
+            state.setdefault('event_log_watermarks', {})[server_url] = watermark
+        print(f"🔖 ウォーターマークを更新: {watermark['timestamp']}")
+        
+        return True
+    
+    async def check_system_logs(self):
+        """全てのサーバーでシステムイベントログをチェック"""
+        print("🚀 ApexOne Log Checker 開始")
+        print("="*50)
+        self.log_event("ApexOne Log Checker 開始")
+        
+        all_results = []
+        
+        for i, server_url in enumerate(self.log_check_servers, 1):
+            print(f"\n📊 サーバー {i}/{len(self.log_check_servers)}: {server_url}")
+            print("-" * 50)
+            
+            if server_url in self.unreachable_servers:
+                error = self.preflight_results.get(server_url, {}).get('error')
+                print(f"⏭️ サーバー {i} は事前到達性チェックで到達不能のためスキップします: {error}")
+                self.log_event(f"到達不能のためスキップ: {server_url}")
+                all_results.append({
+                    'server': server_url,
+                    'success': False,
+                    'unreachable': True,
+                    'timestamp': datetime.now()
+                })
+                continue
+            
+            # 実行期限が設定されている場合は、残り時間を未処理のサーバーで等分して割り当てる
+            remaining = self.remaining_time(reserve=self.run_deadline_reserve_seconds)
+            if remaining is None:
+                server_timeout = self.log_check_server_timeout
+            else:
+                server_timeout = remaining / (len(self.log_check_servers) - i + 1)
+            
+            try:
+                result = await asyncio.wait_for(
+                    self.run_with_circuit_breaker(
+                        server_url, lambda server_url=server_url: self.check_system_logs_for_server(server_url)
+                    ),
+                    timeout=server_timeout
+                )
+                skipped = server_url in self.circuit_open_servers
+                all_results.append({
+                    'server': server_url,
+                    'success': bool(result),
+                    'skipped': skipped,
+                    'timestamp': datetime.now()
+                })
+                
+                if skipped:
+                    print(f"⏭️ サーバー {i} はサーキットブレーカー開放中のためスキップしました")
+                elif result:
+                    print(f"✅ サーバー {i} の処理が完了しました")
+                else:
+                    print(f"❌ サーバー {i} の処理に失敗しました")
+                    
+            except asyncio.TimeoutError:
+                timeout_text = f"{server_timeout:.0f}秒" if server_timeout is not None else "上限なし"
+                print(f"⏰ サーバー {i} の処理が割り当て時間（{timeout_text}）内に完了しませんでした")
+                self.log_event(f"システムログチェック TIMEOUT: {server_url}")
+                self.record_circuit_breaker_result(server_url, False)
+                all_results.append({
+                    'server': server_url,
+                    'success': False,
+                    'timeout': True,
+                    'timestamp': datetime.now()
+                })
+            except Exception as e:
+                print(f"❌ サーバー {i} でエラーが発生: {e}")
+                all_results.append({
+                    'server': server_url,
+                    'success': False,
+                    'error': str(e),
+                    'timestamp': datetime.now()
+                })
+            
+            # 次のサーバーに進む前に少し待機
+            if i < len(self.log_check_servers):
+                print("⏳ 次のサーバーに進む前に待機中...")
+                await asyncio.sleep(2)
+        
+        self.last_event_log_results = all_results
+        
+        # 結果サマリーを表示
+        print(f"\n" + "="*60)
+        print("📊 全サーバー処理結果サマリー")
+        print("="*60)
+        
+        success_count = 0
+        for i, result in enumerate(all_results, 1):
+            server_name = result['server'].split('//')[1].split(':')[0]
+            if result.get('timeout'):
+                status = "⏰ TIMEOUT"
+            elif result.get('unreachable'):
+                status = "⏭️ スキップ（到達不能）"
+            elif result.get('skipped'):
+                status = "⏭️ スキップ（サーキットブレーカー開放中）"
+            else:
+                status = "✅ 成功" if result['success'] else "❌ 失敗"
+            print(f"サーバー {i} ({server_name}): {status}")
+            if result['success']:
+                success_count += 1
+        
+        print(f"\n成功: {success_count}/{len(self.log_check_servers)} サーバー")
+        print("="*60)
+        
+        # 結果サマリーをログに記録（ログイン情報）
+        self.log_event(f"処理完了: 成功 {success_count}/{len(self.log_check_servers)} サーバー")
+        
+        return success_count > 0
+    
+    def try_lock_file(self, handle):
+        """ロックファイルの排他ロックを取得（取得できない場合は待たずに False を返す、プロセス終了時はOSが解放）"""
+        try:
+            if sys.platform.startswith('win'):
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+    
+    def release_run_lock(self, handle):
+        """実行ロックを解放"""
+        try:
+            if sys.platform.startswith('win'):
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        except OSError as e:
+            print(f"⚠️ 実行ロック解放エラー: {e}")
+        finally:
+            handle.close()
+    
+    def get_reusable_run(self, not_before=None):
+        """再利用できる直近の実行結果を取得（run_lock_reuse_minutes 以内、not_before 指定時はそれ以降に完了したもの）
+        
+        ステータスを判定できなかった実行（エラー・期限超過など）は再利用しない。
+        """
+        last_run = self.load_state().get('last_run')
+        if not last_run or last_run.get('status_result') not in ("OK", "NG", "INSUFFICIENT_DATA"):
+            return None
+        
+        try:
+            finished_at = datetime.fromisoformat(last_run['finished_at'])
+        except Exception:
+            return None
+        
+        if datetime.now() - finished_at > timedelta(minutes=self.run_lock_reuse_minutes):
+            return None
+        if not_before and finished_at < not_before:
+            return None
+        return last_run
+    
+    def show_shared_run_result(self, last_run):
+        """別プロセスの実行結果を表示"""
+        if not last_run:
+            print("📝 再利用できる前回の実行結果がありません")
+            return
+        
+        print(f"♻️ {last_run['finished_at']} に完了した実行の結果を再利用します")
+        print(f"   ステータスチェック結果: {last_run.get('status_result') or '不明'}")
+        for server, virus_info in last_run.get('virus_pattern', {}).items():
+            age_days = self.get_virus_pattern_age_days(virus_info)
+            age = f"{age_days:.1f}日前" if age_days is not None else "不明"
+            print(f"   ウイルスパターンファイル {server}: {age}")
+        event_logs_success = last_run.get('event_logs_success')
+        if event_logs_success is not None:
+            print(f"   システムイベントログチェック: {'成功' if event_logs_success else '失敗'}")
+    
+    def record_last_run(self):
+        """今回の実行結果を、多重起動時に共有するため状態ファイルに保存"""
+        last_run = {
+            'started_at': self.run_started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'status_result': self.last_status_result,
+            'virus_pattern': {
+                server: virus_info for server, virus_info in (
+                    ('PCVTMU53_OSCE', self.current_pcvtmu53_virus_info),
+                    ('PCVTMU54_OSCE', self.current_pcvtmu54_virus_info)
+                ) if virus_info
+            },
+            'event_logs_success': (any(result['success'] for result in self.last_event_log_results)
+                                   if self.last_event_log_results else None),
+            'event_logs': [self.serialize_event_log_result(result) for result in self.last_event_log_results],
+            'timed_out_steps': self.timed_out_steps,
+            'duration_ms': round((time.perf_counter() - self.run_started_perf) * 1000, 1),
+            'steps_ms': self.summarize_top_level_spans()
+        }
+        with self.update_state() as state:
+            state['last_run'] = last_run
+    
+    def serialize_event_log_result(self, result):
+        """システムイベントログチェックのサーバーごとの結果をJSONで扱える形式に変換"""
+        return {key: value.isoformat(timespec='seconds') if isinstance(value, datetime) else value
+                for key, value in result.items()}
+    
+    def summarize_top_level_spans(self):
+        """最上位の処理区間ごとの合計時間（ミリ秒）"""
+        totals = {}
+        for span in self.spans:
+            if span['parent'] is None and span['duration_ms'] is not None:
+                totals[span['name']] = round(totals.get(span['name'], 0.0) + span['duration_ms'], 1)
+        return totals
+    
+    async def acquire_run_lock(self):
+        """実行ロックを取得（戻り値: ロックファイル、取得せずに結果を共有した場合は None）
+        
+        別プロセスが実行中の場合、run_lock_mode が wait であれば完了を待ち、
+        待機中に完了した実行の結果があれば再実行せずに再利用する。exit であれば前回の結果を表示して終了する。
+        """
+        handle = open(self.run_lock_file, 'a+', encoding='utf-8')
+        if self.try_lock_file(handle):
+            return handle
+        
+        print(f"🔒 別のプロセスがチェックを実行中です（{self.run_lock_file}）")
+        if self.run_lock_mode == 'exit':
+            handle.close()
+            self.show_shared_run_result(self.get_reusable_run())
+            return None
+        
+        print(f"⏳ 実行中のプロセスの完了を待機します（最大{self.run_lock_wait_seconds}秒）")
+        wait_started = datetime.now().replace(microsecond=0)
+        deadline = time.monotonic() + self.run_lock_wait_seconds
+        while not self.try_lock_file(handle):
+            if time.monotonic() >= deadline:
+                handle.close()
+                print("⏰ 実行中のプロセスが完了しないため、今回の実行を中止します")
+                self.show_shared_run_result(self.get_reusable_run())
+                return None
+            await asyncio.sleep(self.run_lock_poll_interval)
+        
+        # 待機中に完了した実行の結果があれば、コンソールに再度アクセスせずに再利用
+        last_run = self.get_reusable_run(not_before=wait_started)
+        if last_run:
+            self.release_run_lock(handle)
+            self.show_shared_run_result(last_run)
+            return None
+        
+        print("🔓 実行ロックを取得しました（待機中に完了した実行の結果がないため実行します）")
+        return handle
+    
+    async def run(self):
+        """メイン実行関数（多重起動時は実行中のプロセスの結果を共有）"""
+        lock_handle = await self.acquire_run_lock()
+        if lock_handle is None:
+            return
+        
+        try:
+            await self.run_once()
+        finally:
+            self.release_run_lock(lock_handle)
+    
+    async def run_once(self):
+        """チェックを1回実行"""
+        profile_session = self.start_profiler() if self.profile_enabled else None
+        
+        print("🚀 ApexOne Status Checker")
+        print("=" * 50)
+        
+        # 実行全体の期限を設定（各ステップは残り時間の範囲内で実行される）
+        self.run_deadline = time.monotonic() + self.run_deadline_seconds
+        self.timed_out_steps = []
+        self.browser_launched = False
+        self.spans = []
+        self.run_started_at = datetime.now()
+        self.run_started_perf = time.perf_counter()
+        
+        # 前回の実行結果をリセット（デーモンモードで同じインスタンスを繰り返し実行するため）
+        self.current_pcvtmu53_virus_info = None
+        self.current_pcvtmu54_virus_info = None
+        self.product_status_records = []
+        self.circuit_open_servers = set()
+        self.unreachable_servers = set()
+        self.preflight_results = {}
+        self.last_status_result = None
+        self.last_event_log_results = []
+        self.network_requests = []
+        self.chrome_rss_samples = []
+        self.unclosed_browser_objects = []
+        self.har_unmatched_requests = []
+        self.frame_registries = {}
+        self.resolved_alert_keys = set()
+        self.run_failures = []
+        
+        # メモリ計測を開始（ステップごとの増減は各区間の終了時に記録）
+        if self.memory_tracking_enabled:
+            tracemalloc.start()
+            memory_start_snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            chrome_rss_at_start = self.sample_chrome_rss()
+        print(f"⏱️ 実行期限: {self.run_deadline_seconds}秒")
+        
+        try:
+            await self.run_checks()
+        except Exception as e:
+            self.run_failures.append(f"実行中に例外が発生（{e}）")
+            raise
+        finally:
+            # デバッグモードで起動したChromeプロセスを終了（期限超過や例外発生時も必ず実行）
+            if self.browser_launched:
+                with self.span("Chrome終了"):
+                    self.terminate_debug_chrome()
+            
+            if self.timed_out_steps:
+                print(f"⏰ 実行期限により中断されたステップ: {', '.join(self.timed_out_steps)}")
+            
+            # 実行全体のタイムラインを記録
+            self.write_run_timeline()
+            
+            # 多重起動時に共有する実行結果を保存
+            self.record_last_run()
+            
+            # 自動化APIの接続を閉じる（--use-api指定時のみ）
+            self.close_api_client()
+            
+            # 今回の実行で溜めたアラートの送信を開始（送信完了は待たない）
+            self.finish_run_alerts()
+            
+            # 今回の結果から次回までの実行間隔を決定（--adaptive-interval指定時のみ）
+            if self.adaptive_interval_enabled:
+                self.decide_next_interval()
+            
+            # 通信ウォーターフォールを記録（--capture-network指定時のみ）
+            self.write_network_report()
+            
+            # メモリ使用量を表示（--track-memory指定時のみ）
+            if self.memory_tracking_enabled:
+                self.write_memory_report(memory_start_snapshot, chrome_rss_at_start)
+                tracemalloc.stop()
+            
+            # メトリクスを更新（HTTPエンドポイントはこの結果をメモリから返す）
+            self.update_metrics()
+            
+            if profile_session:
+                self.stop_profiler(profile_session)
+    
+    async def run_checks(self):
+        """各チェックを実行して結果をログに記録
+        
+        Control Manager（ステータス・ウイルスパターン）とOfficeScan（システムイベントログ）は
+        別サーバー・別認証情報のため、別々のブラウザコンテキストで並行して実行する。
+        ログファイルへの出力は「タイムスタンプ → ステータス → ウイルスパターンファイル → ログイン情報」の順序を保つ。
+        """
+        # 鮮度ポリシーに基づいて今回実行するチェックを決定
+        state = self.load_state()
+        due_checks = {check_name: self.is_check_due(check_name, state) for check_name in self.check_freshness_hours}
+        print("🗓️ 今回実行するチェック:")
+        for check_name, due in due_checks.items():
+            print(f"   - {check_name}: {'実行' if due else 'スキップ（前回の結果を再利用）'}")
+        
+        # ブラウザを必要とするチェックがない場合はChromeを起動しない
+        # （自動化APIを使用する場合、Control Managerのチェックはフォールバック時のみChromeを起動する）
+        control_manager_needed = due_checks['connection_status'] or due_checks['virus_pattern']
+        browser_needed = due_checks['event_logs'] or (control_manager_needed and not self.api_enabled)
+        
+        # ブラウザ起動前に、今回アクセスするサーバーの到達性を並列で確認
+        if (browser_needed or control_manager_needed) and self.preflight_enabled:
+            endpoints = []
+            if control_manager_needed:
+                endpoints.append(self.control_manager_url)
+            if due_checks['event_logs']:
+                endpoints.extend(self.log_check_servers)
+            
+            await self.run_preflight_checks(endpoints)
+            if all(url in self.unreachable_servers for url in endpoints):
+                print("❌ 到達可能なサーバーがないため、Chromeを起動しません")
+                browser_needed = False
+        
+        if browser_needed:
+            if not self.start_debug_chrome():
+                return
+        elif not any(due_checks.values()):
+            print("ℹ️ 全てのチェックが鮮度ポリシー内のため、Chromeを起動しません")
+        
+        # 差分記録モードでは今回の記録を溜めておき、前回から変化がなければハートビートのみ記録する
+        with self.delta_log_scope():
+            # システムイベントログチェックを先に開始し、ログ出力はステータス情報の記録後まで溜めておく
+            run_concurrently = (self.concurrent_phases_enabled and due_checks['event_logs']
+                                and control_manager_needed and self.control_manager_url not in self.unreachable_servers)
+            event_log_task = None
+            if run_concurrently:
+                print("\n" + "=" * 50)
+                print("🎯 ログチェックをステータスチェックと並行して開始します...")
+                print("=" * 50)
+                event_log_task = asyncio.ensure_future(self.run_buffered_phase(
+                    lambda: self.run_step_with_deadline("システムイベントログチェック", self.check_system_logs)
+                ))
+            
+            try:
+                # 並行実行時は両フェーズとも残り時間の全体を上限とする
+                status_share = 1.0 if run_concurrently else self.status_check_time_share
+                await self.run_control_manager_phase(due_checks, control_manager_needed, status_share)
+                
+                if event_log_task:
+                    event_log_result, buffered_events = await event_log_task
+                else:
+                    print("\n" + "=" * 50)
+                    print("🎯 ログチェックを開始します...")
+                    print("=" * 50)
+                    event_log_result, buffered_events = None, []
+            finally:
+                # ステータスチェック側で例外が発生した場合も並行実行中のタスクを残さない
+                if event_log_task and not event_log_task.done():
+                    event_log_task.cancel()
+                    await asyncio.gather(event_log_task, return_exceptions=True)
+            
+            # ログイン情報（並行実行中に溜めたログ）はステータス情報とウイルスパターンファイル情報の後に記録
+            self.flush_log_events(buffered_events)
+            
+            # ログチェック実行
+            if due_checks['event_logs']:
+                if not event_log_task:
+                    event_log_result = await self.run_step_with_deadline("システムイベントログチェック", self.check_system_logs)
+                if event_log_result == "TIMEOUT":
+                    self.log_event("システムイベントログチェック: TIMEOUT（取得済みのイベントのみ記録）")
+                elif event_log_result:
+                    self.record_check_reading('event_logs', {'success': True})
+            else:
+                cached = self.get_cached_reading('event_logs')
+                checked_at = cached['checked_at'] if cached else "不明"
+                print(f"⏭️ システムイベントログチェックは鮮度ポリシーによりスキップします（前回: {checked_at}）")
+                self.log_event(f"システムイベントログチェック: キャッシュを使用（{checked_at} 取得）")
+        
+        print("\n" + "=" * 50)
+        print("🏁 ApexOne Status Checker 完了")
+        print("=" * 50)
+        
+        # ログサマリーを表示（タイムスタンプ、ステータス、ウイルスパターンファイル、ログイン情報の順序）
+        with self.span("ログサマリー表示"):
+            self.show_log_summary()
+        
+        # ログファイルを自動コミット・プッシュ
+        if self.auto_commit_enabled:
+            with self.span("ログ自動コミット"):
+                self.auto_commit_logs()
+        
+        if self.har_unmatched_requests:
+            print(f"⚠️ HARに記録されていないリクエスト {len(self.har_unmatched_requests)}件を中断しました:")
+            for request in self.har_unmatched_requests[:self.network_top_n]:
+                print(f"   - {request}")
+    
+    def start_debug_chrome(self):
+        """Chromeデバッグモードを起動（起動済みの場合は何もしない。戻り値: 起動できたか）"""
+        if self.browser_launched:
+            return True
+        
+        # 起動・終了を呼び出し元が管理する場合（モックコンソールのベンチマークなど）は接続先の確認のみ行う
+        if not self.chrome_management_enabled:
+            if self.check_debug_port():
+                return True
+            print(f"❌ デバッグポート{self.debug_port}で待ち受けているChromeが見つかりません")
+            self.run_failures.append("Chromeデバッグモードの起動に失敗")
+            return False
+        
+        # 実行期限の残り時間を超えて待機しない
+        max_wait = int(min(30, self.remaining_time(reserve=self.run_deadline_reserve_seconds)))
+        with self.span("Chrome起動"):
+            launched = self.launch_chrome_debug(max_wait=max_wait)
+        if not launched:
+            print("❌ Chromeデバッグモードの起動に失敗しました")
+            self.run_failures.append("Chromeデバッグモードの起動に失敗")
+            return False
+        self.browser_launched = True
+        return True
+    
+    async def run_control_manager_phase(self, due_checks, control_manager_needed, share):
+        """Control Managerのステータスチェックを実行し、ステータスとウイルスパターンファイル情報をログに記録"""
+        status_result = None
+        if control_manager_needed and self.control_manager_url in self.unreachable_servers:
+            print(f"⏭️ Control Managerに到達できないため、ステータスチェックをスキップします: {self.control_manager_url}")
+            status_result = "UNREACHABLE"
+        elif control_manager_needed:
+            print("\n" + "=" * 50)
+            print("🎯 ステータスチェックを開始します...")
+            print("=" * 50)
+            
+            # ステータスチェック実行（結果を保存）
+            # 接続ステータスを確認しない場合は None が正常終了を表す
+            def status_check_succeeded(result):
+                if due_checks['connection_status']:
+                    return result not in (None, "ERROR")
+                return result != "ERROR"
+            
+            status_result = await self.run_step_with_deadline(
+                "ステータスチェック",
+                lambda: self.run_with_circuit_breaker(
+                    self.control_manager_url,
+                    lambda: self.fetch_control_manager_status(
+                        check_connection_status=due_checks['connection_status'],
+                        check_virus_pattern=due_checks['virus_pattern']
+                    ),
+                    is_success=status_check_succeeded
+                ),
+                share=share
+            )
+            if status_result == "TIMEOUT":
+                self.record_circuit_breaker_result(self.control_manager_url, False)
+            elif self.control_manager_url in self.circuit_open_servers:
+                status_result = "SKIPPED"
+        
+        # 実行したチェックの結果を保存し、スキップしたチェックは保存済みの結果を再利用
+        status_cached_at = None
+        if due_checks['connection_status']:
+            if status_result in ("OK", "NG", "INSUFFICIENT_DATA"):
+                self.record_check_reading('connection_status', {
+                    'result': status_result,
+                    'records': self.product_status_records
+                })
+        else:
+            cached = self.get_cached_reading('connection_status')
+            if cached:
+                status_result = cached['data']['result']
+                self.product_status_records = cached['data'].get('records', [])
+                status_cached_at = cached['checked_at']
+        
+        virus_cached_at = None
+        if due_checks['virus_pattern']:
+            if self.current_pcvtmu53_virus_info or self.current_pcvtmu54_virus_info:
+                self.record_check_reading('virus_pattern', {
+                    'PCVTMU53_OSCE': self.current_pcvtmu53_virus_info,
+                    'PCVTMU54_OSCE': self.current_pcvtmu54_virus_info
+                })
+        else:
+            cached = self.get_cached_reading('virus_pattern')
+            if cached:
+                self.current_pcvtmu53_virus_info = cached['data'].get('PCVTMU53_OSCE')
+                self.current_pcvtmu54_virus_info = cached['data'].get('PCVTMU54_OSCE')
+                virus_cached_at = cached['checked_at']
+        
+        self.last_status_result = status_result
+        
+        # ステータスチェック結果をログに記録（タイムスタンプ直後）
+        if status_result == "SKIPPED":
+            self.log_result(status_result, "サーキットブレーカー開放中のためスキップ")
+        elif status_result == "TIMEOUT":
+            self.log_result(status_result, "実行期限超過のため中断（取得済みの情報のみ記録）")
+        elif status_result == "UNREACHABLE":
+            error = self.preflight_results.get(self.control_manager_url, {}).get('error')
+            self.log_result(status_result, f"事前到達性チェックで到達不能のためスキップ（{error}）")
+        else:
+            self.log_result(status_result, cached_at=status_cached_at)
+        
+        if status_result in ("NG", "INSUFFICIENT_DATA"):
+            inactive = [f"{record['product']}: {record['status']}" for record in self.product_status_records
+                        if record['product'] in self.target_products and record['status'] != '有効']
+            self.raise_alert(f"status:{status_result}", f"ステータスチェック結果 {status_result}",
+                             ', '.join(inactive) or "対象製品のステータスを確認できませんでした")
+        # 判定できた場合のみ、解消した状態の再通知の抑止を解除する（取得に失敗した実行では解除しない）
+        if status_result == "OK":
+            self.resolve_alert("status:NG")
+        if status_result in ("OK", "NG"):
+            self.resolve_alert("status:INSUFFICIENT_DATA")
+        
+        # ウイルスパターンファイル情報をログに記録（ステータス情報の後）
+        self.log_virus_pattern_info(self.current_pcvtmu53_virus_info, self.current_pcvtmu54_virus_info,
+                                    cached_at=virus_cached_at)
+
+    def collect_health_signals(self):
+        """今回の実行結果から実行間隔を短縮すべき異常を収集（結果を取得できなかった実行も異常として扱う）"""
+        signals = list(self.run_failures)
+        if self.last_status_result is None:
+            signals.append("ステータスチェック結果を取得できなかった")
+        
+        for record in self.product_status_records:
+            if record['product'] in self.target_products and record['status'] != '有効':
+                signals.append(f"{record['product']}が{record['status']}")
+        if self.last_status_result not in (None, "OK"):
+            signals.append(f"ステータスチェック結果が{self.last_status_result}")
+        
+        for server_name, virus_info in (('PCVTMU53_OSCE', self.current_pcvtmu53_virus_info),
+                                        ('PCVTMU54_OSCE', self.current_pcvtmu54_virus_info)):
+            age_days = self.get_virus_pattern_age_days(virus_info)
+            if age_days is not None and int(age_days) > self.adaptive_pattern_age_days:
+                signals.append(f"{server_name}のウイルスパターンファイルが{int(age_days)}日前")
+        
+        for server in sorted(self.unreachable_servers | self.circuit_open_servers):
+            signals.append(f"{server}に接続できない")
+        for result in self.last_event_log_results:
+            if not result['success']:
+                signals.append(f"{result['server']}のシステムイベントログチェックに失敗")
+        for step_name in self.timed_out_steps:
+            signals.append(f"{step_name}が期限超過")
+        
+        return signals
+    
+    def decide_next_interval(self):
+        """今回の実行結果から次回までの間隔を決定して記録（戻り値: 間隔（分））"""
+        previous = self.load_state().get('adaptive_interval', {})
+        previous_minutes = previous.get('interval_minutes')
+        base_minutes = min(max(self.adaptive_base_minutes, self.adaptive_min_minutes), self.adaptive_max_minutes)
+        signals = self.collect_health_signals()
+        
+        if signals:
+            interval_minutes = self.adaptive_min_minutes
+            reason = "異常を検出したため短縮"
+        elif previous_minutes is None or previous.get('signals'):
+            interval_minutes = base_minutes
+            reason = "初回の実行のため基準の間隔" if previous_minutes is None else "異常が解消したため基準の間隔に復帰"
+        else:
+            interval_minutes = min(previous_minutes * self.adaptive_backoff_factor, self.adaptive_max_minutes)
+            reason = "正常な結果が続いているため延長" if interval_minutes > previous_minutes else "上限の間隔を維持"
+        
+        decided_at = datetime.now()
+        decision = {
+            'decided_at': decided_at.isoformat(timespec='seconds'),
+            'interval_minutes': round(interval_minutes, 1),
+            'previous_minutes': previous_minutes,
+            # 実行の開始日時を起点とし、同じ間隔で起動されるタスクスケジューラーの次回の起動をスキップしない
+            'next_run_at': (self.run_started_at + timedelta(minutes=interval_minutes)).isoformat(timespec='seconds'),
+            'reason': reason,
+            'signals': signals
+        }
+        with self.update_state() as state:
+            state['adaptive_interval'] = decision
+        
+        try:
+            with open(self.interval_decision_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(decision, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"⚠️ 実行間隔の記録エラー: {e}")
+        
+        print(f"🎚️ 次回の実行間隔: {decision['interval_minutes']}分（{reason}）")
+        for signal in signals:
+            print(f"   - {signal}")
+        self.next_interval_minutes = decision['interval_minutes']
+        return self.next_interval_minutes
+    
+    def is_adaptive_run_due(self):
+        """前回決定した次回の実行日時に達しているか判定（タスクスケジューラーから短い間隔で起動する場合）"""
+        decision = self.load_state().get('adaptive_interval', {})
+        try:
+            next_run_at = datetime.fromisoformat(decision['next_run_at'])
+        except Exception:
+            return True
+        
+        if datetime.now() >= next_run_at:
+            return True
+        print(f"⏭️ 実行間隔の自動調整により今回はスキップします（次回: {decision['next_run_at']}、{decision['reason']}）")
+        return False
+    
+    async def run_daemon(self, interval_minutes):
+        """一定間隔でチェックを繰り返し実行（デーモンモード、自動調整が有効な場合は結果に応じて間隔を変更）"""
+        if self.metrics_port:
+            self.start_metrics_server(self.metrics_port)
+        
+        print(f"🔁 デーモンモード: {interval_minutes}分間隔でチェックを実行します（Ctrl+Cで終了）")
+        if self.adaptive_interval_enabled:
+            print(f"🎚️ 実行間隔は結果に応じて{self.adaptive_min_minutes}〜{self.adaptive_max_minutes}分の範囲で調整します")
+        while True:
+            self.next_interval_minutes = None
+            try:
+                await self.run()
+            except Exception as e:
+                print(f"❌ 実行中にエラーが発生しました: {e}")
+            
+            # 多重起動で結果を共有した場合など、今回の実行で間隔を決定していなければ前回の間隔を維持
+            if self.adaptive_interval_enabled and self.next_interval_minutes:
+                interval_minutes = self.next_interval_minutes
+            
+            print(f"\n💤 次回の実行まで{interval_minutes}分待機します...")
+            await asyncio.sleep(interval_minutes * 60)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+ApexOne HAR
+本番のコンソールの応答をサーバーごとのHARに記録し、オフラインで再生する
+"""
+
+import asyncio
+import os
+import re
+import json
+import base64
+from collections import deque
+from urllib.parse import urlsplit
+
+class HarMixin:
+    """HARの記録先の管理と再生（ApexOneStatusCheckerの一部。記録はコンテキスト作成時に指定する）"""
+    
+    def get_har_path(self, server):
+        """サーバーごとのHARファイルのパス"""
+        parts = urlsplit(server)
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', f"{parts.netloc}{parts.path}").strip('_')
+        return os.path.join(self.har_dir, f"{name}.har")
+    
+    def configure_har_replay(self):
+        """HAR再生モードの設定（本番のログ・状態ファイルを汚さず、ネットワークにもアクセスしない）"""
+        self.har_mode = 'replay'
+        self.log_file = os.path.join(self.har_dir, "replay_integrated.log")
+        self.log_checker_file = self.log_file
+        self.state_file = os.path.join(self.har_dir, "replay_state.json")
+        self.preflight_enabled = False
+        self.auto_commit_enabled = False
+    
+    def load_har_entries(self, har_path):
+        """HARファイルを読み込み、メソッドとURLごとに記録順の応答を返す"""
+        with open(har_path, 'r', encoding='utf-8') as f:
+            har = json.load(f)
+        
+        entries = {}
+        for entry in har['log']['entries']:
+            key = (entry['request']['method'], entry['request']['url'])
+            entries.setdefault(key, deque()).append(entry)
+        return entries
+    
+    async def install_har_replay(self, context, server):
+        """記録済みのHARからコンテキストの全リクエストに応答（記録時の所要時間に倍率をかけて遅延）"""
+        har_path = self.get_har_path(server)
+        entries = self.load_har_entries(har_path)
+        print(f"📼 HARを再生します: {har_path}（{sum(len(queue) for queue in entries.values())}件, 遅延倍率 {self.har_latency_scale}×）")
+        
+        async def handle_route(route):
+            request = route.request
+            queue = entries.get((request.method, request.url))
+            if not queue:
+                self.har_unmatched_requests.append(f"{request.method} {request.url}")
+                await route.abort()
+                return
+            
+            # 同じURLへの複数回のアクセスは記録順に応答し、最後の応答は以降も使い回す
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+            if self.har_latency_scale > 0:
+                await asyncio.sleep(max(entry.get('time', 0), 0) * self.har_latency_scale / 1000)
+            
+            response = entry['response']
+            headers = {}
+            for header in response.get('headers', []):
+                name = header['name'].lower()
+                # 本文は復号済みのものを返すため、長さと圧縮形式のヘッダーは除外
+                if name in ('content-length', 'content-encoding', 'transfer-encoding'):
+                    continue
+                headers[name] = f"{headers[name]}\n{header['value']}" if name in headers else header['value']
+            
+            content = response.get('content', {})
+            text = content.get('text', '')
+            body = base64.b64decode(text) if content.get('encoding') == 'base64' else text.encode('utf-8')
+            await route.fulfill(status=response['status'], headers=headers, body=body)
+        
+        await context.route("**/*", handle_route)
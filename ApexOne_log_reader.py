@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+ApexOne Log Reader
+統合ログファイルの読み取り（サマリー・実行履歴・ウイルスパターンファイルの日付検証）
+ブラウザを使わないサブコマンドから読み込むため、標準ライブラリの軽いモジュールのみ使用する
+"""
+
+import os
+import re
+from datetime import datetime
+
+class LogReader:
+    """統合ログファイルの解析（ApexOneStatusCheckerの基底クラス。単体でもサブコマンドから使用する）"""
+    
+    def __init__(self):
+        self.log_file = "apexone_integrated.log"
+    
+    def extract_latest_virus_pattern_info(self):
+        """ログファイルから最新のウイルスパターンファイル情報を抽出"""
+        try:
+            if not os.path.exists(self.log_file):
+                return None
+            
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            # ウイルスパターンファイルの行を検索
+            lines = content.split('\n')
+            virus_pattern_lines = []
+            
+            for line in lines:
+                if 'ウイルスパターンファイル' in line and '行全体テキスト:' in line:
+                    # 行全体テキストの部分を抽出
+                    if '行全体テキスト:' in line:
+                        virus_info = line.split('行全体テキスト:')[1].strip()
+                        virus_pattern_lines.append(virus_info)
+            
+            # 最新の情報を返す（最後に見つかったもの）
+            if virus_pattern_lines:
+                latest_info = virus_pattern_lines[-1]
+                
+                # 日付の検証を実行
+                date_validation = self.validate_virus_pattern_date(latest_info)
+                
+                print(f"🔍 最新のウイルスパターンファイル情報を発見: {latest_info}")
+                print(f"📅 日付検証結果: {date_validation}")
+                
+                return latest_info
+            else:
+                print("⚠️ ウイルスパターンファイル情報が見つかりませんでした")
+                return None
+                
+        except Exception as e:
+            print(f"⚠️ ウイルスパターンファイル情報抽出エラー: {e}")
+            return None
+    
+    def parse_virus_pattern_datetime(self, virus_info):
+        """ウイルスパターンファイル情報から更新日時を取得（例: 2025/09/02 午前 07:38:52）"""
+        # 日付パターンを検索（例: 2025/09/02 午前 07:38:52）
+        date_pattern = r'(\d{4})/(\d{2})/(\d{2})\s+(午前|午後)\s+(\d{2}):(\d{2}):(\d{2})'
+        match = re.search(date_pattern, virus_info)
+        if not match:
+            return None
+        
+        year, month, day, ampm, hour, minute, second = match.groups()
+        
+        # 午後時間の調整
+        hour = int(hour)
+        if ampm == '午後' and hour != 12:
+            hour += 12
+        elif ampm == '午前' and hour == 12:
+            hour = 0
+        
+        # 日付オブジェクトを作成
+        return datetime(int(year), int(month), int(day), hour, int(minute), int(second))
+    
+    def get_virus_pattern_age_days(self, virus_info):
+        """ウイルスパターンファイルの更新からの経過日数（小数）を取得"""
+        if not virus_info:
+            return None
+        
+        try:
+            virus_date = self.parse_virus_pattern_datetime(virus_info)
+        except ValueError:
+            return None
+        if not virus_date:
+            return None
+        
+        return (datetime.now() - virus_date).total_seconds() / 86400
+    
+    def validate_virus_pattern_date(self, virus_info):
+        """ウイルスパターンファイルの日付が当日かどうかを検証（改善版）"""
+        try:
+            virus_date = self.parse_virus_pattern_datetime(virus_info)
+            
+            if virus_date:
+                current_date = datetime.now()
+                
+                # 日付の差を計算
+                date_diff = current_date - virus_date
+                
+                print(f"📊 ウイルスパターンファイル日付: {virus_date.strftime('%Y-%m-%d %H:%M:%S')}")
+                print(f"📊 現在日時: {current_date.strftime('%Y-%m-%d %H:%M:%S')}")
+                print(f"📊 日付差: {date_diff.days}日 {date_diff.seconds//3600}時間")
+                
+                # パターンファイルの更新頻度を考慮した判定（現実的な基準）
+                # ウイルスパターンファイルは通常、2-3日おきに更新される
+                if date_diff.days <= 3:
+                    return f"✅ {date_diff.days}日前の情報（正常範囲内）"
+                elif date_diff.days <= 5:
+                    return f"⚠️ {date_diff.days}日前の情報（注意が必要）"
+                elif date_diff.days <= 7:
+                    return f"⚠️ {date_diff.days}日前の情報（更新が遅れている可能性）"
+                elif date_diff.days <= 14:
+                    return f"❌ {date_diff.days}日前の古い情報（要確認・手動更新推奨）"
+                else:
+                    return f"🚨 {date_diff.days}日前の非常に古い情報（緊急確認必要）"
+            else:
+                return "❌ 日付パターンが見つかりませんでした"
+                
+        except Exception as e:
+            return f"❌ 日付検証エラー: {e}"
+    
+    def show_log_summary(self):
+        """統合ログファイルのサマリーを表示"""
+        try:
+            if not os.path.exists(self.log_file):
+                print("📝 統合ログファイルがまだ作成されていません")
+                return
+            
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+                lines = content.split('\n')
+            
+            if not lines:
+                print("📝 統合ログファイルにデータがありません")
+                return
+            
+            print(f"\n📊 統合ログファイルサマリー ({self.log_file})")
+            print("=" * 60)
+            
+            # ステータスチェック結果を抽出
+            status_checks = []
+            log_checks = []
+            virus_patterns = []
+            heartbeats = 0
+            
+            current_section = None
+            for line in lines:
+                line = line.strip()
+                if line.startswith('=== ') and line.endswith(' ==='):
+                    # 新しいセクションの開始
+                    if 'ステータスチェック結果' in content:
+                        current_section = 'status'
+                    elif 'ログチェック' in content:
+                        current_section = 'log'
+                    elif 'ウイルスパターンファイル' in content:
+                        current_section = 'virus'
+                elif line.startswith('ステータスチェック結果:'):
+                    status_checks.append(line)
+                elif line.startswith('サーバー pcvtmu'):
+                    log_checks.append(line)
+                elif '] 変化なし: ステータス ' in line:
+                    # 差分記録モードのハートビート（前回と同じ結果のステータスチェック）
+                    heartbeats += 1
+                    status_checks.append(f"ステータスチェック結果: {line.split('] 変化なし: ステータス ', 1)[1].split('（')[0]}")
+                elif line.startswith('要素テキスト: ウイルスパターンファイル'):
+                    virus_patterns.append(line)
+            
+            # 統計情報を表示
+            print(f"📈 ステータスチェック実行回数: {len(status_checks)}回")
+            if heartbeats:
+                print(f"💓 うち前回から変化なし（ハートビート）: {heartbeats}回")
+            print(f"📋 ログチェック実行回数: {len(log_checks)}回")
+            print(f"🦠 ウイルスパターン抽出実行回数: {len(virus_patterns)}回")
+            
+            # 最新の実行結果を表示（指定された順序：タイムスタンプ、ステータス、ウイルスパターンファイル、ログイン情報）
+            print(f"\n📅 最新実行状況:")
+            if status_checks:
+                latest_status = status_checks[-1]
+                print(f"  - ステータスチェック: {latest_status}")
+            
+            # ウイルスパターンファイルの詳細情報を表示
+            if virus_patterns:
+                latest_virus = virus_patterns[-1]
+                print(f"  - ウイルスパターン抽出: {latest_virus}")
+                
+                # 最新のウイルスパターンファイル情報を取得して日付検証
+                latest_virus_info = self.extract_latest_virus_pattern_info()
+                if latest_virus_info:
+                    date_validation = self.validate_virus_pattern_date(latest_virus_info)
+                    print(f"  - ウイルスパターン日付検証: {date_validation}")
+                    
+                    # 警告レベルの表示
+                    if "❌" in date_validation or "🚨" in date_validation:
+                        print(f"  🚨 ウイルスパターンファイル警告: 更新が遅れています")
+                    elif "⚠️" in date_validation:
+                        print(f"  ⚠️ ウイルスパターンファイル注意: 更新状況を確認してください")
+                    else:
+                        print(f"  ✅ ウイルスパターンファイル: 正常な状態です")
+            
+            if log_checks:
+                latest_log = log_checks[-1]
+                print(f"  - ログチェック: {latest_log}")
+            
+            # 成功率を計算（ステータスチェックのOK率）
+            ok_count = sum(1 for check in status_checks if 'OK' in check)
+            total_status = len(status_checks)
+            if total_status > 0:
+                success_rate = (ok_count / total_status) * 100
+                print(f"\n📊 ステータスチェック成功率: {success_rate:.1f}% ({ok_count}/{total_status})")
+            
+            print("=" * 60)
+            
+        except Exception as e:
+            print(f"⚠️ 統合ログファイルサマリー表示中にエラー: {e}")
+            print(f"💡 エラーの詳細: {type(e).__name__}")
+            import traceback
+            traceback.print_exc()
+            
+            # 統合ログファイルの内容を表示
+            integrated_log = self.log_file
+            if os.path.exists(integrated_log):
+                print(f"\n📋 統合ログファイルサマリー ({integrated_log})")
+                print("=" * 60)
+                try:
+                    with open(integrated_log, 'r', encoding='utf-8') as f:
+                        lines = f.readlines()
+                    
+                    if lines:
+                        # 最新の実行結果を表示
+                        recent_lines = [line.strip() for line in lines if line.strip()][-20:]
+                        print(f"✅ 統合ログファイル情報: {len(recent_lines)}行")
+                        for i, line in enumerate(recent_lines, 1):
+                            print(f"   {i}. {line}")
+                    else:
+                        print("   📝 ログファイルにデータがありません")
+                        
+                except Exception as e:
+                    print(f"   ⚠️ 統合ログファイル読み込みエラー: {e}")
+                
+                print("=" * 60)
+            else:
+                print(f"\n📝 統合ログファイルがまだ作成されていません")
+            
+        except Exception as e:
+            print(f"⚠️ ログサマリー表示中にエラー: {e}")
+            print(f"💡 エラーの詳細: {type(e).__name__}")
+            import traceback
+            traceback.print_exc()
+    
+    def show_history(self, limit=10):
+        """統合ログファイルから直近の実行履歴（ステータス・ウイルスパターンファイル・ログイン成否）を一覧表示"""
+        try:
+            if not os.path.exists(self.log_file):
+                print("📝 統合ログファイルがまだ作成されていません")
+                return []
+            
+            # 実行ごとに「=== 日時 ===」の見出しで区切られている
+            runs = []
+            current_server = None
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    header = re.fullmatch(r'=== (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) ===', line)
+                    if header:
+                        runs.append({'time': header.group(1), 'status': None, 'virus': {}, 'logins': {}})
+                        continue
+                    if not runs:
+                        continue
+                    
+                    heartbeat = re.match(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] 変化なし: ステータス (\S+?)（', line)
+                    if heartbeat:
+                        # 差分記録モードのハートビートは直前の記録と同じ結果の実行として扱う
+                        runs.append(dict(runs[-1], time=heartbeat.group(1), status=heartbeat.group(2), heartbeat=True))
+                        continue
+                    
+                    run = runs[-1]
+                    server = re.fullmatch(r'=== (\S+) ウイルスパターンファイル行 \d+ ===', line)
+                    if server:
+                        current_server = server.group(1)
+                    elif line.startswith('ステータスチェック結果:'):
+                        run['status'] = line.split(':', 1)[1].strip()
+                    elif line.startswith('行全体テキスト:') and current_server:
+                        run['virus'][current_server] = line.split('行全体テキスト:', 1)[1].strip()
+                    elif '] サーバー ' in line:
+                        login = re.search(r'\] サーバー (\S+?): ', line)
+                        if login:
+                            run['logins'][login.group(1)] = 'ログインしました' in line
+            
+            recent_runs = runs[-limit:] if limit > 0 else runs
+            print(f"\n📜 実行履歴（直近{len(recent_runs)}件 / 全{len(runs)}件） ({self.log_file})")
+            print("=" * 60)
+            for run in recent_runs:
+                status = run['status'] or "不明"
+                status_icon = "✅" if status == "OK" else "❌" if status in ("NG", "ERROR") else "⚠️"
+                if run.get('heartbeat'):
+                    print(f"💓 {run['time']}  ステータス: {status}（前回から変化なし）")
+                    continue
+                print(f"{status_icon} {run['time']}  ステータス: {status}")
+                for server, virus_info in run['virus'].items():
+                    # 経過日数は実行時点を基準にする
+                    try:
+                        virus_date = self.parse_virus_pattern_datetime(virus_info)
+                    except ValueError:
+                        virus_date = None
+                    if virus_date:
+                        age_days = (datetime.strptime(run['time'], "%Y-%m-%d %H:%M:%S") - virus_date).total_seconds() / 86400
+                        print(f"   🦠 {server}: {virus_date.strftime('%Y-%m-%d %H:%M')}（実行時点で{age_days:.1f}日前）")
+                    else:
+                        print(f"   🦠 {server}: 日付不明")
+                for server, logged_in in run['logins'].items():
+                    print(f"   {'🔐' if logged_in else '⚠️'} {server}: {'ログイン記録あり' if logged_in else 'ログイン記録なし'}")
+            print("=" * 60)
+            return recent_runs
+            
+        except Exception as e:
+            print(f"⚠️ 実行履歴表示中にエラー: {e}")
+            return []
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+ApexOne Metrics
+チェック結果とステップ所要時間のOpenMetrics出力、メトリクス（/metrics）と状態API（/status）のHTTPサーバー
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+class MetricsMixin:
+    """メトリクスと状態APIの出力（ApexOneStatusCheckerの一部）"""
+    
+    def escape_metric_label(self, value):
+        """OpenMetricsのラベル値をエスケープ"""
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    def format_metric_labels(self, labels):
+        """OpenMetricsのラベル部分を組み立て"""
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{self.escape_metric_label(value)}"' for key, value in labels.items()) + "}"
+    
+    def update_metrics(self):
+        """今回の実行結果からメトリクスを更新（HTTPエンドポイントとテキストファイルの両方に反映）"""
+        try:
+            # ステップ所要時間のヒストグラムに今回の計測結果を追加
+            for span in self.spans:
+                if span['duration_ms'] is None:
+                    continue
+                histogram = self.step_duration_histograms.setdefault(span['name'], {
+                    'buckets': [0] * len(self.step_duration_buckets),
+                    'sum': 0.0,
+                    'count': 0
+                })
+                seconds = span['duration_ms'] / 1000
+                for index, bound in enumerate(self.step_duration_buckets):
+                    if seconds <= bound:
+                        histogram['buckets'][index] += 1
+                histogram['sum'] += seconds
+                histogram['count'] += 1
+            
+            text = self.render_openmetrics()
+            snapshot = self.build_status_snapshot()
+            with self.metrics_lock:
+                self.metrics_text = text
+                self.status_snapshot = snapshot
+            
+            if self.metrics_textfile:
+                self.write_metrics_textfile(text)
+                
+        except Exception as e:
+            print(f"⚠️ メトリクス更新エラー: {e}")
+    
+    def render_openmetrics(self):
+        """現在の実行結果をOpenMetricsテキスト形式で出力"""
+        lines = []
+        
+        def metric_family(name, metric_type, help_text, samples):
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"# HELP {name} {help_text}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{self.format_metric_labels(labels)} {value}")
+        
+        # 製品ごとの接続ステータス（有効=1、それ以外=0）
+        product_samples = []
+        for record in self.product_status_records:
+            labels = {'product': record['product'], 'server': record.get('server', ''), 'status': record['status']}
+            product_samples.append(('', labels, 1 if record['status'] == '有効' else 0))
+        metric_family('apexone_product_status', 'gauge',
+                      'Product connection status on the Control Manager widget (1 = 有効).', product_samples)
+        
+        # ステータスチェック結果（OK/NG/INSUFFICIENT_DATA など）
+        status_samples = []
+        if self.last_status_result:
+            status_samples.append(('', {'result': self.last_status_result}, 1))
+        metric_family('apexone_status_check_result', 'gauge',
+                      'Result of the latest status check.', status_samples)
+        
+        # ウイルスパターンファイルの経過日数（validate_virus_pattern_date と同じ日時解析）
+        pattern_samples = []
+        for server_name, virus_info in (('PCVTMU53_OSCE', self.current_pcvtmu53_virus_info),
+                                        ('PCVTMU54_OSCE', self.current_pcvtmu54_virus_info)):
+            age_days = self.get_virus_pattern_age_days(virus_info)
+            if age_days is not None:
+                pattern_samples.append(('', {'server': server_name}, round(age_days, 3)))
+        metric_family('apexone_virus_pattern_age_days', 'gauge',
+                      'Days since the virus pattern file was updated.', pattern_samples)
+        
+        # システムイベントログチェックの成否
+        event_samples = []
+        for result in self.last_event_log_results:
+            event_samples.append(('', {'server': result['server']}, 1 if result['success'] else 0))
+        metric_family('apexone_event_log_check_success', 'gauge',
+                      'Whether the latest system event log check succeeded for the server.', event_samples)
+        
+        # アラート通知先ごとの直近の送信結果と所要時間
+        alert_success_samples = []
+        alert_latency_samples = []
+        for delivery in self.last_alert_deliveries:
+            alert_success_samples.append(('', {'sink': delivery['sink']}, 1 if delivery['success'] else 0))
+            alert_latency_samples.append(('', {'sink': delivery['sink']}, round(delivery['latency_ms'] / 1000, 6)))
+        metric_family('apexone_alert_delivery_success', 'gauge',
+                      'Whether the latest alert batch was delivered to the sink.', alert_success_samples)
+        metric_family('apexone_alert_delivery_seconds', 'gauge',
+                      'Time taken to deliver the latest alert batch to the sink.', alert_latency_samples)
+        
+        # 実行全体の情報
+        run_samples = [('', {}, round(self.run_started_at.timestamp(), 3))]
+        metric_family('apexone_last_run_timestamp_seconds', 'gauge',
+                      'Start time of the latest run.', run_samples)
+        
+        # ステップごとの所要時間ヒストグラム
+        histogram_samples = []
+        for step_name, histogram in sorted(self.step_duration_histograms.items()):
+            for bound, count in zip(self.step_duration_buckets, histogram['buckets']):
+                histogram_samples.append(('_bucket', {'step': step_name, 'le': bound}, count))
+            histogram_samples.append(('_bucket', {'step': step_name, 'le': '+Inf'}, histogram['count']))
+            histogram_samples.append(('_sum', {'step': step_name}, round(histogram['sum'], 6)))
+            histogram_samples.append(('_count', {'step': step_name}, histogram['count']))
+        metric_family('apexone_step_duration_seconds', 'histogram',
+                      'Duration of each measured step of a run.', histogram_samples)
+        
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+    
+    def write_metrics_textfile(self, text):
+        """テキストファイルコレクター用にメトリクスを書き出し（途中状態を読まれないよう一時ファイル経由）"""
+        try:
+            temp_file = f"{self.metrics_textfile}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_file, self.metrics_textfile)
+            print(f"📈 メトリクスを書き出しました: {self.metrics_textfile}")
+        except Exception as e:
+            print(f"⚠️ メトリクスファイル書き出しエラー: {e}")
+    
+    def build_status_snapshot(self):
+        """状態APIが返す最新結果（製品ステータス・ウイルスパターンファイル・イベントログ・実行時間）"""
+        virus_patterns = []
+        for server_name, virus_info in (('PCVTMU53_OSCE', self.current_pcvtmu53_virus_info),
+                                        ('PCVTMU54_OSCE', self.current_pcvtmu54_virus_info)):
+            if not virus_info:
+                continue
+            try:
+                updated_at = self.parse_virus_pattern_datetime(virus_info)
+            except ValueError:
+                updated_at = None
+            virus_patterns.append({
+                'server': server_name,
+                'text': virus_info,
+                'updated_at': updated_at.isoformat() if updated_at else None
+            })
+        
+        # まだ1回も実行していない場合は実行情報を返さない
+        run = None
+        if self.spans:
+            run = {
+                'started_at': self.run_started_at.isoformat(timespec='seconds'),
+                'duration_ms': round((time.perf_counter() - self.run_started_perf) * 1000, 1),
+                'timed_out_steps': self.timed_out_steps,
+                'steps_ms': self.summarize_top_level_spans()
+            }
+        
+        return {
+            'source': self.status_source,
+            'run': run,
+            'status_result': self.last_status_result,
+            'products': self.product_status_records,
+            'virus_patterns': virus_patterns,
+            'event_logs': [self.serialize_event_log_result(result) for result in self.last_event_log_results]
+        }
+    
+    def render_status_json(self):
+        """状態APIの応答（ウイルスパターンファイルの経過日数は応答時点で計算）"""
+        if self.status_source == "state_file":
+            self.refresh_status_from_state()
+        
+        with self.metrics_lock:
+            snapshot = dict(self.status_snapshot)
+        
+        now = datetime.now()
+        snapshot['generated_at'] = now.isoformat(timespec='seconds')
+        snapshot['virus_patterns'] = [
+            dict(pattern, age_days=round((now - datetime.fromisoformat(pattern['updated_at'])).total_seconds() / 86400, 3)
+                 if pattern['updated_at'] else None)
+            for pattern in snapshot.get('virus_patterns', [])
+        ]
+        return json.dumps(snapshot, ensure_ascii=False, indent=2)
+    
+    def load_status_from_state(self):
+        """状態ファイルに保存された直近の結果を読み込み（コンソールにはアクセスしない）"""
+        state = self.load_state()
+        readings = state.get('check_readings', {})
+        last_run = state.get('last_run', {})
+        
+        connection_status = readings.get('connection_status', {}).get('data', {})
+        self.last_status_result = connection_status.get('result') or last_run.get('status_result')
+        self.product_status_records = connection_status.get('records', [])
+        
+        virus_pattern = readings.get('virus_pattern', {}).get('data') or last_run.get('virus_pattern', {})
+        self.current_pcvtmu53_virus_info = virus_pattern.get('PCVTMU53_OSCE')
+        self.current_pcvtmu54_virus_info = virus_pattern.get('PCVTMU54_OSCE')
+        
+        self.last_event_log_results = last_run.get('event_logs', [])
+        if last_run.get('started_at'):
+            self.run_started_at = datetime.fromisoformat(last_run['started_at'])
+        
+        snapshot = self.build_status_snapshot()
+        if last_run:
+            snapshot['run'] = {key: last_run.get(key) for key in
+                               ('started_at', 'finished_at', 'duration_ms', 'timed_out_steps', 'steps_ms')}
+        text = self.render_openmetrics()
+        with self.metrics_lock:
+            self.status_snapshot = snapshot
+            self.metrics_text = text
+    
+    def refresh_status_from_state(self):
+        """状態ファイルが更新されていれば読み込み直す（別プロセスの実行結果を反映）"""
+        try:
+            mtime = os.stat(self.state_file).st_mtime
+        except OSError:
+            return
+        with self.status_refresh_lock:
+            if mtime != self.status_state_mtime:
+                self.status_state_mtime = mtime
+                self.load_status_from_state()
+    
+    def start_metrics_server(self, port):
+        """メトリクス（/metrics）と状態API（/status）を返すHTTPサーバーをバックグラウンドで起動
+        
+        どちらもメモリ上の最新結果を返すだけで、ブラウザでのチェックは実行しない。
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        checker = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/metrics':
+                    with checker.metrics_lock:
+                        body = checker.metrics_text.encode('utf-8')
+                    content_type = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+                elif path == '/status':
+                    body = checker.render_status_json().encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                # スクレイプごとのアクセスログは出力しない
+                pass
+        
+        if self.status_source == "state_file":
+            self.refresh_status_from_state()
+        else:
+            self.metrics_text = self.render_openmetrics()
+            self.status_snapshot = self.build_status_snapshot()
+        self.metrics_server = ThreadingHTTPServer(('127.0.0.1', port), MetricsHandler)
+        thread = threading.Thread(target=self.metrics_server.serve_forever, daemon=True)
+        thread.start()
+        print(f"📈 メトリクスエンドポイントを起動しました: http://127.0.0.1:{port}/metrics")
+        print(f"📡 状態APIを起動しました: http://127.0.0.1:{port}/status")
+    
+    def serve_status(self, port):
+        """状態ファイルの結果を返す状態APIとメトリクスのみを起動（チェックは実行しない、Ctrl+Cで終了）"""
+        self.status_source = "state_file"
+        self.start_metrics_server(port)
+        print(f"💡 状態ファイル（{self.state_file}）が更新されると、次の要求から新しい結果を返します")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.metrics_server.shutdown()
+            print("🛑 状態APIを停止しました")
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ApexOne Mock Console
+Apex Central（Control Manager）とOfficeScan管理コンソールの画面構造を再現するローカルのモックサーバー
+本番のコンソールにアクセスせずにApexOneStatusCheckerの動作確認とベンチマークを行う
+"""
+
+import asyncio
+import os
+import time
+import json
+import hmac
+import base64
+import hashlib
+import random
+import secrets
+import socket
+import tempfile
+import subprocess
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from html import escape
+
+class MockApexOneConsole:
+    def __init__(self, host="127.0.0.1", port=8443):
+        self.host = host
+        self.port = port
+        
+        # 応答遅延（ミリ秒）
+        self.latency_ms = 50                 # 全リクエスト共通の遅延
+        self.latency_jitter_ms = 0           # 遅延に加えるランダムな揺らぎの上限
+        self.log_page_latency_ms = 200       # システムイベントログページに追加する遅延
+        
+        # 製品の接続ステータスウィジェット
+        self.target_products = [
+            'PCVTMU54_OSCE', 'PCVTMU53_OSCE', 'PCVTMU54_TMSM', 'PCVTMU53_TMSM'
+        ]
+        self.extra_products = 0              # 対象製品以外にウィジェットに表示する製品数
+        self.product_status = "有効"          # 対象製品のステータス
+        
+        # ディレクトリ（製品ツリー）のサーバー
+        self.directory_servers = ["PCVTMU53_OSCE", "PCVTMU54_OSCE", "PCVTMU53_TMSM", "PCVTMU54_TMSM"]
+        self.component_rows = 10             # コンポーネント一覧のウイルスパターンファイル以外の行数
+        self.virus_pattern_age_hours = 6     # ウイルスパターンファイルの更新からの経過時間
+        
+        # OfficeScanシステムイベントログ
+        self.officescan_servers = ["pcvtmu53", "pcvtmu54"]
+        self.username = "benchmark"
+        self.password = "benchmark"
+        self.domain = "tad.asahi-np.co.jp"
+        self.log_events = 200                # 生成するイベント数
+        self.log_rows_per_page = 50          # 1ページあたりの行数
+        self.event_interval_minutes = 30     # イベントの発生間隔
+        self.login_event_every = 5           # ログインイベントを挿入する間隔（件）
+        # ページ番号のクエリパラメータ名（チェッカーの event_log_page_param と同じく実機では未確認の想定）
+        # None の場合はページ送りを無視して常に1ページ目を返す（ページ送りが機能しない場合の確認用）
+        self.log_page_param = "page"
+        
+        # 自動化API（アプリケーションIDとAPIキーで署名したJWTを検証）
+        self.api_application_id = "00000000-0000-0000-0000-000000000000"
+        self.api_key = "benchmark-api-key"
+        
+        self.sessions = set()
+        self.request_count = 0
+        self.connection_count = 0
+        self.started_at = datetime.now().replace(second=0, microsecond=0)
+        self.server = None
+        self.lock = threading.Lock()
+    
+    @property
+    def base_url(self):
+        """モックサーバーのベースURL"""
+        return f"http://{self.host}:{self.port}"
+    
+    @property
+    def control_manager_url(self):
+        """Control ManagerのURL（ApexOneStatusChecker.control_manager_urlに設定する値）"""
+        return f"{self.base_url}/webapp/"
+    
+    @property
+    def log_check_server_urls(self):
+        """OfficeScan管理コンソールのURL（ApexOneStatusChecker.log_check_serversに設定する値）"""
+        return [f"{self.base_url}/{server}/officescan/" for server in self.officescan_servers]
+    
+    def start(self):
+        """モックサーバーをバックグラウンドで起動"""
+        console = self
+        
+        class MockConsoleHandler(BaseHTTPRequestHandler):
+            # キープアライブ（自動化APIクライアントの接続の再利用）に対応
+            protocol_version = "HTTP/1.1"
+            
+            def setup(self):
+                super().setup()
+                with console.lock:
+                    console.connection_count += 1
+            
+            def do_GET(self):
+                console.handle_request(self, "GET")
+            
+            def do_POST(self):
+                console.handle_request(self, "POST")
+            
+            def log_message(self, format, *args):
+                # リクエストごとのアクセスログは出力しない
+                pass
+        
+        self.server = ThreadingHTTPServer((self.host, self.port), MockConsoleHandler)
+        self.port = self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        print(f"🧪 モックコンソールを起動しました: {self.base_url}")
+        print(f"   Control Manager: {self.control_manager_url}")
+        for url in self.log_check_server_urls:
+            print(f"   OfficeScan: {url}")
+    
+    def stop(self):
+        """モックサーバーを停止"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            print(f"🛑 モックコンソールを停止しました（処理したリクエスト: {self.request_count}件 / 接続: {self.connection_count}件）")
+    
+    def handle_request(self, handler, method):
+        """リクエストを振り分けて応答（設定された遅延を加える）"""
+        with self.lock:
+            self.request_count += 1
+        
+        parts = urlsplit(handler.path)
+        path = parts.path
+        query = parse_qs(parts.query)
+        
+        delay_ms = self.latency_ms + random.uniform(0, self.latency_jitter_ms)
+        if path.endswith("/cgiShowLogs.exe"):
+            delay_ms += self.log_page_latency_ms
+        time.sleep(delay_ms / 1000)
+        
+        try:
+            if path.startswith("/WebApp/API/"):
+                self.handle_api(handler, method, path, query)
+            elif path.startswith("/webapp/"):
+                self.handle_control_manager(handler, path, query)
+            elif "/officescan/" in path:
+                self.handle_officescan(handler, method, path, query)
+            else:
+                handler.send_error(404)
+        except Exception as e:
+            print(f"⚠️ モックコンソール応答エラー: {handler.path} - {e}")
+            handler.send_error(500)
+    
+    def send_html(self, handler, body, status=200, headers=None):
+        """HTMLを返す"""
+        content = f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Mock Console</title></head><body>{body}</body></html>'
+        data = content.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+    
+    def send_json(self, handler, data, status=200):
+        """JSONを返す"""
+        content = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+    
+    def send_redirect(self, handler, location, headers=None):
+        """リダイレクトを返す"""
+        handler.send_response(302)
+        handler.send_header('Location', location)
+        handler.send_header('Content-Length', '0')
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+    
+    def format_pattern_datetime(self, value):
+        """コンポーネント一覧の日時表記（例: 2025/09/02 午前 07:38:52）"""
+        ampm = "午前" if value.hour < 12 else "午後"
+        hour = value.hour % 12 or 12
+        return f"{value.strftime('%Y/%m/%d')} {ampm} {hour:02d}:{value.strftime('%M:%S')}"
+    
+    def format_event_datetime(self, value):
+        """システムイベントログの日時表記（例: 2025/9/2 7:38:52）"""
+        return f"{value.year}/{value.month}/{value.day} {value.hour}:{value.minute:02d}:{value.second:02d}"
+    
+    # ---- Control Manager ----
+    
+    def handle_control_manager(self, handler, path, query):
+        """Control Managerの画面（ログイン → フレーム構成 → ダッシュボード/ディレクトリ）"""
+        if path == "/webapp/":
+            self.send_html(handler, '''
+                <h1>Apex Central</h1>
+                <a id="loginDomainLink" href="/webapp/default.aspx">ドメインアカウントでログオン</a>
+            ''')
+        elif path == "/webapp/default.aspx":
+            self.send_html(handler, '''
+                <iframe name="iframe_index.aspx" src="/webapp/iframe_index.aspx" width="100%" height="900"></iframe>
+            ''')
+        elif path == "/webapp/iframe_index.aspx":
+            self.send_html(handler, '''
+                <div id="menu">
+                    <span><a href="/webapp/dashboard.aspx" target="mainTMCM">ダッシュボード</a></span>
+                    <span><a href="/webapp/directory.aspx" target="mainTMCM">ディレクトリ</a></span>
+                    <span><a href="/webapp/products.aspx" target="mainTMCM">製品</a></span>
+                </div>
+                <iframe name="mainTMCM" src="/webapp/dashboard.aspx" width="100%" height="800"></iframe>
+            ''')
+        elif path == "/webapp/dashboard.aspx":
+            self.send_html(handler, self.render_dashboard(query.get('tab', [''])[0]))
+        elif path == "/webapp/directory.aspx":
+            self.send_html(handler, '<h2>ディレクトリの管理</h2>')
+        elif path == "/webapp/products.aspx":
+            self.send_html(handler, '''
+                <iframe name="leftName" src="/webapp/tree.aspx" width="30%" height="700"></iframe>
+                <iframe name="IframeName" src="/webapp/blank.aspx" width="68%" height="700"></iframe>
+            ''')
+        elif path == "/webapp/tree.aspx":
+            server_links = "".join(
+                f'<div><a href="/webapp/product_status.aspx?server={escape(server)}" target="IframeName">{escape(server)}</a></div>'
+                for server in self.directory_servers
+            )
+            self.send_html(handler, f'''
+                <div><a href="#" onclick="document.getElementById('servers').style.display='block'; return false;">ローカルフォルダ</a></div>
+                <div id="servers" style="display:none">{server_links}</div>
+            ''')
+        elif path == "/webapp/blank.aspx":
+            self.send_html(handler, '')
+        elif path == "/webapp/product_status.aspx":
+            self.send_html(handler, self.render_component_list(query.get('server', [''])[0]))
+        else:
+            handler.send_error(404)
+    
+    def render_dashboard(self, tab):
+        """ダッシュボード（概要タブでは製品の接続ステータスウィジェットを表示）"""
+        tabs = '''
+            <div id="tabs">
+                <a href="/webapp/dashboard.aspx?tab=summary">概要</a>
+                <a href="/webapp/dashboard.aspx?tab=security">セキュリティ状況</a>
+            </div>
+        '''
+        if tab != "summary":
+            return tabs
+        
+        last_connected = self.started_at.strftime("%Y/%m/%d %H:%M:%S")
+        rows = [(product, product.split('_')[0].lower(), self.product_status) for product in self.target_products]
+        rows += [(f"PCV{index:05d}_OSCE", f"pcv{index:05d}", "有効") for index in range(self.extra_products)]
+        table_rows = "".join(
+            f"<tr><td>{escape(product)}</td><td>{escape(server)}</td><td>{escape(status)}</td><td>{last_connected}</td></tr>"
+            for product, server, status in rows
+        )
+        return f'''
+            {tabs}
+            <div class="widget">
+                <div class="widget-title">製品の接続ステータス</div>
+                <table>
+                    <tr><th>製品</th><th>サーバ</th><th>ステータス</th><th>最終接続日時</th></tr>
+                    {table_rows}
+                </table>
+            </div>
+        '''
+    
+    def render_component_list(self, server):
+        """サーバーのコンポーネント一覧（ウイルスパターンファイル行を含む）"""
+        updated_at = datetime.now() - timedelta(hours=self.virus_pattern_age_hours)
+        rows = [("ウイルスパターンファイル", "19.541.00", updated_at)]
+        rows += [
+            (f"コンポーネント{index + 1:03d}", f"{index + 1}.0.1000", updated_at - timedelta(days=index))
+            for index in range(self.component_rows)
+        ]
+        table_rows = "".join(
+            f"<tr><td>{escape(name)}</td><td>{version}</td><td>{self.format_pattern_datetime(value)}</td></tr>"
+            for name, version, value in rows
+        )
+        return f'''
+            <h2>{escape(server)}</h2>
+            <table>
+                <tr><th>コンポーネント</th><th>バージョン</th><th>最終更新日時</th></tr>
+                {table_rows}
+            </table>
+        '''
+    
+    # ---- 自動化API ----
+    
+    def verify_api_token(self, handler, method, body):
+        """AuthorizationヘッダーのJWT（HS256の署名・アプリケーションID・リクエストのチェックサム）を検証"""
+        def decode(text):
+            return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+        
+        authorization = handler.headers.get('Authorization', '')
+        if not authorization.startswith("Bearer "):
+            return False
+        try:
+            header, payload, signature = authorization[len("Bearer "):].split('.')
+            expected = hmac.new(self.api_key.encode('utf-8'), f"{header}.{payload}".encode('ascii'), hashlib.sha256).digest()
+            if not hmac.compare_digest(decode(signature), expected):
+                return False
+            claims = json.loads(decode(payload))
+        except Exception:
+            return False
+        
+        text = f"{method.upper()}|{handler.path.lower()}||{body}"
+        checksum = base64.b64encode(hashlib.sha256(text.encode('utf-8')).digest()).decode('ascii')
+        return claims.get('appid') == self.api_application_id and claims.get('checksum') == checksum
+    
+    def handle_api(self, handler, method, path, query):
+        """Apex Centralの自動化API（製品サーバー一覧・サーバーごとのコンポーネント一覧）"""
+        length = int(handler.headers.get('Content-Length', 0))
+        body = handler.rfile.read(length).decode('utf-8') if length else ""
+        if not self.verify_api_token(handler, method, body):
+            self.send_json(handler, {'result_code': 0, 'result_description': "Unauthorized"}, status=401)
+            return
+        
+        if path == "/WebApp/API/ServerResource/ProductServers":
+            last_connected = self.started_at.strftime("%Y/%m/%d %H:%M:%S")
+            servers = [(product, product.split('_')[0].lower(), self.product_status) for product in self.target_products]
+            servers += [(f"PCV{index:05d}_OSCE", f"pcv{index:05d}", "有効") for index in range(self.extra_products)]
+            content = [{
+                'entity_id': f"entity-{product}",
+                'display_name': product,
+                'host_name': server,
+                'connection_status': status,
+                'last_connected': last_connected
+            } for product, server, status in servers]
+        elif path == "/WebApp/API/ServerResource/ProductServers/Components":
+            server = query.get('entity_id', [''])[0].replace("entity-", "", 1)
+            if server not in self.directory_servers:
+                self.send_json(handler, {'result_code': 0, 'result_description': f"Unknown entity: {server}"}, status=404)
+                return
+            updated_at = datetime.now() - timedelta(hours=self.virus_pattern_age_hours)
+            content = [{'component': "ウイルスパターンファイル", 'version': "19.541.00",
+                        'last_updated': updated_at.isoformat(timespec='seconds')}]
+            content += [{'component': f"コンポーネント{index + 1:03d}", 'version': f"{index + 1}.0.1000",
+                         'last_updated': (updated_at - timedelta(days=index)).isoformat(timespec='seconds')}
+                        for index in range(self.component_rows)]
+        else:
+            self.send_json(handler, {'result_code': 0, 'result_description': "Not Found"}, status=404)
+            return
+        
+        self.send_json(handler, {'result_code': 1, 'result_description': "Operation successful", 'result_content': content})
+    
+    # ---- OfficeScan ----
+    
+    def handle_officescan(self, handler, method, path, query):
+        """OfficeScan管理コンソールの画面（ログインフォーム → コンソール → システムイベントログ）"""
+        server, _, rest = path.lstrip('/').partition('/officescan/')
+        base_path = f"/{server}/officescan/"
+        session = self.get_session(handler, server)
+        
+        if method == "POST" and rest == "console/html/cgi/cgiChkMasterPwd.exe":
+            length = int(handler.headers.get('Content-Length', 0))
+            form = parse_qs(handler.rfile.read(length).decode('utf-8'))
+            if form.get('username', [''])[0] == self.username and form.get('password', [''])[0] == self.password:
+                token = secrets.token_hex(16)
+                with self.lock:
+                    self.sessions.add(token)
+                self.send_redirect(handler, f"{base_path}console/html/main.htm",
+                                   {'Set-Cookie': f"session_{server}={token}; Path={base_path}"})
+            else:
+                self.send_html(handler, self.render_login_form(base_path, "ユーザー名またはパスワードが正しくありません"))
+        elif not session:
+            self.send_html(handler, self.render_login_form(base_path))
+        elif rest in ("", "console/html/main.htm"):
+            self.send_html(handler, f'<h1>OfficeScan 管理コンソール ({escape(server)})</h1>')
+        elif rest == "console/html/cgi/cgiShowLogs.exe":
+            page_number = int(query.get(self.log_page_param, ['1'])[0] or 1) if self.log_page_param else 1
+            self.send_html(handler, self.render_event_page(page_number))
+        else:
+            handler.send_error(404)
+    
+    def get_session(self, handler, server):
+        """リクエストのCookieからログイン済みセッションを取得"""
+        for item in handler.headers.get('Cookie', '').split(';'):
+            name, _, value = item.strip().partition('=')
+            if name == f"session_{server}" and value in self.sessions:
+                return value
+        return None
+    
+    def render_login_form(self, base_path, message=""):
+        """OfficeScanのログインフォーム"""
+        message_html = f'<p class="error">{escape(message)}</p>' if message else ""
+        return f'''
+            <h1>OfficeScan</h1>
+            {message_html}
+            <form id="form_login" method="post" action="{base_path}console/html/cgi/cgiChkMasterPwd.exe">
+                <select id="labelDomain" name="domainlist"><option value="{escape(self.domain)}">{escape(self.domain)}</option></select>
+                <input id="labelUsername" name="username" type="text">
+                <input id="labelPassword" name="password" type="password">
+                <button id="btn-signin" type="submit">ログオン</button>
+            </form>
+        '''
+    
+    def render_event_page(self, page_number):
+        """システムイベントログの1ページ分（新しい順、範囲外のページは空の表）"""
+        messages = [
+            "パターンファイルのアップデートが完了しました",
+            "サーバーの予約アップデートを開始しました",
+            "エージェントの設定を配信しました",
+            "データベースのバックアップが完了しました"
+        ]
+        first = (page_number - 1) * self.log_rows_per_page
+        last = min(first + self.log_rows_per_page, self.log_events)
+        
+        table_rows = []
+        for index in range(max(first, 0), last):
+            occurred_at = self.started_at - timedelta(minutes=index * self.event_interval_minutes)
+            if index % self.login_event_every == 0:
+                message = f"ユーザー {self.username} が次の役割を使用してログインしました: 管理者"
+            else:
+                message = messages[index % len(messages)]
+            table_rows.append(f"<tr><td>{self.format_event_datetime(occurred_at)}</td><td>{escape(message)}</td></tr>")
+        
+        return f'''
+            <h2>システムイベントログ</h2>
+            <table class="log-table">
+                <tr><th>日時</th><th>イベント</th></tr>
+                {"".join(table_rows)}
+            </table>
+        '''
+
+def summarize_run_spans(spans):
+    """1回の実行の区間を名前ごとの合計時間（ミリ秒）に集計"""
+    totals = {}
+    for span in spans:
+        if span['duration_ms'] is None:
+            continue
+        totals[span['name']] = totals.get(span['name'], 0.0) + span['duration_ms']
+    return totals
+
+def find_free_port():
+    """空いているTCPポートを取得"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def launch_benchmark_chrome(chrome_exe, user_data_dir, max_wait=30):
+    """ベンチマーク専用のChromeを空きポートのデバッグモード（ヘッドレス）で起動（戻り値: (プロセス, ポート)）
+    
+    運用中のChrome（chrome_exe・user_data_dir・ポート9222）には触れない。
+    """
+    if not os.path.exists(chrome_exe):
+        raise RuntimeError(f"ベンチマーク用のChromeが見つかりません: {chrome_exe}"
+                           "（`playwright install chromium` を実行するか、--chrome-exe を指定してください）")
+    
+    port = find_free_port()
+    process = subprocess.Popen([
+        chrome_exe,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={user_data_dir}",
+        "--headless=new",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "about:blank"
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"ベンチマーク用のChromeが起動直後に終了しました（終了コード: {process.returncode}）")
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                print(f"🌐 ベンチマーク用のChromeを起動しました（PID: {process.pid}, デバッグポート: {port}）")
+                return process, port
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"ベンチマーク用のChromeのデバッグポート{port}が{max_wait}秒以内に応答しませんでした")
+
+def stop_benchmark_chrome(process):
+    """ベンチマーク用のChromeを終了"""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def run_benchmark(console, runs, output_file=None, use_api=False, chrome_exe=None):
+    """モックコンソールに対してApexOneStatusCheckerを繰り返し実行し、処理区間ごとの所要時間を集計
+    
+    Chromeは chrome_exe（省略時はPlaywrightのChromium）をベンチマーク専用に起動し、
+    チェッカーによるChromeの起動・終了とログの自動コミットは無効にする。
+    """
+    # チェッカーの読み込みはベンチマーク実行時のみ（モックサーバー単体ではPlaywrightを必要としない）
+    from playwright.async_api import async_playwright
+    from ApexOne_checker import ApexOneStatusChecker
+    
+    if not chrome_exe:
+        async with async_playwright() as p:
+            chrome_exe = p.chromium.executable_path
+    
+    work_dir = tempfile.mkdtemp(prefix="apexone_benchmark_")
+    original_dir = os.getcwd()
+    print(f"📁 作業ディレクトリ: {work_dir}")
+    
+    chrome_process, debug_port = launch_benchmark_chrome(chrome_exe, os.path.join(work_dir, "chrome_profile"))
+    
+    # ログ・状態ファイル・認証情報は全て作業ディレクトリに出力（既存のファイルやリポジトリを汚さない）
+    os.chdir(work_dir)
+    try:
+        checker = ApexOneStatusChecker()
+        checker.control_manager_url = console.control_manager_url
+        checker.log_check_servers = console.log_check_server_urls
+        checker.debug_port = debug_port
+        checker.chrome_management_enabled = False
+        checker.auto_commit_enabled = False
+        checker.check_freshness_hours = {check_name: 0 for check_name in checker.check_freshness_hours}
+        checker.encrypt_credentials(console.username, console.password, console.domain)
+        if use_api:
+            checker.api_enabled = True
+            checker.encrypt_api_credentials(console.api_application_id, console.api_key)
+        
+        run_totals = []
+        run_durations = []
+        for run_index in range(runs):
+            print(f"\n🏃 ベンチマーク実行 {run_index + 1}/{runs}")
+            started = time.perf_counter()
+            await checker.run()
+            run_durations.append((time.perf_counter() - started) * 1000)
+            run_totals.append(summarize_run_spans(checker.spans))
+    finally:
+        os.chdir(original_dir)
+        stop_benchmark_chrome(chrome_process)
+    
+    # 処理区間ごとに中央値・最小・最大を算出
+    names = sorted({name for totals in run_totals for name in totals})
+    results = []
+    for name in names:
+        values = sorted(totals.get(name, 0.0) for totals in run_totals)
+        results.append({
+            'name': name,
+            'median_ms': round(values[len(values) // 2], 1),
+            'min_ms': round(values[0], 1),
+            'max_ms': round(values[-1], 1)
+        })
+    results.sort(key=lambda result: result['median_ms'], reverse=True)
+    
+    sorted_durations = sorted(run_durations)
+    print(f"\n📊 ベンチマーク結果（{runs}回, 実行全体の中央値 {sorted_durations[len(sorted_durations) // 2] / 1000:.2f}秒）")
+    print("=" * 60)
+    print(f"   {'中央値':>9}  {'最小':>9}  {'最大':>9}  処理区間")
+    for result in results:
+        print(f"   {result['median_ms'] / 1000:8.2f}秒  {result['min_ms'] / 1000:8.2f}秒  {result['max_ms'] / 1000:8.2f}秒  {result['name']}")
+    print("=" * 60)
+    
+    if output_file:
+        report = {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'runs': runs,
+            'run_duration_ms': [round(duration, 1) for duration in run_durations],
+            'requests': console.request_count,
+            'phases': results
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📝 ベンチマーク結果を保存しました: {output_file}")
+    
+    return results
+
+def parse_arguments():
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description="ApexOne Mock Console")
+    parser.add_argument('--port', type=int, default=8443, help="待ち受けポート（既定: 8443、0で空きポート）")
+    parser.add_argument('--latency-ms', type=float, default=50, help="全リクエスト共通の応答遅延（ミリ秒）")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="応答遅延に加えるランダムな揺らぎの上限（ミリ秒）")
+    parser.add_argument('--log-page-latency-ms', type=float, default=200, help="システムイベントログページに追加する遅延（ミリ秒）")
+    parser.add_argument('--products', type=int, default=0, help="対象製品以外にウィジェットに表示する製品数")
+    parser.add_argument('--component-rows', type=int, default=10, help="コンポーネント一覧の行数（ウイルスパターンファイル以外）")
+    parser.add_argument('--log-events', type=int, default=200, help="システムイベントログのイベント数")
+    parser.add_argument('--log-rows-per-page', type=int, default=50, help="システムイベントログの1ページあたりの行数")
+    parser.add_argument('--benchmark', action='store_true', help="モックコンソールに対してチェッカーを実行して所要時間を計測する")
+    parser.add_argument('--api', action='store_true', help="ベンチマークでステータスを自動化APIから取得する")
+    parser.add_argument('--runs', type=int, default=3, help="ベンチマークの実行回数")
+    parser.add_argument('--output', help="ベンチマーク結果を保存するJSONファイル")
+    parser.add_argument('--chrome-exe', help="ベンチマークで起動するChrome（省略時はPlaywrightのChromium）")
+    return parser.parse_args()
+
+def main():
+    """メイン関数"""
+    args = parse_arguments()
+    console = MockApexOneConsole(port=args.port)
+    console.latency_ms = args.latency_ms
+    console.latency_jitter_ms = args.jitter_ms
+    console.log_page_latency_ms = args.log_page_latency_ms
+    console.extra_products = args.products
+    console.component_rows = args.component_rows
+    console.log_events = args.log_events
+    console.log_rows_per_page = args.log_rows_per_page
+    console.start()
+    
+    try:
+        if args.benchmark:
+            output_file = os.path.abspath(args.output) if args.output else None
+            asyncio.run(run_benchmark(console, args.runs, output_file, use_api=args.api, chrome_exe=args.chrome_exe))
+        else:
+            print("💡 Ctrl+Cで終了します")
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"❌ {e}")
+    finally:
+        console.stop()
+
+if __name__ == "__main__":
+    main()
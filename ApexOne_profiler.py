@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+ApexOne Profiler
+実行中のPython側の処理時間のプロファイル（cProfileとスタックのサンプリングによる折りたたみスタック）
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime
+
+class ProfilerMixin:
+    """--profile指定時のプロファイルの開始・停止と結果の保存（ApexOneStatusCheckerの一部）"""
+    
+    def start_profiler(self):
+        """cProfileとスタックのサンプリングを開始（イベントループ上の全タスクが対象）"""
+        import cProfile
+        
+        session = {
+            'profile': cProfile.Profile(),
+            'samples': {},
+            'stop_event': threading.Event(),
+            'started_at': datetime.now()
+        }
+        session['thread'] = threading.Thread(
+            target=self.sample_stacks,
+            args=(threading.get_ident(), session['samples'], session['stop_event']),
+            daemon=True
+        )
+        session['thread'].start()
+        session['profile'].enable()
+        print("🔬 プロファイルを開始しました")
+        return session
+    
+    def sample_stacks(self, thread_id, samples, stop_event):
+        """メインスレッドのスタックを一定間隔で採取して折りたたみ形式で集計"""
+        while not stop_event.wait(self.profile_sample_interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                collapsed = ";".join(reversed(stack))
+                samples[collapsed] = samples.get(collapsed, 0) + 1
+    
+    def stop_profiler(self, session):
+        """プロファイルを停止してpstatsと折りたたみスタックを保存し、上位の関数を表示"""
+        import pstats
+        
+        session['profile'].disable()
+        session['stop_event'].set()
+        session['thread'].join()
+        
+        timestamp = session['started_at'].strftime("%Y%m%d_%H%M%S")
+        stats_file = os.path.join(self.profile_dir, f"apexone_profile_{timestamp}.pstats")
+        collapsed_file = os.path.join(self.profile_dir, f"apexone_profile_{timestamp}.collapsed")
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            session['profile'].dump_stats(stats_file)
+            with open(collapsed_file, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(session['samples'].items()):
+                    f.write(f"{stack} {count}\n")
+            print(f"📝 プロファイルを保存しました: {stats_file}, {collapsed_file}")
+        except Exception as e:
+            print(f"⚠️ プロファイル保存エラー: {e}")
+        
+        # イベントループがI/O待ち（selectorsのselect/Windowsの_poll）にいたサンプルをChrome待ちとみなす
+        total_samples = sum(session['samples'].values())
+        waiting_samples = sum(
+            count for stack, count in session['samples'].items()
+            if stack.endswith(("selectors.py:select", "windows_events.py:_poll"))
+        )
+        
+        print(f"\n🔬 プロファイルサマリー")
+        print("=" * 60)
+        if total_samples:
+            waiting_ratio = waiting_samples / total_samples * 100
+            print(f"⏳ I/O待ち（Chrome・サーバー応答待ち）: {waiting_ratio:.1f}%  🐍 Python処理: {100 - waiting_ratio:.1f}%（{total_samples}サンプル）")
+        
+        # 自身の処理時間（子関数を除く）の長い順に表示
+        stats = pstats.Stats(session['profile'])
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.profile_top_n]
+        print(f"🐍 処理時間の長い関数上位{self.profile_top_n}件:")
+        print(f"   {'自身':>8}  {'累積':>8}  {'呼出回数':>8}  関数")
+        for (filename, line, function), (_, call_count, self_time, cumulative_time, _) in rows:
+            location = f" ({os.path.basename(filename)}:{line})" if line else ""
+            print(f"   {self_time:7.3f}秒  {cumulative_time:7.3f}秒  {call_count:8d}  {function}{location}")
+        print("=" * 60)
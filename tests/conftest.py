@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+テスト共通のフィクスチャ
+チェッカーのログ・状態ファイルは一時ディレクトリに出力し、リポジトリのファイルを変更しない
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ApexOne_checker import ApexOneStatusChecker
+
+@pytest.fixture
+def checker(tmp_path, monkeypatch):
+    """一時ディレクトリを作業ディレクトリにしたチェッカー（ログ・状態ファイルなどの相対パスは一時ディレクトリに出力）"""
+    monkeypatch.chdir(tmp_path)
+    checker = ApexOneStatusChecker()
+    checker.auto_commit_enabled = False
+    return checker
+
+def make_events(count, newest=None, login_every=3):
+    """システムイベントログの行（新しい順、1分間隔）。login_every 件ごとにログインイベントを含める"""
+    newest = newest or datetime.now().replace(microsecond=0) - timedelta(minutes=1)
+    rows = []
+    for index in range(count):
+        event_time = newest - timedelta(minutes=index)
+        if index % login_every == 0:
+            message = f"ユーザ「user{index}」が次の役割を使用してログインしました: 管理者"
+        else:
+            message = f"イベント{index}"
+        rows.append([event_time.strftime("%Y/%m/%d %H:%M:%S"), "PCVTMU53", message])
+    return rows
+
+class FakeEventLogSite:
+    """ページ番号のクエリパラメータでイベント行を返すシステムイベントログ（ignore_page_param=True の場合は常に1ページ目を返す）"""
+    
+    def __init__(self, rows=(), rows_per_page=5, page_param="page", ignore_page_param=False, pages=None):
+        self.rows = list(rows)
+        self.pages = pages                 # ページごとの行を直接指定する場合（ページの境界のずれの再現など）
+        self.rows_per_page = rows_per_page
+        self.page_param = page_param
+        self.ignore_page_param = ignore_page_param
+        self.requested_urls = []
+    
+    def page_rows(self, page_number):
+        if self.pages is not None:
+            return self.pages[page_number - 1] if 0 < page_number <= len(self.pages) else []
+        start = (page_number - 1) * self.rows_per_page
+        return self.rows[start:start + self.rows_per_page]
+    
+    def page_number_for(self, url):
+        if self.ignore_page_param or f"{self.page_param}=" not in url:
+            return 1
+        return int(url.rsplit(f"{self.page_param}=", 1)[1].split('&')[0])
+
+class FakeLogPage:
+    """extract_event_rows のJavaScriptと同じ規則（カットオフより古い行で打ち切り）で行を返すページ"""
+    
+    def __init__(self, site, page_number=1):
+        self.site = site
+        self.page_number = page_number
+    
+    async def goto(self, url, **kwargs):
+        self.site.requested_urls.append(url)
+        self.page_number = self.site.page_number_for(url)
+    
+    async def evaluate(self, script, cutoff_ms):
+        result = {'rows': [], 'truncated': False}
+        for cells in self.site.page_rows(self.page_number):
+            try:
+                event_time = datetime.strptime(cells[0], "%Y/%m/%d %H:%M:%S")
+            except ValueError:
+                continue
+            if cutoff_ms is not None and event_time.timestamp() * 1000 < cutoff_ms:
+                result['truncated'] = True
+                break
+            result['rows'].append(list(cells))
+        return result
+    
+    async def close(self):
+        pass
+
+class FakeContext:
+    """新しいページを開くだけのブラウザコンテキスト"""
+    
+    def __init__(self, site):
+        self.site = site
+    
+    async def new_page(self):
+        return FakeLogPage(self.site, page_number=0)
+
+@pytest.fixture
+def event_rows():
+    """システムイベントログの行を作成する関数（make_events）"""
+    return make_events
+
+@pytest.fixture
+def event_log_site():
+    """イベント行を指定してシステムイベントログ・コンテキスト・1ページ目を作成する関数"""
+    def create(rows=(), **options):
+        site = FakeEventLogSite(rows, **options)
+        return site, FakeContext(site), FakeLogPage(site)
+    return create
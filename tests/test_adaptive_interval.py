@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+実行間隔の自動調整（異常の検出・間隔の決定・次回の実行判定）のテスト
+"""
+
+import json
+from datetime import datetime, timedelta
+
+def make_healthy(checker):
+    """全製品が有効・ウイルスパターンファイルが当日の実行結果を設定"""
+    checker.last_status_result = "OK"
+    checker.product_status_records = [{'product': product, 'status': '有効'} for product in checker.target_products]
+    updated_at = datetime.now() - timedelta(hours=1)
+    ampm = "午前" if updated_at.hour < 12 else "午後"
+    virus_info = (f"ウイルスパターンファイル20.481.80{updated_at.strftime('%Y/%m/%d')} {ampm} "
+                  f"{updated_at.hour % 12 or 12:02d}:{updated_at.strftime('%M:%S')}")
+    checker.current_pcvtmu53_virus_info = virus_info
+    checker.current_pcvtmu54_virus_info = virus_info
+
+def test_healthy_run_has_no_signals(checker):
+    make_healthy(checker)
+    assert checker.collect_health_signals() == []
+
+def test_missing_result_is_a_signal(checker):
+    make_healthy(checker)
+    checker.last_status_result = None
+    checker.run_failures.append("Chromeデバッグモードの起動に失敗")
+    
+    signals = checker.collect_health_signals()
+    
+    assert "Chromeデバッグモードの起動に失敗" in signals
+    assert "ステータスチェック結果を取得できなかった" in signals
+
+def test_unhealthy_results_are_signals(checker):
+    make_healthy(checker)
+    checker.last_status_result = "NG"
+    checker.product_status_records[0]['status'] = '接続なし'
+    checker.current_pcvtmu53_virus_info = "ウイルスパターンファイル20.481.802020/01/01 午前 07:38:52"
+    checker.unreachable_servers.add("https://pcvtmu54:4343/officescan/")
+    checker.last_event_log_results = [{'server': "https://pcvtmu53:4343/officescan/", 'success': False}]
+    checker.timed_out_steps.append("ステータスチェック")
+    
+    signals = checker.collect_health_signals()
+    
+    assert f"{checker.target_products[0]}が接続なし" in signals
+    assert "ステータスチェック結果がNG" in signals
+    assert any(signal.startswith("PCVTMU53_OSCEのウイルスパターンファイルが") for signal in signals)
+    assert "https://pcvtmu54:4343/officescan/に接続できない" in signals
+    assert "https://pcvtmu53:4343/officescan/のシステムイベントログチェックに失敗" in signals
+    assert "ステータスチェックが期限超過" in signals
+
+def test_first_run_uses_base_interval(checker):
+    make_healthy(checker)
+    checker.adaptive_base_minutes = 60
+    assert checker.decide_next_interval() == 60
+
+def test_interval_backs_off_up_to_max(checker):
+    make_healthy(checker)
+    checker.adaptive_base_minutes = 60
+    checker.adaptive_max_minutes = 200
+    
+    intervals = [checker.decide_next_interval() for _ in range(4)]
+    
+    assert intervals == [60, 120, 200, 200]
+
+def test_signal_shortens_then_returns_to_base(checker):
+    make_healthy(checker)
+    checker.adaptive_base_minutes = 60
+    checker.decide_next_interval()
+    checker.decide_next_interval()
+    
+    checker.last_status_result = "NG"
+    assert checker.decide_next_interval() == checker.adaptive_min_minutes
+    
+    checker.last_status_result = "OK"
+    assert checker.decide_next_interval() == 60
+
+def test_decision_is_saved_and_appended(checker):
+    make_healthy(checker)
+    checker.decide_next_interval()
+    checker.decide_next_interval()
+    
+    decision = checker.load_state()['adaptive_interval']
+    assert decision['previous_minutes'] == checker.adaptive_base_minutes
+    next_run_at = datetime.fromisoformat(decision['next_run_at'])
+    assert next_run_at - checker.run_started_at.replace(microsecond=0) <= timedelta(minutes=decision['interval_minutes'])
+    with open(checker.interval_decision_file, 'r', encoding='utf-8') as f:
+        assert [json.loads(line)['interval_minutes'] for line in f] == [60, 120]
+
+def test_run_is_due_only_after_next_run_at(checker):
+    assert checker.is_adaptive_run_due()
+    
+    with checker.update_state() as state:
+        state['adaptive_interval'] = {'next_run_at': (datetime.now() + timedelta(minutes=30)).isoformat(), 'reason': "テスト"}
+    assert not checker.is_adaptive_run_due()
+    
+    with checker.update_state() as state:
+        state['adaptive_interval']['next_run_at'] = (datetime.now() - timedelta(seconds=1)).isoformat()
+    assert checker.is_adaptive_run_due()
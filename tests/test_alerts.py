@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+アラート通知（実行ごとのまとめ送信・再通知の抑止・通知先の失敗）のテスト
+"""
+
+import asyncio
+import json
+import time
+
+def run_alerts(checker, keys=(), resolved=()):
+    """1回の実行でアラートを登録・解消し、送信の完了まで待機"""
+    async def run():
+        checker.resolved_alert_keys = set()
+        for key in keys:
+            checker.raise_alert(key, f"{key}のタイトル", f"{key}の詳細")
+        for key in resolved:
+            checker.resolve_alert(key)
+        checker.finish_run_alerts()
+        await checker.close_alerts()
+    asyncio.run(run())
+
+def read_sent(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    except FileNotFoundError:
+        return []
+
+def test_no_sinks_means_no_dispatcher(checker):
+    run_alerts(checker, ['status:NG'])
+    assert checker.alert_dispatcher is None
+    assert 'alerts' not in checker.load_state()
+
+def test_alerts_of_a_run_are_sent_as_one_batch(checker, tmp_path):
+    sink_path = str(tmp_path / "alerts.jsonl")
+    checker.alert_sinks = [{'type': 'file', 'path': sink_path}]
+    
+    run_alerts(checker, ['status:NG', 'virus_pattern:PCVTMU53_OSCE'])
+    
+    sent = read_sent(sink_path)
+    assert len(sent) == 1
+    assert [alert['key'] for alert in sent[0]['alerts']] == ['status:NG', 'virus_pattern:PCVTMU53_OSCE']
+    assert set(checker.load_state()['alerts']) == {'status:NG', 'virus_pattern:PCVTMU53_OSCE'}
+    assert checker.last_alert_deliveries[0]['success']
+
+def test_repeated_alert_is_suppressed_during_cooldown(checker, tmp_path):
+    sink_path = str(tmp_path / "alerts.jsonl")
+    checker.alert_sinks = [{'type': 'file', 'path': sink_path}]
+    
+    run_alerts(checker, ['status:NG'])
+    run_alerts(checker, ['status:NG'])
+    
+    assert len(read_sent(sink_path)) == 1
+
+def test_resolved_alert_is_sent_again(checker, tmp_path):
+    sink_path = str(tmp_path / "alerts.jsonl")
+    checker.alert_sinks = [{'type': 'file', 'path': sink_path}]
+    
+    run_alerts(checker, ['status:NG'])
+    run_alerts(checker, resolved=['status:NG'])
+    assert 'status:NG' not in checker.load_state()['alerts']
+    run_alerts(checker, ['status:NG'])
+    
+    assert len(read_sent(sink_path)) == 2
+
+def test_failed_delivery_is_retried_next_run(checker, tmp_path):
+    checker.alert_sinks = [{'type': 'webhook', 'url': "http://127.0.0.1:9/alerts"}]
+    
+    run_alerts(checker, ['status:NG'])
+    
+    assert not checker.last_alert_deliveries[0]['success']
+    assert 'status:NG' not in checker.load_state().get('alerts', {})
+
+def test_slow_sink_times_out_without_blocking_other_sinks(checker, tmp_path):
+    sink_path = str(tmp_path / "alerts.jsonl")
+    checker.alert_sinks = [{'type': 'webhook', 'name': 'slow', 'url': "http://127.0.0.1:9/alerts"},
+                           {'type': 'file', 'path': sink_path}]
+    checker.alert_send_timeout = 0.2
+    checker.send_webhook_alert = lambda sink, subject, body, alerts: time.sleep(1)
+    
+    run_alerts(checker, ['status:NG'])
+    
+    deliveries = {delivery['sink']: delivery for delivery in checker.last_alert_deliveries}
+    assert not deliveries['slow']['success']
+    assert deliveries['slow']['latency_ms'] < 1000
+    assert "0.2秒以内に送信が完了しませんでした" in deliveries['slow']['error']
+    assert deliveries['file']['success']
+    assert len(read_sent(sink_path)) == 1
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+自動化APIクライアントとAPIでのステータス取得のテスト（同梱のモックコンソールに接続）
+"""
+
+import asyncio
+
+import pytest
+
+from ApexOne_api_client import ApexCentralApiClient, ApexCentralApiError
+from ApexOne_mock_console import MockApexOneConsole
+
+PRODUCT_SERVERS_PATH = "/WebApp/API/ServerResource/ProductServers"
+
+@pytest.fixture
+def console():
+    console = MockApexOneConsole(port=0)
+    console.latency_ms = 0
+    console.start()
+    yield console
+    console.stop()
+
+@pytest.fixture
+def api_checker(checker, console):
+    """モックコンソールの自動化APIに接続するチェッカー"""
+    checker.control_manager_url = console.control_manager_url
+    checker.get_api_credentials = lambda: {'application_id': console.api_application_id, 'api_key': console.api_key}
+    yield checker
+    checker.close_api_client()
+
+def test_signed_request_is_accepted(console):
+    client = ApexCentralApiClient(console.base_url, console.api_application_id, console.api_key)
+    try:
+        servers = client.request("GET", PRODUCT_SERVERS_PATH)
+    finally:
+        client.close()
+    
+    assert {server['display_name'] for server in servers} == set(console.target_products)
+
+def test_wrong_api_key_raises(console):
+    client = ApexCentralApiClient(console.base_url, console.api_application_id, "wrong-key")
+    try:
+        with pytest.raises(ApexCentralApiError, match="HTTP 401"):
+            client.request("GET", PRODUCT_SERVERS_PATH)
+    finally:
+        client.close()
+
+def test_query_is_part_of_the_signed_path(console):
+    client = ApexCentralApiClient(console.base_url, console.api_application_id, console.api_key)
+    try:
+        components = client.request("GET", f"{PRODUCT_SERVERS_PATH}/Components", {'entity_id': "entity-PCVTMU53_OSCE"})
+    finally:
+        client.close()
+    
+    assert components[0]['component'] == "ウイルスパターンファイル"
+
+def test_connections_are_reused(console):
+    client = ApexCentralApiClient(console.base_url, console.api_application_id, console.api_key, pool_size=1)
+    try:
+        for _ in range(5):
+            client.request("GET", PRODUCT_SERVERS_PATH)
+    finally:
+        client.close()
+    
+    assert client.requests_sent == 5
+    assert client.connections_opened == 1
+
+def test_status_check_via_api_matches_screen_format(api_checker, console):
+    result = asyncio.run(api_checker.run_status_check_via_api())
+    
+    assert result == "OK"
+    assert {record['product'] for record in api_checker.product_status_records} == set(console.target_products)
+    for virus_info in (api_checker.current_pcvtmu53_virus_info, api_checker.current_pcvtmu54_virus_info):
+        assert virus_info.startswith("ウイルスパターンファイル19.541.00")
+        assert api_checker.validate_virus_pattern_date(virus_info).startswith("✅")
+
+def test_disabled_product_is_ng(api_checker, console):
+    console.product_status = "無効"
+    assert asyncio.run(api_checker.run_status_check_via_api(check_virus_pattern=False)) == "NG"
+
+def test_mismatched_field_names_find_no_products(api_checker, capsys):
+    api_checker.api_server_fields = dict(api_checker.api_server_fields, status='status')
+    
+    asyncio.run(api_checker.run_status_check_via_api(check_virus_pattern=False))
+    
+    assert api_checker.product_status_records == []
+    assert "api_server_fields を確認してください" in capsys.readouterr().out
+
+def test_api_error_returns_error(api_checker):
+    api_checker.api_product_servers_path = "/WebApp/API/NotFound"
+    assert asyncio.run(api_checker.run_status_check_via_api()) == "ERROR"
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+サーバーURLごとのサーキットブレーカー（状態遷移・再試行）のテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+SERVER_URL = "https://pcvtmu53:4343/officescan/"
+
+def breaker_state(checker):
+    return checker.load_state()['circuit_breakers'][SERVER_URL]
+
+def open_breaker(checker, opened_minutes_ago=0):
+    for _ in range(checker.circuit_breaker_threshold):
+        checker.record_circuit_breaker_result(SERVER_URL, False)
+    with checker.update_state() as state:
+        opened_at = datetime.now() - timedelta(minutes=opened_minutes_ago)
+        state['circuit_breakers'][SERVER_URL]['opened_at'] = opened_at.isoformat(timespec='seconds')
+
+def test_closed_breaker_allows(checker):
+    assert checker.circuit_breaker_allows(SERVER_URL) == (True, False)
+    assert breaker_state(checker)['state'] == 'closed'
+
+def test_opens_after_threshold_failures(checker):
+    for _ in range(checker.circuit_breaker_threshold - 1):
+        checker.record_circuit_breaker_result(SERVER_URL, False)
+    assert breaker_state(checker)['state'] == 'closed'
+    
+    checker.record_circuit_breaker_result(SERVER_URL, False)
+    
+    assert breaker_state(checker)['state'] == 'open'
+    assert checker.circuit_breaker_allows(SERVER_URL) == (False, False)
+
+def test_success_resets_failure_count(checker):
+    checker.record_circuit_breaker_result(SERVER_URL, False)
+    checker.record_circuit_breaker_result(SERVER_URL, True)
+    
+    assert breaker_state(checker) == {'state': 'closed', 'failures': 0, 'opened_at': None}
+
+def test_half_open_after_cooldown(checker):
+    open_breaker(checker, opened_minutes_ago=checker.circuit_breaker_cooldown_minutes + 1)
+    
+    assert checker.circuit_breaker_allows(SERVER_URL) == (True, True)
+    assert breaker_state(checker)['state'] == 'half_open'
+
+def test_half_open_failure_reopens(checker):
+    open_breaker(checker, opened_minutes_ago=checker.circuit_breaker_cooldown_minutes + 1)
+    checker.circuit_breaker_allows(SERVER_URL)
+    
+    checker.record_circuit_breaker_result(SERVER_URL, False)
+    
+    assert breaker_state(checker)['state'] == 'open'
+    assert checker.circuit_breaker_allows(SERVER_URL) == (False, False)
+
+def test_half_open_success_closes(checker):
+    open_breaker(checker, opened_minutes_ago=checker.circuit_breaker_cooldown_minutes + 1)
+    checker.circuit_breaker_allows(SERVER_URL)
+    
+    checker.record_circuit_breaker_result(SERVER_URL, True)
+    
+    assert breaker_state(checker)['state'] == 'closed'
+
+def test_open_breaker_skips_operation(checker):
+    open_breaker(checker)
+    calls = []
+    
+    async def operation():
+        calls.append(1)
+        return "OK"
+    
+    assert asyncio.run(checker.run_with_circuit_breaker(SERVER_URL, operation)) is None
+    assert calls == []
+    assert SERVER_URL in checker.circuit_open_servers
+
+def test_retries_transient_errors(checker):
+    checker.retry_base_delay = 0
+    results = ["ERROR", "ERROR", "OK"]
+    
+    async def operation():
+        checker.last_server_error = Exception("page.goto: net::ERR_CONNECTION_RESET")
+        return results.pop(0)
+    
+    result = asyncio.run(checker.run_with_circuit_breaker(SERVER_URL, operation, lambda value: value == "OK"))
+    
+    assert result == "OK"
+    assert results == []
+    assert breaker_state(checker)['failures'] == 0
+
+def test_does_not_retry_other_errors(checker):
+    checker.retry_base_delay = 0
+    calls = []
+    
+    async def operation():
+        calls.append(1)
+        checker.last_server_error = Exception("ログインに失敗しました")
+        return "ERROR"
+    
+    asyncio.run(checker.run_with_circuit_breaker(SERVER_URL, operation, lambda value: value == "OK"))
+    
+    assert len(calls) == 1
+    assert breaker_state(checker)['failures'] == 1
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+実行期限によるステップの打ち切りのテスト
+"""
+
+import asyncio
+import time
+
+def run_step(checker, operation, deadline_seconds):
+    checker.run_deadline_reserve_seconds = 0
+    checker.run_deadline = None if deadline_seconds is None else time.monotonic() + deadline_seconds
+    
+    async def run():
+        started = time.perf_counter()
+        result = await checker.run_step_with_deadline("テストステップ", operation)
+        return result, time.perf_counter() - started
+    return asyncio.run(run())
+
+def test_step_without_deadline_runs_to_completion(checker):
+    async def operation():
+        await asyncio.sleep(0.05)
+        return "DONE"
+    
+    assert run_step(checker, operation, None)[0] == "DONE"
+    assert checker.timed_out_steps == []
+
+def test_overrunning_step_is_cancelled(checker):
+    async def operation():
+        await asyncio.sleep(10)
+        return "DONE"
+    
+    result, elapsed = run_step(checker, operation, 0.2)
+    
+    assert result == "TIMEOUT"
+    assert elapsed < 1
+    assert checker.timed_out_steps == ["テストステップ"]
+
+def test_cancellation_passes_through_except_exception(checker):
+    # セレクターを順に試すループと同じく、失敗したら次を試す処理でも期限で打ち切られること
+    async def operation():
+        for _ in range(20):
+            try:
+                await asyncio.sleep(0.2)
+            except Exception:
+                continue
+        return "DONE"
+    
+    result, elapsed = run_step(checker, operation, 0.2)
+    
+    assert result == "TIMEOUT"
+    assert elapsed < 1
+
+def test_step_is_skipped_when_no_time_remains(checker):
+    calls = []
+    
+    async def operation():
+        calls.append(1)
+    
+    assert run_step(checker, operation, -1)[0] == "TIMEOUT"
+    assert calls == []
+    assert checker.timed_out_steps == ["テストステップ"]
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+システムイベントログのページ送り（終了理由・重複除外・ページ番号付きURL）のテスト
+"""
+
+import asyncio
+from datetime import timedelta
+
+SYSTEM_EVENT_URL = "https://pcvtmu53:4343/officescan/console/html/cgi/cgiShowLogs.exe?id=1"
+
+def crawl(checker, context, first_page, watermark=None, cutoff_time=None):
+    async def collect():
+        return [event async for event in checker.crawl_system_events(context, SYSTEM_EVENT_URL, first_page=first_page,
+                                                                     watermark=watermark, cutoff_time=cutoff_time)]
+    return asyncio.run(collect())
+
+def test_build_event_page_url_appends_page_param(checker):
+    assert checker.build_event_page_url(SYSTEM_EVENT_URL, 3) == f"{SYSTEM_EVENT_URL}&page=3"
+    checker.event_log_page_param = "p"
+    assert checker.build_event_page_url("https://pcvtmu53/logs", 2) == "https://pcvtmu53/logs?p=2"
+
+def test_crawl_reads_every_page_until_last_page(checker, event_log_site, event_rows):
+    site, context, first_page = event_log_site(event_rows(12))
+    
+    events = crawl(checker, context, first_page)
+    
+    assert len(events) == 12
+    assert [event['page'] for event in events] == [1] * 5 + [2] * 5 + [3] * 2
+    assert checker.last_event_crawl_stats['stop_reason'] == '最終ページ'
+    assert f"{SYSTEM_EVENT_URL}&page=2" in site.requested_urls
+
+def test_crawl_stops_at_page_limit(checker, event_log_site, event_rows):
+    site, context, first_page = event_log_site(event_rows(30))
+    checker.event_log_max_pages = 3
+    
+    events = crawl(checker, context, first_page)
+    
+    assert len(events) == 15
+    assert checker.last_event_crawl_stats['stop_reason'] == 'ページ上限'
+
+def test_crawl_stops_at_cutoff_time(checker, event_log_site, event_rows):
+    rows = event_rows(12)
+    site, context, first_page = event_log_site(rows)
+    cutoff_time = checker.parse_event_timestamp('\t'.join(rows[6])) - timedelta(seconds=30)
+    
+    events = crawl(checker, context, first_page, cutoff_time=cutoff_time)
+    
+    assert len(events) == 7
+    assert checker.last_event_crawl_stats['stop_reason'] == '時刻カットオフ'
+
+def test_crawl_stops_at_watermark(checker, event_log_site, event_rows):
+    rows = event_rows(12)
+    site, context, first_page = event_log_site(rows)
+    watermark_text = '\t'.join(rows[4])
+    watermark = {
+        'timestamp': checker.parse_event_timestamp(watermark_text).isoformat(),
+        'hash': checker.hash_event(watermark_text)
+    }
+    
+    events = crawl(checker, context, first_page, watermark=watermark)
+    
+    assert len(events) == 4
+    assert checker.last_event_crawl_stats['stop_reason'] == 'ウォーターマーク到達'
+
+def test_crawl_skips_rows_repeated_across_shifted_pages(checker, event_log_site, event_rows):
+    # 1ページ目の取得後に新しいイベントが2件発生し、2ページ目の先頭に1ページ目の末尾2行が再び現れた状態
+    rows = event_rows(8)
+    site, context, first_page = event_log_site(pages=[rows[0:5], rows[3:8]])
+    
+    events = crawl(checker, context, first_page)
+    
+    assert len(events) == 8
+    assert len({event['hash'] for event in events}) == 8
+    assert checker.last_event_crawl_stats['stop_reason'] == '最終ページ'
+
+def test_crawl_stops_when_page_param_is_ignored(checker, event_log_site, event_rows):
+    site, context, first_page = event_log_site(event_rows(12), ignore_page_param=True)
+    
+    events = crawl(checker, context, first_page)
+    
+    assert len(events) == 5
+    assert checker.last_event_crawl_stats['stop_reason'] == 'ページ送り未対応（同一ページ）'
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+システムイベントログの増分取り込みとウォーターマークの更新条件のテスト
+"""
+
+import asyncio
+from datetime import timedelta
+
+SERVER_URL = "https://pcvtmu53:4343/officescan/"
+SYSTEM_EVENT_URL = "https://pcvtmu53:4343/officescan/console/html/cgi/cgiShowLogs.exe?id=1"
+
+def ingest(checker, context, first_page):
+    return asyncio.run(checker.ingest_new_system_events(context, first_page, SYSTEM_EVENT_URL, SERVER_URL))
+
+def get_watermark(checker):
+    return checker.load_state().get('event_log_watermarks', {}).get(SERVER_URL)
+
+def read_log(checker):
+    with open(checker.log_checker_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def test_complete_crawl_records_events_and_sets_watermark(checker, event_log_site, event_rows):
+    rows = event_rows(12)
+    site, context, first_page = event_log_site(rows)
+    
+    assert ingest(checker, context, first_page)
+    
+    assert checker.last_event_crawl_stats['stop_reason'] == '最終ページ'
+    watermark = get_watermark(checker)
+    assert watermark['hash'] == checker.hash_event('\t'.join(rows[0]))
+    log = read_log(checker)
+    assert log.count("] イベント pcvtmu53: ") == 11
+    assert log.count("] サーバー pcvtmu53: ") == 1
+
+def test_page_limit_keeps_watermark(checker, event_log_site, event_rows):
+    rows = event_rows(20)
+    site, context, first_page = event_log_site(rows)
+    checker.event_log_max_pages = 2
+    
+    assert ingest(checker, context, first_page)
+    
+    assert checker.last_event_crawl_stats['stop_reason'] == 'ページ上限'
+    assert get_watermark(checker) is None
+    log = read_log(checker)
+    assert "イベントログ走査未完了のためウォーターマーク据え置き" in log
+    assert "] イベント pcvtmu53: " not in log
+
+def test_next_run_ingests_only_events_after_watermark(checker, event_log_site, event_rows):
+    old_rows = event_rows(8)
+    site, context, first_page = event_log_site(old_rows)
+    ingest(checker, context, first_page)
+    first_watermark = get_watermark(checker)
+    
+    newest = checker.parse_event_timestamp('\t'.join(old_rows[0])) + timedelta(minutes=3)
+    new_rows = event_rows(3, newest=newest, login_every=10)
+    site, context, first_page = event_log_site(new_rows + old_rows)
+    open(checker.log_checker_file, 'w', encoding='utf-8').close()
+    
+    assert ingest(checker, context, first_page)
+    
+    assert checker.last_event_crawl_stats['stop_reason'] == 'ウォーターマーク到達'
+    assert checker.last_event_crawl_stats['events'] == 3
+    watermark = get_watermark(checker)
+    assert watermark['hash'] == checker.hash_event('\t'.join(new_rows[0]))
+    assert watermark['timestamp'] > first_watermark['timestamp']
+
+def test_failed_page_keeps_watermark(checker, event_log_site, event_rows):
+    site, context, first_page = event_log_site(event_rows(12))
+    
+    async def fail(*args, **kwargs):
+        raise TimeoutError("page.goto: Timeout 30000ms exceeded")
+    context.new_page = fail
+    
+    assert ingest(checker, context, first_page)
+    
+    assert checker.last_event_crawl_stats['stop_reason'] == 'ページ取得失敗'
+    assert get_watermark(checker) is None
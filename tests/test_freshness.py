@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+チェックごとの鮮度ポリシー（保存済みの結果を再利用するかの判定）のテスト
+"""
+
+from datetime import datetime, timedelta
+
+def reading_at(checked_at):
+    return {'check_readings': {'virus_pattern': {'checked_at': checked_at.isoformat(timespec='seconds'), 'data': {}}}}
+
+def test_zero_hours_always_runs(checker):
+    checker.check_freshness_hours['virus_pattern'] = 0
+    assert checker.is_check_due('virus_pattern', reading_at(datetime.now()))
+
+def test_unknown_check_always_runs(checker):
+    assert checker.is_check_due('not_configured', reading_at(datetime.now()))
+
+def test_runs_without_saved_reading(checker):
+    checker.check_freshness_hours['virus_pattern'] = 12
+    assert checker.is_check_due('virus_pattern', {})
+
+def test_skips_while_reading_is_fresh(checker):
+    checker.check_freshness_hours['virus_pattern'] = 12
+    assert not checker.is_check_due('virus_pattern', reading_at(datetime.now() - timedelta(hours=11)))
+
+def test_runs_once_reading_is_stale(checker):
+    checker.check_freshness_hours['virus_pattern'] = 12
+    assert checker.is_check_due('virus_pattern', reading_at(datetime.now() - timedelta(hours=12, minutes=1)))
+
+def test_runs_when_saved_timestamp_is_invalid(checker):
+    checker.check_freshness_hours['virus_pattern'] = 12
+    state = {'check_readings': {'virus_pattern': {'checked_at': "不正な日時", 'data': {}}}}
+    assert checker.is_check_due('virus_pattern', state)
+
+def test_recorded_reading_is_reused_from_state_file(checker):
+    checker.check_freshness_hours['virus_pattern'] = 12
+    data = {'PCVTMU53_OSCE': "ウイルスパターンファイル20.481.802025/09/02 午前 07:38:52"}
+    checker.record_check_reading('virus_pattern', data)
+    
+    assert not checker.is_check_due('virus_pattern')
+    assert checker.get_cached_reading('virus_pattern')['data'] == data
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+統合ログファイルの読み取り（日付検証・実行履歴）とブラウザを使わないサブコマンドのテスト
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+from ApexOne_log_reader import LogReader
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def pattern_text(updated_at):
+    ampm = "午前" if updated_at.hour < 12 else "午後"
+    return (f"ウイルスパターンファイル20.481.80{updated_at.strftime('%Y/%m/%d')} {ampm} "
+            f"{updated_at.hour % 12 or 12:02d}:{updated_at.strftime('%M:%S')}")
+
+def write_log(path, runs):
+    """実行ごとの見出し・ステータス・ウイルスパターンファイル行を統合ログファイルに書き込む"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for run_time, status, virus_info in runs:
+            f.write(f"\n=== {run_time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
+            f.write(f"ステータスチェック結果: {status}\n")
+            f.write("\n=== PCVTMU53_OSCE ウイルスパターンファイル行 1 ===\n")
+            f.write(f"行全体テキスト: {virus_info}\n")
+            f.write(f"[{run_time.strftime('%Y-%m-%d %H:%M:%S')}] サーバー pcvtmu53: 2025/09/02 07:40:00\tPCVTMU53\t"
+                    "ユーザ「user」が次の役割を使用してログインしました: 管理者\n")
+
+@pytest.fixture
+def reader(tmp_path):
+    reader = LogReader()
+    reader.log_file = str(tmp_path / "apexone_integrated.log")
+    return reader
+
+@pytest.mark.parametrize('age_days, expected', [
+    (0, "✅"),
+    (4, "⚠️"),
+    (6, "⚠️"),
+    (10, "❌"),
+    (20, "🚨"),
+])
+def test_validate_virus_pattern_date_levels(reader, age_days, expected):
+    virus_info = pattern_text(datetime.now() - timedelta(days=age_days, hours=1))
+    assert reader.validate_virus_pattern_date(virus_info).startswith(expected)
+
+def test_parse_virus_pattern_datetime_handles_noon_and_midnight(reader):
+    assert reader.parse_virus_pattern_datetime("2025/09/02 午前 12:05:00") == datetime(2025, 9, 2, 0, 5, 0)
+    assert reader.parse_virus_pattern_datetime("2025/09/02 午後 12:05:00") == datetime(2025, 9, 2, 12, 5, 0)
+    assert reader.parse_virus_pattern_datetime("2025/09/02 午後 01:05:00") == datetime(2025, 9, 2, 13, 5, 0)
+    assert reader.parse_virus_pattern_datetime("日付なし") is None
+
+def test_extract_latest_virus_pattern_info_returns_last_entry(reader):
+    now = datetime.now().replace(microsecond=0)
+    write_log(reader.log_file, [(now - timedelta(hours=2), "OK", pattern_text(now - timedelta(days=2))),
+                                (now, "NG", pattern_text(now - timedelta(hours=3)))])
+    
+    assert reader.extract_latest_virus_pattern_info() == pattern_text(now - timedelta(hours=3))
+
+def test_missing_log_file(reader):
+    assert reader.extract_latest_virus_pattern_info() is None
+    assert reader.show_history() == []
+
+def test_show_history_includes_heartbeats(reader):
+    now = datetime.now().replace(microsecond=0)
+    write_log(reader.log_file, [(now - timedelta(hours=2), "OK", pattern_text(now - timedelta(days=1)))])
+    with open(reader.log_file, 'a', encoding='utf-8') as f:
+        f.write(f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] 変化なし: ステータス OK（前回の記録: 2時間前）\n")
+    
+    runs = reader.show_history(limit=0)
+    
+    assert [run['status'] for run in runs] == ["OK", "OK"]
+    assert runs[0]['logins'] == {'pcvtmu53': True}
+    assert runs[1].get('heartbeat')
+
+def run_cli(tmp_path, *args):
+    return subprocess.run([sys.executable, os.path.join(REPO_DIR, "ApexOne_status_checker.py")] + list(args),
+                          cwd=tmp_path, capture_output=True, text=True, encoding='utf-8')
+
+def test_validate_pattern_exit_code(tmp_path):
+    assert run_cli(tmp_path, 'validate-pattern', pattern_text(datetime.now() - timedelta(hours=1))).returncode == 0
+    assert run_cli(tmp_path, 'validate-pattern', pattern_text(datetime.now() - timedelta(days=30))).returncode == 1
+    assert run_cli(tmp_path, 'validate-pattern').returncode == 1
+
+def test_summary_reads_log_in_working_directory(tmp_path):
+    now = datetime.now().replace(microsecond=0)
+    write_log(str(tmp_path / "apexone_integrated.log"), [(now, "OK", pattern_text(now))])
+    
+    result = run_cli(tmp_path, 'summary')
+    
+    assert result.returncode == 0
+    assert "ステータスチェック実行回数: 1回" in result.stdout
+
+def test_log_reading_commands_do_not_import_the_checker(tmp_path):
+    script = ("import sys, ApexOne_status_checker as cli; "
+              "[cli.main([command]) for command in ('summary', 'history', 'validate-pattern')]; "
+              "print(sorted(name for name in ('asyncio', 'ApexOne_checker', 'threading', 'tracemalloc') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, capture_output=True, text=True,
+                            encoding='utf-8', env=dict(os.environ, PYTHONPATH=REPO_DIR))
+    
+    assert result.stdout.strip().splitlines()[-1] == "[]"
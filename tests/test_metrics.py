@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+OpenMetrics出力（ラベルのエスケープ・ヒストグラム・テキストファイル・/metrics）のテスト
+"""
+
+import urllib.request
+
+def make_span(name, duration_ms):
+    return {'id': name, 'parent': None, 'name': name, 'duration_ms': duration_ms}
+
+def sample_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name) and not line.startswith('#')]
+
+def test_label_values_are_escaped(checker):
+    labels = {'product': 'PC"53\\OSCE\nX'}
+    assert checker.format_metric_labels(labels) == '{product="PC\\"53\\\\OSCE\\nX"}'
+    assert checker.format_metric_labels({}) == ""
+
+def test_product_status_gauge(checker):
+    checker.product_status_records = [
+        {'product': 'PCVTMU53_OSCE', 'server': 'pcvtmu53', 'status': '有効'},
+        {'product': 'PCVTMU54_OSCE', 'server': 'pcvtmu54', 'status': '接続なし'}
+    ]
+    
+    lines = sample_lines(checker.render_openmetrics(), 'apexone_product_status')
+    
+    assert lines == [
+        'apexone_product_status{product="PCVTMU53_OSCE",server="pcvtmu53",status="有効"} 1',
+        'apexone_product_status{product="PCVTMU54_OSCE",server="pcvtmu54",status="接続なし"} 0'
+    ]
+
+def test_step_duration_histogram_is_cumulative(checker):
+    checker.step_duration_buckets = [0.1, 1, 10]
+    checker.spans = [
+        make_span('ログイン', 50),
+        make_span('ログイン', 700),
+        make_span('ログイン', 20000),
+        make_span('実行中', None)
+    ]
+    checker.update_metrics()
+    
+    lines = sample_lines(checker.metrics_text, 'apexone_step_duration_seconds')
+    
+    assert lines == [
+        'apexone_step_duration_seconds_bucket{step="ログイン",le="0.1"} 1',
+        'apexone_step_duration_seconds_bucket{step="ログイン",le="1"} 2',
+        'apexone_step_duration_seconds_bucket{step="ログイン",le="10"} 2',
+        'apexone_step_duration_seconds_bucket{step="ログイン",le="+Inf"} 3',
+        'apexone_step_duration_seconds_sum{step="ログイン"} 20.75',
+        'apexone_step_duration_seconds_count{step="ログイン"} 3'
+    ]
+
+def test_histogram_accumulates_across_runs(checker):
+    checker.spans = [make_span('ログイン', 500)]
+    checker.update_metrics()
+    checker.update_metrics()
+    
+    assert 'apexone_step_duration_seconds_count{step="ログイン"} 2' in checker.metrics_text
+
+def test_every_family_has_type_and_help_and_output_ends_with_eof(checker):
+    text = checker.render_openmetrics()
+    lines = text.splitlines()
+    
+    assert text.endswith("# EOF\n")
+    assert lines.count("# EOF") == 1
+    families = [line.split()[2] for line in lines if line.startswith("# TYPE ")]
+    helps = [line.split()[2] for line in lines if line.startswith("# HELP ")]
+    assert families == helps
+    assert 'apexone_virus_pattern_age_days' in families
+
+def test_textfile_is_written(checker, tmp_path):
+    checker.metrics_textfile = str(tmp_path / "apexone.prom")
+    checker.last_status_result = "OK"
+    checker.update_metrics()
+    
+    with open(checker.metrics_textfile, 'r', encoding='utf-8') as f:
+        text = f.read()
+    assert 'apexone_status_check_result{result="OK"} 1' in text
+    assert not (tmp_path / "apexone.prom.tmp").exists()
+
+def test_metrics_endpoint_serves_latest_text(checker):
+    checker.last_status_result = "NG"
+    checker.start_metrics_server(0)
+    try:
+        port = checker.metrics_server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            content_type = response.headers['Content-Type']
+            body = response.read().decode('utf-8')
+    finally:
+        checker.metrics_server.shutdown()
+        checker.metrics_server.server_close()
+    
+    assert content_type.startswith('application/openmetrics-text')
+    assert 'apexone_status_check_result{result="NG"} 1' in body
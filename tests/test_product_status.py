@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+製品の接続ステータスの検索（表構造のレコード・周辺テキスト）と判定のテスト
+"""
+
+def test_exact_product_name_wins_over_partial_match(checker):
+    checker.product_status_records = [
+        {'product': 'PCVTMU53_OSCE (旧)', 'server': 'pcvtmu53-old', 'status': '接続なし'},
+        {'product': 'PCVTMU53_OSCE', 'server': 'pcvtmu53', 'status': '有効'}
+    ]
+    assert checker.find_product_status_record('PCVTMU53_OSCE')['status'] == '有効'
+
+def test_partial_match_when_product_name_has_suffix(checker):
+    checker.product_status_records = [{'product': 'PCVTMU54_TMSM (Deep Security)', 'server': 'pcvtmu54', 'status': '無効'}]
+    assert checker.find_product_status_record('PCVTMU54_TMSM')['status'] == '無効'
+    assert checker.find_product_status_record('PCVTMU53_TMSM') is None
+
+def test_context_fallback_finds_nearby_keyword(checker):
+    frame_text = "製品サーバステータスPCVTMU53_OSCEpcvtmu53接続なし2025/09/02 07:40:00"
+    assert checker.find_product_status_by_context(frame_text, 'PCVTMU53_OSCE') == '接続なし'
+    assert checker.find_product_status_by_context(frame_text, 'PCVTMU54_OSCE') is None
+
+def test_judge_all_enabled_is_ok(checker):
+    statuses = {product: '有効' for product in checker.target_products}
+    assert checker.judge_product_statuses(statuses) == "OK"
+
+def test_judge_any_other_status_is_ng(checker):
+    statuses = {product: '有効' for product in checker.target_products}
+    statuses[checker.target_products[0]] = '警告'
+    assert checker.judge_product_statuses(statuses) == "NG"
+
+def test_judge_missing_products_is_insufficient(checker):
+    statuses = {product: '有効' for product in checker.target_products[:3]}
+    assert checker.judge_product_statuses(statuses) == "INSUFFICIENT_DATA"